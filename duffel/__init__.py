@@ -2,5 +2,10 @@ from .df import _DuffelDataFrame as DataFrame
 from .na import NA, ndim
 from .row import _DuffelRow as Row
 from .col import _DuffelCol as Col
-from .utils import _concat as concat, _read_csv as read_csv, _read_json as read_json, _read_sql as read_sql
-
+from .mask import _DuffelMask as Mask
+from .categorical import _DuffelCategorical as Categorical
+from .stats import _DuffelComoments as Comoments
+from .index import _DuffelIndex as Index, _DuffelRangeIndex as RangeIndex
+from .utils import _concat as concat, _merge as merge, _read_csv as read_csv, _read_json as read_json, _read_sql as read_sql, _scan_csv as scan_csv, _read_duffel as read_duffel, _sql as sql, _clear_sql as clear_sql
+from .lazy import _DuffelLazyFrame as LazyFrame
+from .expr import col
@@ -0,0 +1,191 @@
+"""
+hash aggregation kernels
+
+rows are first given an integer group code in one pass over the key columns (_group_codes)
+each aggregation then walks a value column once, updating one accumulator slot per group
+no per-group lists or sub-DataFrames are built (except for user-supplied functions)
+
+missing values (None, NA) are skipped by every aggregation except "size"
+"""
+import math
+from typing import Iterable
+
+from .na import NA
+from .categorical import _DuffelCategorical
+
+AGGS = ("sum", "count", "mean", "min", "max", "first", "last", "std", "var", "size")
+
+
+def _missing(v):
+    return v is None or v != v
+
+
+def _group_codes(keys: Iterable, dropna=True):
+    """
+    give every row the integer code of its group, in one pass
+        keys: list of key columns (one or more)
+    returns (codes, labels)
+        codes[i] is the group of row i, or -1 if the row is dropped for a missing key
+        labels[g] is the key of group g (a tuple if there are several key columns), in order of first appearance
+    a single Categorical key column is grouped by its codes, without hashing any value
+    """
+    if len(keys) == 1 and isinstance(keys[0], _DuffelCategorical):
+        return keys[0]._group_codes(dropna=dropna)
+    groups = {}
+    codes = []
+    append = codes.append
+    if len(keys) == 1:
+        for k in keys[0]:
+            if dropna and (k is None or k != k):
+                append(-1)
+                continue
+            g = groups.get(k)
+            if g is None:
+                g = groups[k] = len(groups)
+            append(g)
+    else:
+        for k in zip(*keys):
+            if dropna and any([x is None or x != x for x in k]):
+                append(-1)
+                continue
+            g = groups.get(k)
+            if g is None:
+                g = groups[k] = len(groups)
+            append(g)
+    return codes, list(groups)
+
+
+def _agg_count(codes, values, ngroups):
+    out = [0] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            out[g] += 1
+    return out
+
+
+def _agg_size(codes, values, ngroups):
+    out = [0] * ngroups
+    for g in codes:
+        if g >= 0:
+            out[g] += 1
+    return out
+
+
+def _agg_sum(codes, values, ngroups):
+    # start from the first value instead of 0 so that e.g. str columns concatenate
+    out = [None] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            s = out[g]
+            out[g] = v if s is None else s + v
+    return [0 if s is None else s for s in out]
+
+
+def _agg_min(codes, values, ngroups):
+    out = [None] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            m = out[g]
+            if m is None or v < m:
+                out[g] = v
+    return [NA if m is None else m for m in out]
+
+
+def _agg_max(codes, values, ngroups):
+    out = [None] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            m = out[g]
+            if m is None or v > m:
+                out[g] = v
+    return [NA if m is None else m for m in out]
+
+
+def _agg_first(codes, values, ngroups):
+    out = [None] * ngroups
+    seen = [False] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and not seen[g] and v is not None and v == v:
+            out[g] = v
+            seen[g] = True
+    return [v if s else NA for v, s in zip(out, seen)]
+
+
+def _agg_last(codes, values, ngroups):
+    out = [None] * ngroups
+    seen = [False] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            out[g] = v
+            seen[g] = True
+    return [v if s else NA for v, s in zip(out, seen)]
+
+
+def _agg_moments(codes, values, ngroups):
+    """per-group count, mean, and sum of squared deviations (Welford's online update)"""
+    count = [0] * ngroups
+    mean = [0.0] * ngroups
+    m2 = [0.0] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            n = count[g] + 1
+            count[g] = n
+            delta = v - mean[g]
+            mean[g] += delta / n
+            m2[g] += delta * (v - mean[g])
+    return count, mean, m2
+
+
+def _agg_mean(codes, values, ngroups):
+    count = [0] * ngroups
+    total = [0] * ngroups
+    for g, v in zip(codes, values):
+        if g >= 0 and v is not None and v == v:
+            count[g] += 1
+            total[g] += v
+    return [s / n if n else NA for s, n in zip(total, count)]
+
+
+def _agg_var(codes, values, ngroups, ddof=1):
+    count, mean, m2 = _agg_moments(codes, values, ngroups)
+    return [m / (n - ddof) if n > ddof else NA for n, m in zip(count, m2)]
+
+
+def _agg_std(codes, values, ngroups, ddof=1):
+    return [
+        v if v != v else math.sqrt(v) for v in _agg_var(codes, values, ngroups, ddof)
+    ]
+
+
+_KERNELS = {
+    "sum": _agg_sum,
+    "count": _agg_count,
+    "mean": _agg_mean,
+    "min": _agg_min,
+    "max": _agg_max,
+    "first": _agg_first,
+    "last": _agg_last,
+    "std": _agg_std,
+    "var": _agg_var,
+    "size": _agg_size,
+}
+
+
+def _aggregate(codes, values, ngroups, func):
+    """
+    aggregate one value column by group
+        func: one of AGGS, or a function that takes the list of a group's values
+    """
+    if callable(func):
+        # user functions need each group's values; this is the only per-group list
+        groups = [[] for _ in range(ngroups)]
+        for g, v in zip(codes, values):
+            if g >= 0:
+                groups[g].append(v)
+        return [func(x) for x in groups]
+    assert func in _KERNELS, f"duffel aggregation must be in {AGGS} or a function, not {func}"
+    return _KERNELS[func](codes, values, ngroups)
+
+
+def _func_name(func):
+    return func if isinstance(func, str) else getattr(func, "__name__", str(func))
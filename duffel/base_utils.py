@@ -46,7 +46,7 @@ def _base_concat(values, axis=0, ignore_index=True):
         if hasattr(x, "columns"):
             for col in columns:
                 if col in x.columns:
-                    data[col].extend([row[x._rep_columns[col]] for row in x.values])
+                    data[col].extend(x._get_column(col))
                 else:
                     data[col].extend([None for row in range(x._nrow)])
         # is dataframe
@@ -60,7 +60,7 @@ def _base_concat(values, axis=0, ignore_index=True):
 
     # create index
     if ignore_index == True:
-        index = list(range(nrow))
+        index = range(nrow)
     else:
         index = [i for y in [x.index for x in values] for i in y]
         assert (
@@ -0,0 +1,233 @@
+"""
+the .duffel binary columnar file format
+
+    magic        8 bytes   b"DUFFEL\\x00\\x01"
+    header size  8 bytes   little-endian unsigned
+    header       json      nrow, byte order, the index, and one entry per column:
+                           its name, kind, and where its buffers are (offset from the data section, size)
+    data                   every buffer, each starting on an 8-byte boundary
+
+column kinds:
+    "q", "d"     the raw bytes of an array.array("q") / ("d"); read back as a zero-copy memoryview of an mmap
+    "str"        all values utf-8 encoded and joined with NUL; missing values are flagged in a byte mask
+                 (1 = None, 2 = NA) and stored as ""
+    "category"   the codes buffer of a Categorical, with its categories in the header
+    "json"       anything else, as one json list (bools, mixed types, lists with missing ints, ...)
+
+only the columns asked for are read: each one is a seek and a read (or a slice of the mmap)
+"""
+from array import array
+from itertools import compress
+from typing import Iterable
+import json
+import mmap as _mmap
+import struct
+import sys
+
+from .na import NA
+from .index import _DuffelRangeIndex, _ensure_index
+from .categorical import _DuffelCategorical
+
+MAGIC = b"DUFFEL\x00\x01"
+VERSION = 1
+
+_ALIGN = 8
+
+
+def _encode_strings(values):
+    """(utf-8 blob, missing mask or None) for a column of str and missing values; None if it isn't one"""
+    mask = None
+    out = []
+    for i, v in enumerate(values):
+        if type(v) is str:
+            if "\x00" in v:
+                return None
+            out.append(v)
+        elif v is None or (type(v) is float and v != v):
+            if mask is None:
+                mask = bytearray(len(values))
+            mask[i] = 1 if v is None else 2
+            out.append("")
+        else:
+            return None
+    return "\x00".join(out).encode("utf-8"), mask
+
+
+def _encode(values):
+    """(column spec, list of buffers) for one column"""
+    if isinstance(values, array):
+        return {"kind": values.typecode}, [values]
+    if isinstance(values, memoryview):
+        return {"kind": values.format}, [values]
+    if isinstance(values, _DuffelCategorical):
+        codes = values._codes
+        spec = {
+            "kind": "category",
+            "codes": "B" if isinstance(codes, bytearray) else codes.typecode,
+            "categories": values.categories,
+        }
+        return spec, [codes]
+    strings = _encode_strings(values) if len(values) else None
+    if strings is not None:
+        blob, mask = strings
+        if mask is None:
+            return {"kind": "str"}, [blob]
+        return {"kind": "str", "mask": True}, [blob, mask]
+    return {"kind": "json"}, [json.dumps(list(values)).encode("utf-8")]
+
+
+def _write(df, path):
+    """write a DataFrame to path in the .duffel format"""
+    index = df.index
+    if isinstance(index, _DuffelRangeIndex):
+        r = index._labels
+        index_spec, index_buffers = (
+            {"kind": "range", "start": r.start, "stop": r.stop, "step": r.step},
+            [],
+        )
+    else:
+        index_spec, index_buffers = _encode(list(index))
+
+    specs, buffers = [], []
+    for spec, bufs in [(index_spec, index_buffers)] + [
+        _encode(df._get_column(col)) for col in df.columns
+    ]:
+        spec["buffers"] = []
+        for buf in bufs:
+            spec["buffers"].append(len(buffers))
+            buffers.append(buf)
+        specs.append(spec)
+
+    # offsets of every buffer from the start of the data section
+    sizes = [memoryview(b).nbytes for b in buffers]
+    offsets, pos = [], 0
+    for size in sizes:
+        offsets.append(pos)
+        pos += size + (-size % _ALIGN)
+    for spec in specs:
+        spec["buffers"] = [[offsets[i], sizes[i]] for i in spec["buffers"]]
+
+    index_spec, column_specs = specs[0], specs[1:]
+    for spec, col in zip(column_specs, df.columns):
+        spec["name"] = col
+    header = json.dumps(
+        {
+            "version": VERSION,
+            "nrow": len(df),
+            "byteorder": sys.byteorder,
+            "index": index_spec,
+            "index_name": df._index_name,
+            "columns": column_specs,
+        }
+    ).encode("utf-8")
+    header += b" " * (-(len(header) + 16) % _ALIGN)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for buf, size in zip(buffers, sizes):
+            f.write(buf)
+            f.write(bytes(-size % _ALIGN))
+    return True
+
+
+def _read_header(f):
+    """(header dict, file position where the data section starts)"""
+    magic = f.read(len(MAGIC))
+    assert magic == MAGIC, "duffel.read_duffel file is not a .duffel file"
+    (size,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(size).decode("utf-8"))
+    assert (
+        header["version"] <= VERSION
+    ), f"duffel.read_duffel file version {header['version']} is newer than this duffel ({VERSION})"
+    return header, len(MAGIC) + 8 + size
+
+
+def _decode(spec, buffers, swap, view):
+    """
+    values of one column from its spec and its buffers (memoryviews)
+    view: numeric columns are returned as memoryviews of the buffers instead of copied into arrays
+    """
+    kind = spec["kind"]
+    if kind in ("q", "d"):
+        (buf,) = buffers
+        if view and not swap:
+            return buf.cast(kind)
+        values = array(kind)
+        values.frombytes(buf)
+        if swap:
+            values.byteswap()
+        return values
+    if kind == "category":
+        (buf,) = buffers
+        if spec["codes"] == "B":
+            codes = bytearray(buf)
+        else:
+            codes = array(spec["codes"])
+            codes.frombytes(buf)
+            if swap:
+                codes.byteswap()
+        table = [NA] + spec["categories"]
+        lookup = {v: i for i, v in enumerate(table) if i}
+        return _DuffelCategorical._from_codes(codes, table, lookup)
+    if kind == "str":
+        values = str(buffers[0], "utf-8").split("\x00")
+        if spec.get("mask"):
+            mask = buffers[1]
+            for i in compress(range(len(mask)), mask):
+                values[i] = None if mask[i] == 1 else NA
+        return values
+    return json.loads(str(buffers[0], "utf-8"))
+
+
+def _read(cls, path, columns: Iterable = None, mmap=True, storage="columns"):
+    """read a .duffel file into a cls (DataFrame); see duffel.read_duffel"""
+    with open(path, "rb") as f:
+        header, start = _read_header(f)
+        swap = header["byteorder"] != sys.byteorder
+        specs = header["columns"]
+        if columns is not None:
+            by_name = {spec["name"]: spec for spec in specs}
+            for col in columns:
+                assert col in by_name, f"duffel.read_duffel column ({col}) not in file"
+            specs = [by_name[col] for col in columns]
+
+        view = mmap and header["nrow"] > 0
+        if view:
+            data = memoryview(_mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ))
+
+            def buffers(spec):
+                return [data[start + o : start + o + n] for o, n in spec["buffers"]]
+
+        else:
+
+            def buffers(spec):
+                out = []
+                for o, n in spec["buffers"]:
+                    f.seek(start + o)
+                    out.append(memoryview(f.read(n)))
+                return out
+
+        index_spec = header["index"]
+        if index_spec["kind"] == "range":
+            index = _DuffelRangeIndex(
+                index_spec["start"], index_spec["stop"], index_spec["step"]
+            )
+        else:
+            index = _ensure_index(
+                list(_decode(index_spec, buffers(index_spec), swap, False))
+            )
+        data_columns = [_decode(spec, buffers(spec), swap, view) for spec in specs]
+
+    df = cls._from_columns(
+        data_columns,
+        [spec["name"] for spec in specs],
+        index,
+        index_name=header["index_name"],
+        storage=storage,
+    )
+    if view and storage == "columns":
+        # numeric columns are read-only views of the file: copy them before any change in place
+        df._shared = True
+    return df
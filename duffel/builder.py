@@ -0,0 +1,198 @@
+"""
+building DataFrames row by row
+
+rows are collected in a plain list and the DataFrame (and its index) is built once at the end,
+so collecting n rows costs O(n) instead of rebuilding anything per row
+"""
+from typing import Iterable, Mapping
+from contextlib import contextmanager
+import gc
+from itertools import chain
+from operator import itemgetter
+
+from .index import _DuffelRangeIndex, _ensure_index
+from . import storage as _storage
+
+
+def _row_values(row, columns, rep_columns):
+    """one row given as a list/tuple or a dict of column -> value, as a full-width list"""
+    ncol = len(columns)
+    if type(row) in (list, tuple) and len(row) == ncol:
+        # the common case, without the slower Mapping check
+        return list(row)
+    if isinstance(row, Mapping):
+        for key in row:
+            assert key in rep_columns, f"DF append column ({key}) not in columns"
+        return [row.get(col) for col in columns]
+    row = list(row)
+    assert (
+        len(row) <= ncol
+    ), f"DF append values must container <= number of values as columns in DF; {len(row)} is too many"
+    if len(row) < ncol:
+        row.extend([None] * (ncol - len(row)))
+    return row
+
+
+@contextmanager
+def _paused_gc():
+    """
+    turn off the cyclic garbage collector while building many rows
+    row lists can't form cycles, but allocating millions of them triggers collections that rescan
+    every row built so far, which costs more than building them
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _getter(columns):
+    """function of a dict that returns the values of columns as a list; raises KeyError if one is missing"""
+    if not columns:
+        return lambda record: []
+    if len(columns) == 1:
+        key = columns[0]
+        return lambda record: [record[key]]
+    get = itemgetter(*columns)
+    return lambda record: list(get(record))
+
+
+def _record_rows(records: Iterable, columns=None):
+    """
+    full-width rows and their columns from an iterable of dicts or of lists/tuples, in one pass
+        dicts: keys become columns in order of first appearance, unless columns is given
+               (then only those keys are kept); missing keys are None
+        lists/tuples: short rows are padded with None
+    returns (rows, columns)
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return [], tuple(columns or ())
+    records = chain([first], records)
+    if not isinstance(first, Mapping):
+        rows = list(map(list, records))
+        ncol = max(map(len, rows))
+        if columns is not None:
+            columns = tuple(columns)
+            assert (
+                len(columns) >= ncol
+            ), f"DF columns length ({len(columns)}) must match length of values ({ncol})"
+            ncol = len(columns)
+        for row in rows:
+            if len(row) < ncol:
+                row.extend([None] * (ncol - len(row)))
+        return rows, tuple(range(ncol)) if columns is None else columns
+
+    # the dict is an ordered set of the columns seen so far
+    fixed = columns is not None
+    seen = dict.fromkeys(columns if fixed else first)
+    names = list(seen)
+    get = _getter(names)
+    rows = []
+    append = rows.append
+    ragged = False
+    for record in records:
+        try:
+            row = get(record)
+            if fixed or len(record) == len(names):
+                append(row)
+                continue
+        except KeyError:
+            if fixed:
+                append([record.get(k) for k in names])
+                continue
+        # a record with keys not seen before: they go at the end, earlier rows are padded later
+        new = [k for k in record if k not in seen]
+        if new:
+            seen.update(dict.fromkeys(new))
+            names.extend(new)
+            get = _getter(names)
+            ragged = True
+        append([record.get(k) for k in names])
+    if ragged:
+        ncol = len(names)
+        for row in rows:
+            if len(row) < ncol:
+                row.extend([None] * (ncol - len(row)))
+    return rows, tuple(names)
+
+
+class _DuffelBuilder(object):
+    """
+    collects rows and builds a DataFrame once, at the end; get one from DataFrame.builder(columns)
+
+        builder = duffel.DataFrame.builder(["id", "event"])
+        for event in queue:
+            builder.append(event)  # a list/tuple or a dict of column -> value
+        df = builder.build()
+
+    rows without an index label are numbered 0..n-1; either give every row a label or none
+    """
+
+    def __init__(self, cls, columns: Iterable, storage="rows"):
+        assert (
+            storage in _storage.STORAGE_TYPES
+        ), f"DF storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+        self._cls = cls
+        self.columns = tuple(columns)
+        self.storage = storage
+        self._rep_columns = {k: v for v, k in enumerate(self.columns)}
+        assert len(self._rep_columns) == len(
+            self.columns
+        ), "DF columns values must be unique"
+        self._rows = []
+        self._labels = None
+
+    def append(self, row, index=None):
+        """add one row; returns the builder"""
+        self._add_labels(None if index is None else [index], 1)
+        self._rows.append(_row_values(row, self.columns, self._rep_columns))
+        return self
+
+    def append_rows(self, rows: Iterable, index: Iterable = None):
+        """add many rows; returns the builder"""
+        columns, rep_columns = self.columns, self._rep_columns
+        rows = [_row_values(row, columns, rep_columns) for row in rows]
+        self._add_labels(None if index is None else list(index), len(rows))
+        self._rows.extend(rows)
+        return self
+
+    def _add_labels(self, labels, n):
+        if labels is None:
+            assert (
+                self._labels is None
+            ), "DF builder rows must all have an index label or none may"
+            return
+        assert len(labels) == n, f"DF builder got {len(labels)} index labels for {n} rows"
+        if self._labels is None:
+            assert not self._rows, "DF builder rows must all have an index label or none may"
+            self._labels = []
+        self._labels.extend(labels)
+
+    def build(self):
+        """the DataFrame of every row added so far; the builder starts over empty"""
+        rows, labels = self._rows, self._labels
+        self._rows, self._labels = [], None
+        if labels is None:
+            index = _DuffelRangeIndex(len(rows))
+        else:
+            index = _ensure_index(labels)
+            assert index.is_unique, "DF index values must be unique"
+        if self.storage == "columns":
+            return self._cls._from_columns(
+                _storage._to_columns(rows, len(self.columns)),
+                self.columns,
+                index,
+                storage="columns",
+            )
+        return self._cls._from_rows(rows, self.columns, index)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"duffel.Builder(columns={list(self.columns)}, rows={len(self)})"
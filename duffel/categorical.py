@@ -0,0 +1,275 @@
+"""
+dictionary-encoded (categorical) columns
+
+a Categorical stores one small integer code per row plus a table of the distinct values
+    - code 0 is a missing value (None / NA); the categories are codes 1, 2, ...
+    - up to 255 categories the codes are a bytearray (one byte per row), so == and isin are a single
+      bytes.translate over the codes, straight into a Mask's bytearray
+    - beyond that they widen to array("I")
+    - groupby, value_counts and merge key on the codes instead of hashing every value
+
+it behaves like a read-only list of its values (len, [], iteration), so code that only reads columns
+works on it unchanged; writes (col[i] = v, append, extend) add new categories as needed
+
+the category table is shared between a Categorical and the slices / copies taken from it;
+adding a category replaces the table instead of changing it, so sharing is always safe
+"""
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Iterable
+
+from .na import NA
+
+# codes 0..255 fit in a bytearray; code 0 is missing, so 255 categories
+_NARROW = 255
+
+
+def _missing(v):
+    return v is None or v != v
+
+
+class _DuffelCategorical(object):
+    """
+    a column of values stored as integer codes into a table of categories
+    build one from any iterable of values, e.g. DataFrame.astype("category") or read_csv(dtype={"gender": "category"})
+    """
+
+    def __init__(self, values: Iterable = (), categories: Iterable = None):
+        if isinstance(values, _DuffelCategorical) and categories is None:
+            self._codes = values._codes[:]
+            self._table, self._lookup = values._table, values._lookup
+            return
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        if categories is None:
+            # distinct values in order of first appearance, found at C speed
+            categories = [v for v in dict.fromkeys(values) if not _missing(v)]
+            fixed = False
+        else:
+            categories = list(dict.fromkeys(categories))
+            assert not any(
+                [_missing(v) for v in categories]
+            ), "duffel categories can't contain missing values"
+            fixed = True
+        self._table = [NA] + categories
+        self._lookup = {v: i for i, v in enumerate(self._table) if i}
+        self._codes = self._new_codes(len(categories))
+        self._codes.extend(self._encode(values, add=not fixed))
+
+    @classmethod
+    def _from_codes(cls, codes, table, lookup):
+        """wrap codes and a category table without copying or checking them"""
+        self = cls.__new__(cls)
+        self._codes = codes
+        self._table = table
+        self._lookup = lookup
+        return self
+
+    @classmethod
+    def _from_strings(cls, values: Iterable):
+        """encode a column of raw csv strings; empty strings are missing"""
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        categories = [v for v in dict.fromkeys(values) if v != ""]
+        table = [NA] + categories
+        lookup = {v: i for i, v in enumerate(table) if i}
+        codes = cls._new_codes(len(categories))
+        codes.extend(map({**lookup, "": 0}.__getitem__, values))
+        return cls._from_codes(codes, table, lookup)
+
+    #####################################################################################
+    # internals
+    #####################################################################################
+
+    @staticmethod
+    def _new_codes(ncategories):
+        return bytearray() if ncategories <= _NARROW else array("I")
+
+    def _widen(self):
+        """switch to array("I") codes once there are too many categories for a byte"""
+        if isinstance(self._codes, bytearray) and len(self._table) - 1 > _NARROW:
+            # iter(): array() would read a bytearray as raw bytes instead of one code per byte
+            self._codes = array("I", iter(self._codes))
+
+    def _add(self, value):
+        """code of a new category; the table and lookup are replaced, not changed in place"""
+        code = len(self._table)
+        self._table = self._table + [value]
+        self._lookup = dict(self._lookup)
+        self._lookup[value] = code
+        self._widen()
+        return code
+
+    def _code(self, value, add=True):
+        """code of value; None if value is not a category and add is False"""
+        code = self._lookup.get(value)
+        if code is not None:
+            return code
+        if _missing(value):
+            return 0
+        return self._add(value) if add else None
+
+    def _encode(self, values: Iterable, add=True):
+        """codes of values (values that aren't categories become missing if add is False)"""
+        lookup = self._lookup
+        get = lookup.get
+        codes = list(map(get, values))
+        if None in codes:
+            codes = [
+                c if c is not None else (self._code(v, add) or 0)
+                for c, v in zip(codes, values)
+            ]
+        return codes
+
+    def _codes_for(self, values: Iterable):
+        """codes of values without adding categories; values that aren't categories get None"""
+        get = self._lookup.get
+        return [0 if _missing(v) else get(v) for v in values]
+
+    def _remap(self, other):
+        """list that maps each code of other to the code of the same value here, adding categories"""
+        return [0] + [self._code(v) for v in other._table[1:]]
+
+    def _hits(self, values: Iterable):
+        """bytearray of 0/1 per row: whether the row's value is one of values"""
+        wanted = set()
+        for v in values:
+            code = self._code(v, add=False)
+            if code is not None:
+                wanted.add(code)
+        if isinstance(self._codes, bytearray):
+            table = bytearray(256)
+            for code in wanted:
+                table[code] = 1
+            return self._codes.translate(table)
+        return bytearray(map(wanted.__contains__, self._codes))
+
+    def _equal(self, value):
+        """bytearray of 0/1 per row: whether the row equals value (missing never does)"""
+        if _missing(value):
+            return bytearray(len(self._codes))
+        return self._hits([value])
+
+    def _isin(self, values: Iterable):
+        """bytearray of 0/1 per row: whether the row is one of values (missing values match missing rows)"""
+        return self._hits(values)
+
+    def _group_codes(self, dropna=True):
+        """
+        groupby codes (see agg._group_codes) straight from the category codes, without hashing any value
+        returns (codes, labels), groups in order of first appearance
+        """
+        codes = self._codes
+        if isinstance(codes, bytearray):
+            # where each code first appears, one C-speed search per category
+            first = {c: codes.find(c) for c in range(len(self._table))}
+            seen = sorted([c for c in first if first[c] >= 0], key=first.__getitem__)
+        else:
+            seen = list(dict.fromkeys(codes))
+        if dropna and 0 in seen:
+            seen.remove(0)
+        remap = [-1] * len(self._table)
+        for g, code in enumerate(seen):
+            remap[code] = g
+        table = self._table
+        return list(map(remap.__getitem__, codes)), [table[c] for c in seen]
+
+    def _counts(self):
+        """dict of code -> number of rows, for the codes that appear"""
+        codes = self._codes
+        if isinstance(codes, bytearray):
+            counts = {c: codes.count(c) for c in range(len(self._table))}
+            return {c: n for c, n in counts.items() if n}
+        return dict(Counter(codes))
+
+    def _take(self, positions: Iterable):
+        """new Categorical of the rows at integer positions, sharing the category table"""
+        codes = self._codes
+        if isinstance(codes, bytearray):
+            codes = bytearray(map(codes.__getitem__, positions))
+        else:
+            codes = array("I", map(codes.__getitem__, positions))
+        return self._from_codes(codes, self._table, self._lookup)
+
+    def _compress(self, selectors):
+        """new Categorical of the rows where selectors is true"""
+        codes = self._codes
+        if isinstance(codes, bytearray):
+            codes = bytearray(compress(codes, selectors))
+        else:
+            codes = array("I", compress(codes, selectors))
+        return self._from_codes(codes, self._table, self._lookup)
+
+    def _copy(self):
+        return self._from_codes(self._codes[:], self._table, self._lookup)
+
+    #####################################################################################
+    # interface
+    #####################################################################################
+
+    @property
+    def categories(self):
+        return self._table[1:]
+
+    @property
+    def codes(self):
+        """the category code of each row as a list; -1 for missing values"""
+        return [c - 1 for c in self._codes]
+
+    # codes are computed before self._codes is looked up: a new category may widen the codes
+
+    def append(self, value):
+        code = self._code(value)
+        self._codes.append(code)
+
+    def extend(self, values: Iterable):
+        if isinstance(values, _DuffelCategorical):
+            if values._table is self._table:
+                self._codes.extend(values._codes)
+                return
+            remap = self._remap(values)
+            if isinstance(self._codes, bytearray) and isinstance(
+                values._codes, bytearray
+            ):
+                table = bytes(remap + [0] * (256 - len(remap)))
+                self._codes.extend(values._codes.translate(table))
+            else:
+                self._codes.extend(map(remap.__getitem__, values._codes))
+            return
+        codes = self._encode(list(values))
+        self._codes.extend(codes)
+
+    def tolist(self):
+        return list(map(self._table.__getitem__, self._codes))
+
+    #####################################################################################
+    # special methods
+    #####################################################################################
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._from_codes(self._codes[i], self._table, self._lookup)
+        return self._table[self._codes[i]]
+
+    def __setitem__(self, i, value):
+        self._codes[i] = self._code(value)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        return map(self._table.__getitem__, self._codes)
+
+    def __eq__(self, other):
+        if isinstance(other, _DuffelCategorical):
+            return self.tolist() == other.tolist()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        shown = ", ".join([repr(v) for v in self[:10]])
+        more = ", ..." if len(self) > 10 else ""
+        ncat = len(self._table) - 1
+        return (
+            f"duffel.Categorical([{shown}{more}], len={len(self)}, categories={ncat})"
+        )
@@ -1,25 +1,58 @@
 from typing import Iterable, Mapping, Collection
+from collections import Counter
+from itertools import repeat
+import operator
 
 from .loc import _Loc, _ILoc
 from .na import ndim
+from .index import _DuffelRangeIndex, _ensure_index
+from .mask import _DuffelMask
+from .categorical import _DuffelCategorical
+from .dtypes import _dtype_name
+from . import storage as _storage
+from . import stats as _stats
+
+
+def _compare_one(op, x, y):
+    try:
+        return bool(op(x, y))
+    except TypeError:
+        return op is operator.ne
+
+
+def _astype(values, dtype):
+    """values converted to dtype; missing values (None, NA) are kept as they are"""
+    dtype = _dtype_name(dtype)
+    if dtype == "category":
+        return _DuffelCategorical(values)
+    if isinstance(values, _DuffelCategorical):
+        # convert each category once
+        table = [values._table[0]] + _astype(values.categories, dtype)
+        return list(map(table.__getitem__, values._codes))
+    if dtype == "object":
+        return list(values)
+    convert = {"int": int, "float": float, "bool": bool, "str": str}[dtype]
+    return [v if v is None or v != v else convert(v) for v in values]
 
 
 class _DuffelCol(object):
-    def __init__(self, values, name=None, index=None):
+    def __init__(self, values, name=None, index=None, **kwargs):
         self.name = name
 
+        # values borrowed from a DataFrame's columnar storage are copied before any write
+        self._shared = kwargs.get("_shared", False)
+
         # create index
         if index is not None:
             assert isinstance(index, Iterable), "_DuffelCol index must be an iterable"
-            assert len(index) == len(
-                set(index)
-            ), "_DuffelCol index values must be unique"
+            index = _ensure_index(index)
+            assert index.is_unique, "_DuffelCol index values must be unique"
             assert len(index) == len(
                 values
             ), f"_DuffelCol index length ({len(index)}) must match number of rows ({len(values)})"
             self.index = index
         else:
-            self.index = [x for x in range(len(values))]
+            self.index = _DuffelRangeIndex(len(values))
 
         # ingest values
         if isinstance(values, str):
@@ -38,8 +71,7 @@ class _DuffelCol(object):
             else:
                 self.values = [values]
 
-        self._rep_index = {k: v for v, k in enumerate(self.index)}
-        self._nrow = len(self._rep_index)
+        self._nrow = len(self.index)
         self.loc = _Loc(self)
         self.iloc = _ILoc(self)
         self.shape = (self._nrow, 1)
@@ -47,31 +79,43 @@ class _DuffelCol(object):
     #####################################################################################
     # internals
     #####################################################################################
-    def _invert_rep_index(self):
-        return {v: k for k, v in self._rep_index.items()}
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = _ensure_index(index)
 
-    def _col(self, rows):
+    def _col(self, positions):
         return _DuffelCol(
-            [
-                val
-                for val in [x for ix, x in zip(self.index, self.values) if ix in rows]
-            ],
+            _storage._take(self.values, positions),
             name=self.name,
-            index=rows,
+            index=self.index._take(positions),
         )
 
     def _subset_loc(self, rows):
         """
         implement .loc indexing behavior
-        transform rows to index values and return subset
+        transform rows to integer positions and return subset
         """
         ### rows
+        # label slice => positional slice; both ends inclusive
         if isinstance(rows, slice):
-            # get list of row index values based on the slicer
-            rows = self.index[rows]
-        # rows is a string or an int - leave it be but check validity
+            rows = self.index._slice_positions(rows)
+        # rows is a string or an int - look up its position
         elif isinstance(rows, str) or isinstance(rows, int):
-            self._rep_index[rows]  # throws keyerror if index doesn't exist
+            rows = self.index.get_loc(rows)  # throws keyerror if index doesn't exist
+        # rows is a Mask => gather the selected values straight from it
+        elif isinstance(rows, _DuffelMask):
+            assert (
+                len(rows) == self._nrow
+            ), f"Mask length ({len(rows)}) must match length of data ({self._nrow})"
+            return _DuffelCol(
+                rows._compress(self.values),
+                name=self.name,
+                index=self.index._take(rows._positions()),
+            )
         # rows is a list of row index values
         elif isinstance(rows, Iterable):
             # if list of booleans
@@ -80,57 +124,57 @@ class _DuffelCol(object):
                 assert (
                     thislen == self._nrow
                 ), f"Boolean subsetter length ({thislen}) must match length of data ({self._nrow})"
-                rows = [i for truth, i in zip(rows, self.index) if truth]
+                rows = [i for i, truth in enumerate(rows) if truth]
 
             # list of row indexes
             else:
-                [
-                    self._rep_index[i] for i in rows
+                get_loc = self.index.get_loc
+                rows = [
+                    get_loc(i) for i in rows
                 ]  # throws keyerror if any index value doesn't exist
         else:
             raise ValueError(
                 "Must subset rows with slice, index value, or iterable of index values"
             )
 
-        ###
-        # at this point:
-        # rows is either a valid row index value or a list of valid index values
-        #
-        # this means we can freely use self._rep_index to call integer index locations of each
-        ###
-
-        ### return subset
-        # single row => return single value
-        if ndim(rows) == 0:
-            return self.values[self._rep_index[rows]]
-
-        # multiple rows => _DuffelCol
-        elif ndim(rows) == 1:
-            return self._col(rows)
+        return self._subset_positions(rows)
 
     def _subset_iloc(self, rows):
         """
         implement .iloc indexing behavior
-        only goal is to transform rows to row index values and pass to .loc
+        rows are already integer positions
         """
-        # a slice or int indexer can operate directly on the list of indexes
         if isinstance(rows, slice) or isinstance(rows, int):
-            rows = self.index[rows]
+            pass
 
-        # if list of numbers, then check valid type and convert to index values
+        # if list of numbers, then check valid type
         elif isinstance(rows, Iterable):
             assert list(set([type(x) for x in rows])) == [
                 int
             ], ".iloc rows must be integer or iterable of integers"
-            inverted = self._invert_rep_index()
-            rows = [inverted[i] for i in rows]
 
         # bad type
         else:
             raise ValueError(f".iloc rows must be integer or iterable of integers")
 
-        # pass to .loc
-        return self._subset_loc(rows)
+        return self._subset_positions(rows)
+
+    def _subset_positions(self, rows):
+        """
+        shared back end of .loc and .iloc
+        rows is an integer position, a positional slice, or a list of integer positions
+        """
+        if isinstance(rows, slice):
+            rows = range(self._nrow)[rows]
+
+        ### return subset
+        # single row => return single value
+        if ndim(rows) == 0:
+            return self.values[rows]
+
+        # multiple rows => _DuffelCol
+        elif ndim(rows) == 1:
+            return self._col(rows)
 
     #####################################################################################
     # interface
@@ -148,13 +192,41 @@ class _DuffelCol(object):
         return self.iteritems()
 
     def head(self, n=6):
-        return self._subset_loc(slice(0, n, None))
+        return self._subset_iloc(slice(0, n, None))
 
     def tail(self, n=6):
-        return self._subset_loc(slice(0, n, None))
+        return self._subset_iloc(slice(-n, None, None))
 
     def value_counts(self, dropna=False):
-        pass
+        """
+        number of rows of each distinct value, most common first, as a Col indexed by value
+        a categorical column counts its codes instead of hashing every value
+        """
+        values = self.values
+        if isinstance(values, _DuffelCategorical):
+            table = values._table
+            counts = [
+                (table[c], n) for c, n in values._counts().items() if c or not dropna
+            ]
+        else:
+            counts = Counter(values).items()
+            if dropna:
+                counts = [(v, n) for v, n in counts if not (v is None or v != v)]
+        counts = sorted(counts, key=lambda x: -x[1])
+        return _DuffelCol(
+            [n for v, n in counts], name=self.name, index=[v for v, n in counts]
+        )
+
+    def nunique(self, dropna: bool = True):
+        """number of distinct values"""
+        return _stats._col_nunique(self.values, dropna)
+
+    def astype(self, dtype):
+        """
+        new Col with the values converted to dtype ("int", "float", "bool", "str", "object", or "category")
+        missing values stay missing
+        """
+        return _DuffelCol(_astype(self.values, dtype), name=self.name, index=self.index)
 
     #####################################################################################
     # special methods
@@ -164,7 +236,10 @@ class _DuffelCol(object):
         assert (
             index in self.index
         ), f"_DuffelCol index value must exist; ({index}) not in index"
-        self.values[self._rep_index[index]] = value
+        if self._shared:
+            self.values = _storage._to_column(self.values)
+            self._shared = False
+        self.values = _storage._set_value(self.values, self.index.get_loc(index), value)
 
     def __getitem__(self, index):
         return self._subset_loc(index)
@@ -172,28 +247,67 @@ class _DuffelCol(object):
     def __len__(self):
         return self._nrow
 
-    def __eq__(self, eq):
-        """
-        item-wise equality of eq to each item in values
+    def _compare(self, other, op):
         """
-        if ndim(eq)==0:
-            return [x==eq for x in self.values]
-        
-        elif isinstance(eq, Iterable):
-            assert len(eq)==self._nrow, f"Col vector comparison lengths must match; dataframe has {self._nrow}, comparison has {len(eq)}"
-            return [x==y for x,y in zip(self.values, eq)]
-
-    def __ne__(self, eq):
+        item-wise comparison of each value with a scalar or with a same-length iterable (or Col)
+        returns a Mask; values that can't be compared (e.g. None < 1) are False (True for !=)
         """
-        item-wise comparison of eq to each item in values
-        """
-        if ndim(eq)==0:
-            return [x!=eq for x in self.values]
-        
-        elif isinstance(eq, Iterable):
-            assert len(eq)==self._nrow, f"Col vector comparison lengths must match; dataframe has {self._nrow}, comparison has {len(eq)}"
-            return [x!=y for x,y in zip(self.values, eq)]
+        values = self.values
+        if isinstance(other, _DuffelCol):
+            other = other.values
+        scalar = ndim(other) == 0
+        if (
+            scalar
+            and isinstance(values, _DuffelCategorical)
+            and op in (operator.eq, operator.ne)
+        ):
+            # compare category codes, not values
+            equal = _DuffelMask._from_bytes(values._equal(other))
+            return equal if op is operator.eq else ~equal
+        if not scalar:
+            assert (
+                len(other) == self._nrow
+            ), f"Col vector comparison lengths must match; dataframe has {self._nrow}, comparison has {len(other)}"
+        try:
+            return _DuffelMask._from_bytes(
+                bytearray(map(op, values, repeat(other) if scalar else other))
+            )
+        except TypeError:
+            return _DuffelMask._from_bytes(
+                bytearray(
+                    [
+                        _compare_one(op, x, y)
+                        for x, y in zip(values, repeat(other) if scalar else other)
+                    ]
+                )
+            )
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def isin(self, values: Iterable):
+        """Mask of the values that are in values"""
+        values = set(values)
+        if isinstance(self.values, _DuffelCategorical):
+            return _DuffelMask._from_bytes(self.values._isin(values))
+        return _DuffelMask._from_bytes(bytearray([x in values for x in self.values]))
 
+    __hash__ = None
 
     def __iter__(self):
         return self.values.__iter__()
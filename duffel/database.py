@@ -0,0 +1,287 @@
+"""
+reading and writing DB-API 2.0 connections (sqlite3, psycopg2, ...; a SQLAlchemy engine is used
+through its raw_connection)
+
+reads fetch arraysize rows per cursor.fetchmany and extend each column with the batch, so rows go
+straight into columnar storage without a list of row lists in between
+
+writes send chunksize parameter tuples per cursor.executemany, all inside one transaction: the
+table is created (or replaced) and filled, or nothing changes
+
+duffel.sql runs a query over DataFrames by loading them into an in-memory sqlite database (see _query)
+"""
+from itertools import islice
+import re
+import sqlite3
+import sys
+import threading
+import weakref
+
+from .builder import _paused_gc
+from .dtypes import _column_dtype
+from .index import _DuffelRangeIndex
+
+# rows per fetchmany / executemany when no chunksize is given
+ARRAYSIZE = 1 << 13
+
+IF_EXISTS = ("fail", "replace", "append")
+
+# bools are stored as 0 / 1 INTEGER and read back as ints
+_SQL_TYPES = {"int": "INTEGER", "float": "REAL", "bool": "INTEGER"}
+
+
+def _connection(con):
+    """the DB-API connection behind con"""
+    if hasattr(con, "cursor"):
+        return con
+    if hasattr(con, "raw_connection"):
+        return con.raw_connection()
+    raise ValueError("duffel sql needs a DB-API connection (or a SQLAlchemy engine)")
+
+
+def _quote(name):
+    """name as a quoted sql identifier"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _placeholders(con, n):
+    """n parameter markers in the driver's paramstyle, comma separated"""
+    module = sys.modules.get(type(con).__module__.split(".")[0])
+    style = getattr(module, "paramstyle", "qmark")
+    if style == "qmark":
+        return ", ".join(["?"] * n)
+    if style in ("format", "pyformat"):
+        return ", ".join(["%s"] * n)
+    if style == "numeric":
+        return ", ".join([f":{i + 1}" for i in range(n)])
+    return ", ".join([f":p{i}" for i in range(n)])
+
+
+def _params(con, rows):
+    """parameter tuples / dicts for executemany in the driver's paramstyle"""
+    module = sys.modules.get(type(con).__module__.split(".")[0])
+    if getattr(module, "paramstyle", "qmark") != "named":
+        return rows
+    return [{f"p{i}": v for i, v in enumerate(row)} for row in rows]
+
+
+def _read(cls, statement, con, params=None, chunksize=None, storage="columns"):
+    """
+    generator behind duffel.read_sql
+    yields one DataFrame per fetchmany of chunksize rows, or exactly one if chunksize is None
+    """
+    cursor = _connection(con).cursor()
+    try:
+        cursor.arraysize = chunksize or ARRAYSIZE
+        if params is None:
+            cursor.execute(statement)
+        else:
+            cursor.execute(statement, params)
+        columns = [d[0] for d in cursor.description or ()]
+        ncol = len(columns)
+
+        start = 0
+        data = [[] for _ in range(ncol)]
+        rows = []
+        while True:
+            with _paused_gc():
+                batch = cursor.fetchmany()
+                if storage == "columns":
+                    for col, values in zip(data, zip(*batch)):
+                        col.extend(values)
+                else:
+                    rows.extend(map(list, batch))
+            if chunksize is not None and batch:
+                yield _frame(cls, data, rows, columns, start, storage)
+                start += len(batch)
+                data = [[] for _ in range(ncol)]
+                rows = []
+            if len(batch) < cursor.arraysize:
+                break
+        if chunksize is None:
+            yield _frame(cls, data, rows, columns, start, storage)
+    finally:
+        cursor.close()
+
+
+def _frame(cls, data, rows, columns, start, storage):
+    """one DataFrame of fetched rows; chunks continue the row numbering of the chunks before them"""
+    if storage == "columns":
+        nrow = len(data[0]) if data else 0
+        index = _DuffelRangeIndex(start, start + nrow)
+        with _paused_gc():
+            return cls._from_columns(data, columns, index, storage="columns")
+    return cls._from_rows(rows, columns, _DuffelRangeIndex(start, start + len(rows)))
+
+
+def _table_exists(cursor, con, table):
+    """
+    whether table exists, by selecting no rows from it
+    servers like postgres abort the transaction on the failed probe, so it's rolled back there;
+    sqlite3 (the connections with in_transaction) isn't affected, and any open transaction is kept
+    """
+    try:
+        cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+        cursor.fetchall()
+        return True
+    except Exception:
+        if not hasattr(con, "in_transaction"):
+            con.rollback()
+        return False
+
+
+def _write(df, name, con, if_exists="fail", index=False, chunksize=None):
+    """write a DataFrame to the table name; see DataFrame.to_sql"""
+    assert (
+        if_exists in IF_EXISTS
+    ), f"DF.to_sql if_exists must be in {IF_EXISTS}, not {if_exists}"
+    if chunksize is None:
+        chunksize = ARRAYSIZE
+    assert (
+        isinstance(chunksize, int) and chunksize > 0
+    ), f"DF.to_sql chunksize must be a positive integer, not {chunksize}"
+    con = _connection(con)
+
+    columns = list(df.columns)
+    types = [
+        _SQL_TYPES.get(_column_dtype(df._get_column(col)), "TEXT") for col in columns
+    ]
+    rows = df._rows()
+    if index:
+        columns = [df._index_name, *columns]
+        types = [_SQL_TYPES.get(_column_dtype(list(df.index)), "TEXT"), *types]
+        rows = ((label, *row) for label, row in zip(df.index, rows))
+    assert len(set(map(str, columns))) == len(
+        columns
+    ), f"DF.to_sql column names must be unique, not {columns}"
+
+    table = _quote(name)
+    create = ", ".join([f"{_quote(col)} {t}" for col, t in zip(columns, types)])
+    names = ", ".join(map(_quote, columns))
+    insert = f"INSERT INTO {table} ({names}) VALUES ({_placeholders(con, len(columns))})"
+
+    cursor = con.cursor()
+    try:
+        exists = _table_exists(cursor, con, table)
+        assert not (
+            exists and if_exists == "fail"
+        ), f"DF.to_sql table {name} already exists; pass if_exists='replace' or 'append'"
+        # sqlite3 doesn't open a transaction for CREATE / DROP by itself
+        if getattr(con, "in_transaction", True) is False:
+            cursor.execute("BEGIN")
+        try:
+            if exists and if_exists == "replace":
+                cursor.execute(f"DROP TABLE {table}")
+            if not exists or if_exists == "replace":
+                cursor.execute(f"CREATE TABLE {table} ({create})")
+            for batch in iter(lambda: list(islice(rows, chunksize)), []):
+                cursor.executemany(insert, _params(con, batch))
+        except BaseException:
+            con.rollback()
+            raise
+        con.commit()
+    finally:
+        cursor.close()
+    return True
+
+
+#####################################################################################
+# sql over DataFrames (duffel.sql)
+#####################################################################################
+
+# one in-memory sqlite database per thread (sqlite3 connections can't be shared between threads),
+# with the frames loaded into it: table name -> (weakref to the frame, its _version, indexed columns)
+# the frames themselves aren't kept alive; tables of frames that are gone are dropped, and beyond
+# MAX_TABLES the least recently used table is dropped
+_local = threading.local()
+
+MAX_TABLES = 32
+
+# table and column references: name.name, either part maybe "quoted"
+_REFERENCE = re.compile(r'(?:"([^"]+)"|(\w+))\s*\.\s*(?:"([^"]+)"|(\w+))')
+# keywords that can follow a table name, so aren't its alias, and that end an ON clause
+_KEYWORDS = "ON|USING|WHERE|JOIN|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|GROUP|ORDER|LIMIT|WINDOW|UNION"
+# FROM / JOIN table [AS] alias
+_TABLE = re.compile(
+    r'\b(?:FROM|JOIN)\s+(?:"([^"]+)"|(\w+))'
+    rf"(?:\s+(?:AS\s+)?(?!(?:{_KEYWORDS})\b)(\w+))?",
+    re.IGNORECASE,
+)
+# the condition of an ON clause, or the column list of USING
+_ON = re.compile(rf"\bON\b(.*?)(?=\b(?:{_KEYWORDS})\b|$)", re.IGNORECASE | re.DOTALL)
+_USING = re.compile(r"\bUSING\s*\(([^)]*)\)", re.IGNORECASE)
+
+
+def _engine():
+    """this thread's in-memory sqlite connection and its table cache"""
+    if not hasattr(_local, "con"):
+        _local.con = sqlite3.connect(":memory:")
+        _local.tables = {}
+    return _local.con, _local.tables
+
+
+def _clear():
+    """drop every table duffel.sql loaded in this thread (and its in-memory database)"""
+    if hasattr(_local, "con"):
+        _local.con.close()
+        del _local.con, _local.tables
+
+
+def _drop(con, tables, name):
+    con.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+    del tables[name]
+
+
+def _evict(con, tables, keep):
+    """drop the tables of frames that no longer exist, then the oldest ones beyond MAX_TABLES"""
+    for name in [name for name, (ref, _, _) in tables.items() if ref() is None]:
+        _drop(con, tables, name)
+    for name in list(tables)[: max(len(tables) - MAX_TABLES, 0)]:
+        if name not in keep:
+            _drop(con, tables, name)
+
+
+def _join_keys(query, tables):
+    """(table, column) pairs the query joins on, for tables (name -> columns) it reads"""
+    aliases = {name: name for name in tables}
+    for quoted, plain, alias in _TABLE.findall(query):
+        name = quoted or plain
+        if name in tables and alias:
+            aliases[alias] = name
+    keys = set()
+    for condition in _ON.findall(query):
+        for qa, a, qc, c in _REFERENCE.findall(condition):
+            name, column = aliases.get(qa or a), qc or c
+            if name is not None and column in tables[name]:
+                keys.add((name, column))
+    for names in _USING.findall(query):
+        for column in names.split(","):
+            column = column.strip().strip('"')
+            keys.update([(name, column) for name in tables if column in tables[name]])
+    return keys
+
+
+def _query(cls, query, frames, params=None, storage="columns"):
+    """
+    run query on this thread's in-memory sqlite database with each frame loaded as a table of its name
+    a frame that is the same object, unchanged (same _version), as the one last loaded under that name
+    isn't loaded again; the columns it is joined on get an index, kept with the table
+    """
+    con, tables = _engine()
+    for name, df in frames.items():
+        cached = tables.pop(name, None)
+        if cached is None or cached[0]() is not df or cached[1] != df._version:
+            _write(df, name, con, if_exists="replace")
+            cached = (weakref.ref(df), df._version, set())
+        # most recently used last
+        tables[name] = cached
+    _evict(con, tables, frames)
+
+    columns = {name: {str(col) for col in df.columns} for name, df in frames.items()}
+    for name, column in _join_keys(query, columns):
+        indexes = tables[name][2]
+        if column not in indexes:
+            index = _quote(f"{name}__{column}")
+            con.execute(f"CREATE INDEX {index} ON {_quote(name)} ({_quote(column)})")
+            indexes.add(column)
+    return next(_read(cls, query, con, params, storage=storage))
@@ -1,20 +1,55 @@
 from typing import Iterable, Mapping, Optional, List
-from functools import reduce
+from itertools import islice
 from collections import Counter
 import random
 import json
 import csv
+import io
 
 from .na import ndim, NA
 from .row import _DuffelRow
-from .col import _DuffelCol
+from .col import _DuffelCol, _astype
+from .mask import _DuffelMask
 from .loc import _Loc, _ILoc
+from .index import _DuffelIndex, _DuffelRangeIndex, _ensure_index
+from .dtypes import _column_dtype
+from .groupby import _DuffelGroupBy
+from .merge import _merge
+from .pivot import _pivot_table
+from .lazy import _DuffelLazyFrame, _frame_source
+from .builder import _DuffelBuilder, _row_values, _record_rows, _paused_gc
+from .expr import _DuffelExpr
 from . import base_utils
+from . import storage as _storage
+from . import stats as _stats
+from . import binary as _binary
+from . import fileio as _fileio
+from . import database as _database
+
+# rows formatted per write() call by the streaming writers
+_WRITE_BATCH = 1 << 12
+
+
+def _json_value(obj):
+    """json.dump default for the duffel objects to_dict can return: an Index is a list, a Col a dict"""
+    if isinstance(obj, _DuffelCol):
+        return dict(zip(obj.index, obj.values))
+    if isinstance(obj, _DuffelIndex):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class _DuffelDataFrame(object):
-    def __init__(self, values, columns=None, index=None, **kwargs):
+    # bumped by every change in place (see _get_shape), so caches (duffel.sql) can tell a frame changed
+    _version = 0
+
+    def __init__(self, values, columns=None, index=None, storage="rows", **kwargs):
         # ingest an existing dataframe
+        assert (
+            storage in _storage.STORAGE_TYPES
+        ), f"DF storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+        self._columnar = False
+        self._shared = False
 
         if columns is not None:
             self.columns = tuple(list(columns))  # throws error if columns not iterator
@@ -42,16 +77,17 @@ class _DuffelDataFrame(object):
         # create index
         if index is not None:
             assert isinstance(index, Iterable), "DF index must be an iterable"
-            assert len(index) == len(set(index)), "DF index values must be unique"
+            index = _ensure_index(index)
+            assert index.is_unique, "DF index values must be unique"
             assert len(index) == len(
                 self.values
             ), f"DF index length ({len(index)}) must match number of rows ({len(self.values)})"
             self.index = index
-        elif hasattr(self, "index") and self.index is not None:
+        elif hasattr(self, "_index"):
             # it was created by being a dict of dicts
             pass
         else:
-            self.index = [x for x in range(len(self.values))]
+            self.index = _DuffelRangeIndex(len(self.values))
 
         # named index
         if "_index_name" in kwargs and not kwargs["_index_name"] is None:
@@ -71,14 +107,17 @@ class _DuffelDataFrame(object):
             ), f"DF columns length ({len(columns)}) must match length of values ({len(values[0])})"
             self.columns = tuple(columns)
         else:
-            self.columns = tuple([x for x in range(len(self.values))])
+            self.columns = tuple([x for x in range(len(self.values[0]))])
 
-        # create enumerated internal representation of index and columns
-        self._get_rep_index()
+        # create enumerated internal representation of columns
         self._get_nrow()
         self._get_rep_columns()
         self._get_shape()
 
+        # move the rows into column-major storage if asked
+        if storage == "columns":
+            self._set_storage(storage)
+
         # loc and iloc
         self.iloc = _ILoc(self)
         self.loc = _Loc(self)
@@ -97,32 +136,18 @@ class _DuffelDataFrame(object):
             # put values into memory - iterator fix - this is inefficient, sure
             values = list(values)
 
+            # iterable of dicts (ndim calls these 1d, so check first)
+            if isinstance(values[0], Mapping):
+                # keep the columns in order of first encounter (or only the ones asked for)
+                self.values, self.columns = _record_rows(values, columns)
+
             # dim 1
-            if ndim(values) == 1:
+            elif ndim(values) == 1:
                 self.values = [values]
 
-            # dim 2
+            # dim 2: iterable of iterables
             else:
-                # iterable of iterables
-                if isinstance(values[0], Iterable) and not isinstance(
-                    values[0], Mapping
-                ):
-                    maxlen = max([len(x) for x in values])
-                    self.values = [
-                        [y for y in x] + [None] * (maxlen - len(x)) for x in values
-                    ]
-
-                # iterable of dicts
-                elif isinstance(values[0], Mapping):
-                    # keep the columns in order of first encounter
-                    cols = reduce(
-                        lambda l, x: l.append(x) or l if x not in l else l,
-                        [y for x in values for y in list(x.keys())],
-                        [],
-                    )
-                    self.columns = tuple(cols)
-                    # create values
-                    self.values = [[x.get(k, None) for k in cols] for x in values]
+                self.values, _ = _record_rows(values)
 
     def _ingest_mapping(self, values, columns=None, index=None):
         """
@@ -154,56 +179,395 @@ class _DuffelDataFrame(object):
             # create values
             self.values = [list(x) for x in zip(*values.values())]
 
+    @property
+    def values(self):
+        """row-major list of lists; built on the fly from columnar storage"""
+        if self._columnar:
+            return [list(row) for row in zip(*self._data)]
+        # the rows can be changed through this list, so stop sharing them first
+        self._own()
+        self._version += 1
+        return self._values
+
+    def _rows(self):
+        """
+        iterator over the rows without copying the frame or un-sharing its storage:
+        the row lists themselves (don't change them) or, for columnar storage, tuples built on the fly
+        """
+        if self._columnar:
+            return zip(*self._data)
+        return iter(self._values)
+
+    @values.setter
+    def values(self, values):
+        if self._columnar:
+            self._data = _storage._to_columns(values, len(self._data))
+        else:
+            self._values = values
+        self._shared = False
+        self._version += 1
+
+    @property
+    def storage(self):
+        return "columns" if self._columnar else "rows"
+
+    def _set_storage(self, storage):
+        """switch the underlying storage between row-major lists and packed columns"""
+        assert (
+            storage in _storage.STORAGE_TYPES
+        ), f"DF storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+        if storage == self.storage:
+            return self
+        if storage == "columns":
+            self._data = _storage._to_columns(self._values, len(self.columns))
+            self._values = None
+            self._columnar = True
+        else:
+            rows = self.values
+            self._data = None
+            self._columnar = False
+            self._values = rows
+        return self
+
+    def _own(self):
+        """
+        copy storage shared with a view (see _view) before changing it in place
+        the row lists / column containers are copied; the top-level list always belongs to this frame
+        """
+        if self._shared:
+            if self._columnar:
+                self._data = [_storage._to_column(col) for col in self._data]
+            else:
+                self._values = [list(row) for row in self._values]
+            self._shared = False
+
+    def _view(self, columns=None, rows=None):
+        """
+        new DataFrame that shares this one's storage instead of copying it (copy-on-write)
+            columns: column names to keep (default all); row storage can only share whole rows
+            rows: a step-1 range of positions (default all)
+        shared row lists / column containers mark both frames _shared;
+        whichever is changed in place first copies its storage (see _own), so neither sees the other's changes
+        returns None if the selection can't share storage
+        """
+        if columns is None:
+            columns = self.columns
+        if rows is None:
+            rows = range(self._nrow)
+        if not isinstance(rows, range) or rows.step != 1:
+            return None
+        start, stop = rows.start, max(rows.start, rows.stop)
+        index = self.index[start:stop]
+        if self._columnar:
+            whole = start == 0 and stop == self._nrow
+            # a part of a typed buffer is copied by slicing at C speed instead; it isn't shared,
+            # except for a read-only memoryview (see read_duffel), whose slice is still a view
+            data = [
+                self._get_column(col) if whole else self._get_column(col)[start:stop]
+                for col in columns
+            ]
+            view = self._new(columns, index, self._index_name)
+            view._columnar = True
+            view._values = None
+            view._data = data
+            view._finish_new()
+            if whole:
+                self._shared = view._shared = True
+            elif any([isinstance(col, memoryview) for col in data]):
+                view._shared = True
+            return view
+        if tuple(columns) != self.columns:
+            return None
+        view = self._from_rows(
+            self._values[start:stop], columns, index, index_name=self._index_name
+        )
+        self._shared = view._shared = True
+        return view
+
+    def _column_values(self, values, name):
+        """normalize values for one column: a scalar is repeated, a Col / Mask / iterable must match the length"""
+        if isinstance(values, _DuffelCol):
+            values = values.values
+        elif isinstance(values, _DuffelMask):
+            values = values.tolist()
+        elif ndim(values) == 0 or not isinstance(values, Iterable):
+            # scalar (including str)
+            return [values] * self._nrow
+        elif not hasattr(values, "__len__"):
+            values = list(values)
+        assert (
+            len(values) == self._nrow
+        ), f"DF column values must match DF len; DF len {self._nrow}, column {name} values {len(values)}"
+        return values
+
+    def _set_columns(self, names, data):
+        """
+        set several columns at once, in place; existing columns are replaced and new ones are added at the end
+        only the affected column slots are touched: columnar storage swaps containers,
+        row storage writes each row's slots in one pass (after copying rows shared with a view)
+        """
+        data = [self._column_values(values, name) for name, values in zip(names, data)]
+        columns = list(self.columns)
+        replace, new, new_names = [], [], []
+        for name, values in zip(names, data):
+            if name in self._rep_columns:
+                replace.append((self._rep_columns[name], values))
+            elif name in new_names:
+                # the same new column twice: the last one wins
+                new[new_names.index(name)] = values
+            else:
+                new_names.append(name)
+                new.append(values)
+
+        if self._columnar:
+            for j, values in replace:
+                self._data[j] = _storage._to_column(values)
+            self._data.extend([_storage._to_column(values) for values in new])
+        else:
+            self._own()
+            rows = self._values
+            for j, values in replace:
+                for row, v in zip(rows, values):
+                    row[j] = v
+            if new:
+                for row, values in zip(rows, zip(*new)):
+                    row.extend(values)
+
+        self.columns = tuple(columns + new_names)
+        self._get_rep_columns()
+        self._get_shape()
+
+    def _get_column(self, column):
+        """
+        values of one column in row order
+        columnar storage returns the stored container itself; do not mutate it
+        """
+        i = self._rep_columns[column]
+        if self._columnar:
+            return self._data[i]
+        return [row[i] for row in self._values]
+
+    def _get_row(self, i):
+        """values of the row at integer position i"""
+        if self._columnar:
+            return [col[i] for col in self._data]
+        return self._values[i]
+
+    def _reorder(self, positions):
+        """reorder (or subset) rows in place by a list of integer positions"""
+        if self._columnar:
+            self._data = [_storage._take(col, positions) for col in self._data]
+        else:
+            self._values = [self._values[i] for i in positions]
+        self.index = self.index._take(positions)
+        self._get_nrow()
+        self._get_shape()
+
+    def _take(self, positions, columns=None):
+        """new DataFrame (same storage) from integer row positions and column names"""
+        if columns is None:
+            columns = self.columns
+        view = self._view(columns, positions)
+        if view is not None:
+            return view
+        index = self.index._take(positions)
+        if self._columnar:
+            return self._from_columns(
+                [_storage._take(self._get_column(col), positions) for col in columns],
+                columns,
+                index,
+                index_name=self._index_name,
+                storage="columns",
+            )
+        colpos = [self._rep_columns[col] for col in columns]
+        return self._from_rows(
+            [[row[j] for j in colpos] for row in map(self._values.__getitem__, positions)],
+            columns,
+            index,
+            index_name=self._index_name,
+        )
+
+    @classmethod
+    def _from_rows(cls, rows, columns, index, index_name=None):
+        """
+        build a row-major DataFrame directly from a list of row lists
+        no validation is done - callers must pass full-width rows and a unique index
+        """
+        self = cls._new(columns, index, index_name)
+        self._columnar = False
+        self._data = None
+        self._values = rows
+        return self._finish_new()
+
+    @classmethod
+    def _from_columns(cls, data, columns, index, index_name=None, storage="rows"):
+        """
+        build a DataFrame directly from a list of column containers
+        no validation is done - callers must pass equal-length columns and a unique index
+        """
+        self = cls._new(columns, index, index_name)
+        if storage == "columns":
+            self._columnar = True
+            self._values = None
+            self._data = [_storage._pack(col) for col in data]
+        else:
+            self._columnar = False
+            self._data = None
+            self._values = list(map(list, zip(*data)))
+        return self._finish_new()
+
+    @classmethod
+    def _new(cls, columns, index, index_name=None):
+        self = cls.__new__(cls)
+        self.empty = False
+        self._shared = False
+        self.columns = tuple(columns)
+        self.index = index
+        self._index_name = "index" if index_name is None else index_name
+        return self
+
+    def _finish_new(self):
+        self._nrow = len(self.index)
+        self._get_rep_columns()
+        self._get_shape()
+        self.iloc = _ILoc(self)
+        self.loc = _Loc(self)
+        return self
+
     def _row(self, i, columns=None):
+        """_DuffelRow for the row at integer position i"""
         if i >= self._nrow:
             raise IndexError("Row index out of range: %s" % i)
         if columns is None:
             columns = self.columns
+        row = self._get_row(i)
         return _DuffelRow(
-            [val for col, val in zip(self.columns, self.values[i]) if col in columns],
-            index=i,
+            [row[self._rep_columns[col]] for col in columns],
+            index=self.index[i],
             columns=columns,
         )
 
-    def _col(self, column, rows=None):
-        if rows is None:
-            rows = self.index
+    def _col(self, column, positions=None):
+        """_DuffelCol for one column, optionally only at the given integer positions"""
+        if positions is None:
+            # whole column => no gather; columnar storage is shared until written
+            if self._columnar:
+                self._shared = True
+            return _DuffelCol(
+                self._get_column(column),
+                name=column,
+                index=self.index,
+                _shared=self._columnar,
+            )
         return _DuffelCol(
-            [
-                val
-                for val in [
-                    x
-                    for ix, x in zip(
-                        self.index,
-                        [row[self._rep_columns[column]] for row in self.values],
-                    )
-                    if ix in rows
-                ]
-            ],
+            _storage._take(self._get_column(column), positions),
             name=column,
-            index=rows,
+            index=self.index._take(positions),
         )
 
-    def _invert_rep_index(self):
-        return {v: k for k, v in self._rep_index.items()}
-
     def _invert_rep_columns(self):
         return {v: k for k, v in self._rep_columns.items()}
 
     def _subset_loc(self, rows, columns=None):
         """
         implement .loc indexing behavior
-        transform rows to index values, transform columns to column names, and return subset
+        transform rows to integer positions, transform columns to column names, and return subset
+        """
+        ### rows
+        # label slice => positional slice; both ends inclusive
+        if isinstance(rows, slice):
+            rows = self.index._slice_positions(rows)
+        # rows is a string or an int - look up its position
+        elif isinstance(rows, str) or isinstance(rows, int):
+            rows = self.index.get_loc(rows)  # throws keyerror if index doesn't exist
+        # rows is a Mask => gather the selected rows straight from it
+        elif isinstance(rows, _DuffelMask):
+            return self._subset_mask(rows, columns)
+        # rows is a list of row index values
+        elif isinstance(rows, Iterable):
+            # if list of booleans
+            if list(set([type(x) for x in rows])) == [bool]:
+                thislen = len(rows)
+                assert (
+                    thislen == self._nrow
+                ), f"Boolean subsetter length ({thislen}) must match length of data ({self._nrow})"
+                rows = [i for i, truth in enumerate(rows) if truth]
+
+            # list of row indexes
+            else:
+                get_loc = self.index.get_loc
+                rows = [
+                    get_loc(i) for i in rows
+                ]  # throws keyerror if any index value doesn't exist
+        else:
+            raise ValueError(
+                "Must subset rows with slice, index value, or iterable of index values"
+            )
+
+        return self._subset_positions(rows, columns)
+
+    def _subset_mask(self, mask, columns=None):
+        """rows where mask is True; with every column, values are gathered from storage by the mask itself"""
+        assert (
+            len(mask) == self._nrow
+        ), f"Mask length ({len(mask)}) must match length of data ({self._nrow})"
+        if columns is None:
+            columns = self.columns
+        elif isinstance(columns, slice):
+            columns = self.columns[columns]
+        if ndim(columns) == 0:
+            return self._subset_positions(mask._positions(), columns)
+        for col in columns:
+            self._rep_columns[col]  # missing columns throw an error
+
+        index = self.index._take(mask._positions())
+        if self._columnar:
+            return self._from_columns(
+                [mask._compress(self._get_column(col)) for col in columns],
+                columns,
+                index,
+                index_name=self._index_name,
+                storage="columns",
+            )
+        rows = mask._compress(self._values)
+        if tuple(columns) == self.columns:
+            rows = list(map(list, rows))
+        else:
+            colpos = [self._rep_columns[col] for col in columns]
+            rows = [[row[j] for j in colpos] for row in rows]
+        return self._from_rows(rows, columns, index, index_name=self._index_name)
+
+    def _subset_iloc(self, rows, columns=None):
+        """
+        implement .iloc indexing behavior
+        rows are already integer positions
+        """
+        if isinstance(rows, slice) or isinstance(rows, int):
+            pass
+
+        # if list of numbers, then check valid type
+        elif isinstance(rows, Iterable):
+            assert list(set([type(x) for x in rows])) == [
+                int
+            ], ".iloc rows must be integer or iterable of integers"
+
+        # bad type
+        else:
+            raise ValueError(f".iloc rows must be integer or iterable of integers")
+
+        return self._subset_positions(rows, columns)
+
+    def _subset_positions(self, rows, columns=None):
+        """
+        shared back end of .loc and .iloc
+        rows is an integer position, a positional slice, or a list of integer positions
         """
         ### columns (goal is end up with list of column strings)
         # no column specified
         if columns is None:
             columns = self.columns
         # one column specified
-        elif isinstance(columns, str):
-            self._rep_columns[columns]  # this will throw a keyerror if column not exist
-        elif isinstance(columns, int):
-            columns = self._invert_rep_index()[columns]  # returns "real" value
+        elif isinstance(columns, (str, int, float)):
             self._rep_columns[columns]  # this will throw a keyerror if column not exist
         # slice of columns by number
         elif isinstance(columns, slice):
@@ -220,45 +584,25 @@ class _DuffelDataFrame(object):
             )
 
         ### rows
+        all_rows = isinstance(rows, slice) and rows == slice(None, None, None)
         if isinstance(rows, slice):
-            # get list of row index values based on the slicer
-            rows = self.index[rows]
-        # rows is a string or an int - leave it be but check validity
-        elif isinstance(rows, str) or isinstance(rows, int):
-            self._rep_index[rows]  # throws keyerror if index doesn't exist
-        # rows is a list of row index values
-        elif isinstance(rows, Iterable):
-            # if list of booleans
-            if list(set([type(x) for x in rows])) == [bool]:
-                thislen = len(rows)
-                assert (
-                    thislen == self._nrow
-                ), f"Boolean subsetter length ({thislen}) must match length of data ({self._nrow})"
-                rows = [i for truth, i in zip(rows, self.index) if truth]
-
-            # list of row indexes
-            else:
-                [
-                    self._rep_index[i] for i in rows
-                ]  # throws keyerror if any index value doesn't exist
-        else:
-            raise ValueError(
-                "Must subset rows with slice, index value, or iterable of index values"
-            )
+            rows = range(self._nrow)[rows]
+        elif isinstance(rows, int):
+            if rows < 0:
+                rows += self._nrow
+            if not 0 <= rows < self._nrow:
+                raise IndexError("Row position out of range: %s" % rows)
 
         ###
         # at this point:
-        # rows is either a valid row index value or a list of valid index values
+        # rows is either a valid integer position or a list/range of valid positions
         # columns is either a valid column name or a list of valid column names
-        #
-        # this means we can freely use self._rep_columns and self._rep_index
-        # to call integer index locations of each
         ###
 
         ### return subset
         # single row and col => return single value
         if ndim(rows) == 0 and ndim(columns) == 0:
-            return self.values[self._rep_index[rows]][self._rep_columns[columns]]
+            return self._get_row(rows)[self._rep_columns[columns]]
 
         # single row, multiple columns => _DuffelRow
         elif ndim(rows) == 0 and ndim(columns) == 1:
@@ -266,67 +610,25 @@ class _DuffelDataFrame(object):
 
         # multiple rows, one column => _DuffelCol
         elif ndim(rows) == 1 and ndim(columns) == 0:
-            return self._col(columns, rows=rows)
+            if all_rows:
+                return self._col(columns)
+            return self._col(columns, positions=rows)
 
         # multiple rows, multiple columns => _DuffelDataFrame
         elif ndim(rows) == 1 and ndim(columns) == 1:
-            return _DuffelDataFrame(
-                [
-                    [
-                        val
-                        for include_col, val in zip(
-                            [x in columns for x in self._rep_columns],
-                            self.values[self._rep_index[row]],
-                        )
-                        if include_col
-                    ]
-                    for row in rows
-                ],
-                columns=columns,
-                index=rows,
-            )
+            return self._take(rows, columns)
         else:
             raise ValueError(
                 f"Not sure how to .loc index for rows {rows} and cols {columns}"
             )
 
-    def _subset_iloc(self, rows, columns=None):
-        """
-        implement .iloc indexing behavior
-        only goal is to transform rows to row index values and pass to .loc
-        """
-        # a slice or int indexer can operate directly on the list of indexes
-        if isinstance(rows, slice) or isinstance(rows, int):
-            rows = self.index[rows]
-
-        # if list of numbers, then check valid type and convert to index values
-        elif isinstance(rows, Iterable):
-            assert list(set([type(x) for x in rows])) == [
-                int
-            ], ".iloc rows must be integer or iterable of integers"
-            inverted = self._invert_rep_index()
-            rows = [inverted[i] for i in rows]
-
-        # bad type
-        else:
-            raise ValueError(f".iloc rows must be integer or iterable of integers")
-
-        # pass to .loc
-        return self._subset_loc(rows, columns=columns)
-
     @classmethod
     def _from_dataframe(cls, df):
         """
-        create a dataframe from another Dataframe (i.e. no copy)
+        create a dataframe from another Dataframe
+        shares storage with it until either is changed (see _view)
         """
-        if hasattr(df, "_index_name"):
-            _index_name = df._index_name
-
-        # this includes the columns and index
-        copy = cls(df.to_dict(), _index_name=_index_name)
-
-        # finish up
-        return copy
+        return df._view()
 
     def _set_index(self, data: List, name=None):
         """
@@ -338,26 +640,46 @@ class _DuffelDataFrame(object):
             float,
             str,
         ), "DF column name must be int, float, or string"
-        self.index = list(data)
-        self._get_rep_index()
+        self.index = data
         self._index_name = name
 
     def _get_shape(self):
+        # every change in place ends here
         self.shape = (self._nrow, len(self.columns))
+        self._version += 1
 
     def _get_nrow(self):
-        self._nrow = len(self.values)
+        if self._columnar:
+            self._nrow = len(self._data[0]) if self._data else 0
+        else:
+            self._nrow = len(self._values)
 
     def _get_rep_columns(self):
         self._rep_columns = {k: v for v, k in enumerate(self.columns)}
 
-    def _get_rep_index(self):
-        self._rep_index = {k: v for v, k in enumerate(self.index)}
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = _ensure_index(index)
+        # the index object may be shared; append copies it before extending it in place
+        self._index_owned = False
 
     #####################################################################################
     # interface
     #####################################################################################
 
+    @property
+    def dtypes(self):
+        """dtype name of each column ("int", "float", "bool", "str", "object"), as a Col indexed by column"""
+        return _DuffelCol(
+            [_column_dtype(self._get_column(col)) for col in self.columns],
+            name="dtypes",
+            index=self.columns,
+        )
+
     def iterrows(self):
         for i in range(self._nrow):
             yield i, self[i]
@@ -378,40 +700,22 @@ class _DuffelDataFrame(object):
         # sort dict of lists on some element and recreate index from keys (idk if this works)
         # NOTE - any same values in sorted column are then sorted by index i.e. by first appearence a la Python norms
 
-        # method 1 append index value
-        temp = [x + [i] for x, i in zip(self.values, self.index)]
-
+        # sort integer positions on the key columns, then reorder storage once
         if ndim(columns) == 0:
-            temp = sorted(temp, key=lambda x: (x[self._rep_columns[columns]]))
+            keys = self._get_column(columns)
+            order = sorted(range(self._nrow), key=keys.__getitem__)
         else:
-            temp = sorted(
-                temp,
-                key=lambda x: tuple(
-                    [x[self._rep_columns[columns[i]]] for i in range(len(columns))]
-                ),
+            keys = [self._get_column(col) for col in columns]
+            order = sorted(
+                range(self._nrow), key=lambda i: tuple([k[i] for k in keys])
             )
-        self.index = [x[-1] for x in temp]
-        self.values = [x[:-1] for x in temp]
-        self._get_rep_index()
+        self._reorder(order)
         return self
 
     def sort_index(self):
-        # easy - just add index as an item, do sort_values, and re-map ._rep_index
-        self.values = [x + [i] for i, x in zip(self.index, self.values)]
-        new = "".join(
-            [random.choice("1234567890abcdefghijklmnopqrstuvwxyz") for x in range(20)]
-        )
-        self.columns = [*self.columns, new]
-        self._get_rep_columns()
-
-        # sort the list of self._rep_index and then recreate with list comprehension including range()
-        self = self.sort_values(new)
-
-        # finish up
-        self.index = [x[-1] for x in self.values]
-        self._get_rep_index()
-        self.columns = self.columns[:-1]
-        self._get_rep_columns()
+        # sort the positions of the index values and reorder storage once
+        index = self.index
+        self._reorder(sorted(range(self._nrow), key=index.__getitem__))
         return self
 
     def set_index(self, column):
@@ -419,11 +723,16 @@ class _DuffelDataFrame(object):
         colindex = self._rep_columns[column]
 
         # create the data and edit the values by popping the values
-        data = [x.pop(colindex) for x in self.values]
+        if self._columnar:
+            data = list(self._data.pop(colindex))
+        else:
+            self._own()
+            data = [x.pop(colindex) for x in self._values]
 
         # column ramifications
         self.columns = tuple([x for x in self.columns if x != column])
         self._get_rep_columns()
+        self._get_shape()
 
         # call the internal function
         self._set_index(data, column)
@@ -457,7 +766,7 @@ class _DuffelDataFrame(object):
         # set actual index values
         if index_name is None:
             index_name = "index"
-        self._set_index(list(range(self._nrow)), name=index_name)
+        self._set_index(_DuffelRangeIndex(self._nrow), name=index_name)
 
         # edit columns
         self.columns = (*self.columns, index_name)
@@ -470,7 +779,10 @@ class _DuffelDataFrame(object):
     # @property()
     def transpose(self):
         # transpose values
-        self.values = list(map(list, zip(*self.values)))
+        if self._columnar:
+            self._data = [_storage._to_column(row) for row in zip(*self._data)]
+        else:
+            self.values = list(map(list, zip(*self._values)))
 
         # switch index and columns
         temp_columns = self.columns
@@ -479,7 +791,6 @@ class _DuffelDataFrame(object):
         self.index = list(temp_columns)
 
         # finish up
-        self._get_rep_index()
         self._get_rep_columns()
         self._get_nrow()
         self._get_shape()
@@ -489,72 +800,327 @@ class _DuffelDataFrame(object):
     def T(self):
         return self.transpose()
 
-    def append(self, values: Iterable, index):
+    def _append_labels(self, labels):
         """
-        first [bad] implementation:
-            only append one row to the end of the values
-            index must be a unique value relative to current index
-
-            adds index to _rep_index
-            adds row to values
+        extend the index by labels in O(1) per label
+        a RangeIndex continued by the next integers stays a RangeIndex;
+        any other index is copied once (indexes are shared between frames) and then extended in place
         """
-        # # create a DataFrame out of the values to check len, type, etc.
-        # tempdf = _DuffelDataFrame(values, index=index, columns=self.columns)
-        # if index is not None or tempdf.index!=list(range(tempdf._nrow)):
-        #     assert len(set(self.index)) == len(self.index)+len(index), "DF append index must be unique"
+        index = self._index
+        if isinstance(index, _DuffelRangeIndex):
+            r = index._labels
+            nxt = range(r.stop, r.stop + r.step * len(labels), r.step)
+            if r.step > 0 and labels == list(nxt):
+                self._index = _DuffelRangeIndex(r.start, nxt.stop, r.step)
+                return
+            index = None
+        elif not self._index_owned:
+            index = None
+        if index is None:
+            index = self._index._copy()
+            self._index = index
+            self._index_owned = True
+
+        positions = index._get_positions()
+        seen = set()
+        for label in labels:
+            assert isinstance(
+                label, (int, float, str)
+            ), f"DF append index value must be int, str, float, not {type(label)}"
+            assert (
+                label not in positions and label not in seen
+            ), "DF append index value must be unique relative to DF index"
+            seen.add(label)
+        index._extend(labels)
 
-        # values length
-        assert len(values) <= len(
-            self.columns
-        ), f"DF append values must container <= number of values as columns in DF; {len(values)} is too many"
-        values = [*values, *[None for x in range(len(self.columns) - len(values))]]
+    def append(self, values: Iterable, index=None):
+        """
+        append one row in place, in amortized O(1)
+            values: a list of values (padded with None up to the number of columns)
+                    or a dict of column -> value
+            index: its index label, unique relative to the index;
+                   defaults to the next integer when the index is a RangeIndex
+        to add many rows, use append_rows, or DataFrame.builder to build a new DataFrame
+        """
+        self.append_rows([values], index=None if index is None else [index])
 
-        # index type validity
-        assert isinstance(
-            index, (int, float, str)
-        ), f"DF append index value must be int, str, float, not {type(index)}"
+    def append_rows(self, rows: Iterable, index: Iterable = None):
+        """
+        append many rows in place
+            rows: an iterable of lists of values or dicts of column -> value
+            index: their index labels; defaults to the next integers when the index is a RangeIndex
+        """
+        rows = [_row_values(row, self.columns, self._rep_columns) for row in rows]
+        if index is None:
+            assert isinstance(
+                self._index, _DuffelRangeIndex
+            ), "DF append needs index values unless the index is a RangeIndex"
+            r = self._index._labels
+            index = list(range(r.stop, r.stop + r.step * len(rows), r.step))
+        else:
+            index = list(index)
+            assert len(index) == len(
+                rows
+            ), f"DF append got {len(index)} index values for {len(rows)} rows"
+        self._append_labels(index)
+
+        # add values
+        if self._columnar:
+            self._own()
+            self._data = [
+                _storage._extend_values(col, values)
+                for col, values in zip(self._data, zip(*rows))
+            ]
+        else:
+            self._values.extend(rows)
+        self._get_nrow()
+        self._get_shape()
 
-        # index uniqueness
+    @classmethod
+    def from_records(
+        cls, data: Iterable, columns=None, index=None, storage="rows", nrows=None
+    ):
+        """
+        build a DataFrame from an iterable of dicts or of lists/tuples in one pass
+        data can be a generator (a db cursor, parsed json lines, ...); it is only iterated once
+            - dicts: keys become columns in order of first appearance; pass columns to keep only those keys
+            - lists/tuples: columns names them, or they are numbered 0..n-1
+        index is a list of labels or the name of a column to use as the index
+        nrows stops reading data after that many records
+        """
+        assert not isinstance(
+            data, Mapping
+        ), "DF from_records takes an iterable of records; use DataFrame(values) for a dict"
         assert (
-            index not in self.index
-        ), "DF append index value must be unique relative to DF index"
+            storage in _storage.STORAGE_TYPES
+        ), f"DF storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+        if nrows is not None:
+            data = islice(data, nrows)
+        with _paused_gc():
+            rows, columns = _record_rows(data, columns)
+        assert len(columns) == len(
+            set(columns)
+        ), f"DF columns values must be unique - duplicates are {[item for item, count in Counter(columns).items() if count > 1]}"
+
+        field = None
+        if index is None or ndim(index) == 0:
+            field, index = index, _DuffelRangeIndex(len(rows))
+        else:
+            index = _ensure_index(index)
+            assert index.is_unique, "DF index values must be unique"
+            assert len(index) == len(
+                rows
+            ), f"DF index length ({len(index)}) must match number of rows ({len(rows)})"
+
+        if storage == "columns":
+            with _paused_gc():
+                data = _storage._to_columns(rows, len(columns))
+            df = cls._from_columns(data, columns, index, storage=storage)
+        else:
+            df = cls._from_rows(rows, columns, index)
+        if field is not None:
+            df.set_index(field)
+        return df
 
-        # add to index
-        self.index = [*self.index, index]
-        self._get_rep_index()
+    @classmethod
+    def builder(cls, columns: Iterable, storage="rows"):
+        """
+        collect rows one at a time (or in bulk) and build the DataFrame once at the end
+            builder = DataFrame.builder(["id", "event"])
+            builder.append([1, "click"])
+            builder.append_rows(more_rows)
+            df = builder.build()
+        """
+        return _DuffelBuilder(cls, columns, storage=storage)
 
-        # add value
-        self.values.append(values)
+    def _numeric_columns(self):
+        return [
+            col
+            for col in self.columns
+            if _column_dtype(self._get_column(col)) in ("int", "float", "bool")
+        ]
 
-    def max(self, column=None):
-        pass
+    def _number_columns(self):
+        """the int and float columns; bools are left out, since abs / round would turn them into ints"""
+        return [
+            col
+            for col in self.columns
+            if _column_dtype(self._get_column(col)) in ("int", "float")
+        ]
 
-    def min(self, column=None):
-        pass
+    def _reduce(self, func, column=None, numeric_only=False, name=None):
+        """
+        apply a one-pass column reduction
+        returns a scalar for one column, otherwise a Col indexed by column
+        """
+        if column is not None:
+            assert (
+                column in self.columns
+            ), f"DF {name} column ({column}) not in columns"
+            return func(self._get_column(column))
+        columns = self._numeric_columns() if numeric_only else self.columns
+        return _DuffelCol(
+            [func(self._get_column(col)) for col in columns], name=name, index=columns
+        )
+
+    def _map_columns(self, func, column=None, columns=None, name=None):
+        """
+        apply func to every non-missing value of columns (all by default), leaving other columns as they are
+        returns a Col for one column, otherwise a new DataFrame
+        """
+        if column is not None:
+            assert (
+                column in self.columns
+            ), f"DF {name} column ({column}) not in columns"
+            return _DuffelCol(
+                _stats._map_present(func, self._get_column(column)),
+                name=column,
+                index=self.index,
+            )
+        columns = set(self.columns if columns is None else columns)
+        data = [
+            _stats._map_present(func, self._get_column(col))
+            if col in columns
+            else _storage._to_column(self._get_column(col))
+            for col in self.columns
+        ]
+        return self._from_columns(
+            data,
+            self.columns,
+            self.index,
+            index_name=self._index_name,
+            storage=self.storage,
+        )
+
+    def max(self, column=None, numeric_only: bool = False):
+        """largest non-missing value of a column, or of every column as a Col"""
+        return self._reduce(_stats._col_max, column, numeric_only, name="max")
+
+    def min(self, column=None, numeric_only: bool = False):
+        """smallest non-missing value of a column, or of every column as a Col"""
+        return self._reduce(_stats._col_min, column, numeric_only, name="min")
+
+    def sum(self, column=None, numeric_only: bool = False):
+        """sum of the non-missing values of a column, or of every column as a Col"""
+        return self._reduce(_stats._col_sum, column, numeric_only, name="sum")
+
+    def nunique(self, column=None, dropna: bool = True):
+        """number of distinct values of a column, or of every column as a Col"""
+        return self._reduce(
+            lambda values: _stats._col_nunique(values, dropna), column, name="nunique"
+        )
 
     def median(self, column=None):
-        pass
+        """
+        median of the non-missing values of a column, or of every numeric column as a Col
+        found by selection, without sorting the column
+        """
+        return self._reduce(_stats._col_median, column, True, name="median")
 
-    def mode(self, column=None):
-        pass
+    def quantile(self, q=0.5, column=None):
+        """
+        linearly interpolated quantile(s) of the non-missing values, found by selection
 
-    def sum(self, column=None):
-        pass
+        q: a number between 0 and 1, or a list of them (computed together, in one selection per column)
+        column: one column name; otherwise every numeric column
+
+        one q and one column => a scalar
+        one q => a Col indexed by column
+        a list of q and one column => a Col indexed by q
+        a list of q => a DataFrame indexed by q
+        """
+        if ndim(q) == 0:
+            return self._reduce(
+                lambda values: _stats._quantiles(_stats._present(values), [q])[0],
+                column,
+                True,
+                name=q,
+            )
+        q = list(q)
+        if column is not None:
+            assert (
+                column in self.columns
+            ), f"DF quantile column ({column}) not in columns"
+            return _DuffelCol(
+                _stats._quantiles(_stats._present(self._get_column(column)), q),
+                name=column,
+                index=q,
+            )
+        columns = self._numeric_columns()
+        return self._from_columns(
+            [
+                _stats._quantiles(_stats._present(self._get_column(col)), q)
+                for col in columns
+            ],
+            columns,
+            q,
+            storage=self.storage,
+        )
+
+    def mode(self, column=None):
+        """
+        most common non-missing value(s)
+        one column => a Col of its modes
+        otherwise a DataFrame with the modes of each column, padded with NA
+        """
+        if column is not None:
+            assert column in self.columns, f"DF mode column ({column}) not in columns"
+            return _DuffelCol(_stats._col_mode(self._get_column(column)), name=column)
+        modes = [_stats._col_mode(self._get_column(col)) for col in self.columns]
+        nrow = max([len(x) for x in modes], default=0)
+        return self._from_columns(
+            [x + [NA] * (nrow - len(x)) for x in modes],
+            self.columns,
+            range(nrow),
+            storage=self.storage,
+        )
 
     def abs(self, column=None):
-        pass
+        """
+        absolute values
+        one column => a Col; otherwise a new DataFrame with every numeric column made absolute
+        """
+        if column is not None:
+            return self._map_columns(abs, column, name="abs")
+        return self._map_columns(abs, columns=self._number_columns(), name="abs")
 
-    def corr(self, columns=None):
-        pass
+    def round(self, n: int = 0, column=None):
+        """
+        round to n decimal places
+        one column => a Col; otherwise a new DataFrame with every numeric column rounded
+        """
+        func = lambda v: round(v, n)
+        if column is not None:
+            return self._map_columns(func, column, name="round")
+        return self._map_columns(func, columns=self._number_columns(), name="round")
 
-    def cov(self, columns=None):
-        pass
+    def describe(self):
+        """
+        count, mean, std, min, quartiles, and max of every numeric column, as a DataFrame
+        each column is swept once; the quartiles are selected together from that sweep
+        """
+        columns = self._numeric_columns()
+        return self._from_columns(
+            [_stats._describe(self._get_column(col)) for col in columns],
+            columns,
+            _stats.DESCRIBE,
+            storage=self.storage,
+        )
 
-    def quantile(self):
-        pass
+    def comoments(self, columns=None):
+        """
+        mergeable co-moment accumulator over numeric columns (all by default)
+        combine accumulators from chunks or workers with .merge(), then call .cov() / .corr()
+        """
+        return _stats._DuffelComoments(columns).update(self)
 
-    def round(self, n):
-        pass
+    def corr(self, columns=None):
+        """pairwise Pearson correlation of numeric columns (all by default), computed in one pass"""
+        return self.comoments(columns).corr()
+
+    def cov(self, columns=None, ddof: int = 1):
+        """pairwise covariance of numeric columns (all by default), computed in one pass"""
+        return self.comoments(columns).cov(ddof=ddof)
 
     def idxmax(self, column=None):
         """
@@ -569,7 +1135,7 @@ class _DuffelDataFrame(object):
                 isinstance(column, (str, int, float)) and column in self.columns
             ), f"DF idxmax column must be str/float/int in columns, invalid: {column}"
 
-            vals = [x[self._rep_columns[column]] for x in self.values]
+            vals = self._get_column(column)
         else:
             # get the vals
             vals = self.index
@@ -594,7 +1160,7 @@ class _DuffelDataFrame(object):
                 isinstance(column, (str, int, float)) and column in self.columns
             ), f"DF idxmin column must be str/float/int in columns, invalid: {column}"
 
-            vals = [x[self._rep_columns[column]] for x in self.values]
+            vals = self._get_column(column)
         else:
             # get the vals
             vals = self.index
@@ -619,14 +1185,133 @@ class _DuffelDataFrame(object):
     def notna(self, columns=None):
         pass
 
-    def groupby(self, columns=None):
-        pass
+    def groupby(self, by, sort=True, dropna=True, as_index=True):
+        """
+        group rows by the values of one or more columns
 
-    def pivot_table(self, columns=None):
-        pass
+        by: column name or list of column names
+        sort: order groups by key (otherwise by first appearance)
+        dropna: drop rows with a missing key
+        as_index: use the keys as the result's index (tuples for several keys) instead of columns
 
-    def merge(self, data, on=None, how=None):
-        pass
+        returns a GroupBy; call .agg(...) / .sum() / .mean() / .size() etc. on it
+        """
+        return _DuffelGroupBy(self, by, sort=sort, dropna=dropna, as_index=as_index)
+
+    def assign(self, **columns):
+        """
+        new DataFrame with columns added or replaced; the original is not changed
+            each value is a scalar, a list / Col / Mask of values,
+            an expression (duffel.col("a") * 2), or a function of the DataFrame
+        functions and expressions see the columns assigned before them;
+        every other run of values is written in one pass over the rows
+        """
+        out = self._view()
+        names, data = [], []
+        for name, value in columns.items():
+            if isinstance(value, _DuffelExpr) or callable(value):
+                if names:
+                    out._set_columns(names, data)
+                    names, data = [], []
+                if isinstance(value, _DuffelExpr):
+                    value = value._eval(out._get_column)
+                else:
+                    value = value(out)
+            names.append(name)
+            data.append(value)
+        if names:
+            out._set_columns(names, data)
+        return out
+
+    def astype(self, dtype):
+        """
+        new DataFrame with columns converted to dtype ("int", "float", "bool", "str", "object", or "category")
+            dtype is one dtype for every column or a dict of column -> dtype
+        missing values stay missing
+        "category" columns are dictionary-encoded, which needs column storage, so a row-storage frame
+        with any category column is returned with storage="columns"
+        """
+        if not isinstance(dtype, Mapping):
+            dtype = {col: dtype for col in self.columns}
+        for col in dtype:
+            assert col in self._rep_columns, f"DF astype column ({col}) not in columns"
+        out = self._view()
+        if "category" in dtype.values() and not self._columnar:
+            out._set_storage("columns")
+        out._set_columns(
+            list(dtype),
+            [_astype(self._get_column(col), kind) for col, kind in dtype.items()],
+        )
+        return out
+
+    def lazy(self):
+        """
+        start a lazy query on this DataFrame; see LazyFrame
+        steps are recorded and only run on .collect(), which returns a new DataFrame
+        """
+        return _DuffelLazyFrame(_frame_source(self))
+
+    def pivot_table(
+        self,
+        values=None,
+        index=None,
+        columns=None,
+        aggfunc="mean",
+        fill_value=None,
+        dropna: bool = True,
+        sort: bool = True,
+    ):
+        """
+        spreadsheet-style pivot table, aggregated in one pass and built wide directly
+
+        values: column(s) to aggregate; defaults to every numeric column not used as a key
+        index: column(s) whose values become the rows (tuples for several)
+        columns: column(s) whose values become the columns
+        aggfunc: an aggregation name (see groupby), a function of a list of values, or a list of those
+        fill_value: value for combinations with no rows (defaults to NA)
+        dropna: drop rows with a missing key
+        sort: order rows and columns by key (otherwise by first appearance)
+
+        output columns are named by the column key; with several values or aggfuncs the names are
+        joined with "_", e.g. <value>_<aggfunc>_<column key>
+        """
+        return _pivot_table(
+            self,
+            values=values,
+            index=index,
+            columns=columns,
+            aggfunc=aggfunc,
+            fill_value=fill_value,
+            dropna=dropna,
+            sort=sort,
+        )
+
+    def merge(
+        self,
+        right,
+        how: str = "inner",
+        on=None,
+        left_on=None,
+        right_on=None,
+        left_index: bool = False,
+        right_index: bool = False,
+        suffixes=("_x", "_y"),
+    ):
+        """
+        hash join with another DataFrame; see duffel.merge
+        returns a new DataFrame
+        """
+        return _merge(
+            self,
+            right,
+            how=how,
+            on=on,
+            left_on=left_on,
+            right_on=right_on,
+            left_index=left_index,
+            right_index=right_index,
+            suffixes=suffixes,
+        )
 
     def drop(self, index, axis=0):
         """
@@ -641,30 +1326,33 @@ class _DuffelDataFrame(object):
         for ind in index:
             if axis == 0:
                 assert (
-                    index in self.index
-                ), f"DF drop error - index value {index} is not in DF index"
+                    ind in self.index
+                ), f"DF drop error - index value {ind} is not in DF index"
             elif axis == 1:
                 assert (
-                    index in self.columns
-                ), f"DF drop error - column {index} is not in DF columns"
+                    ind in self._rep_columns
+                ), f"DF drop error - column {ind} is not in DF columns"
 
         # then do the actual changes to the data
-        for ind in index:
-            if axis == 0:
-                # values
-                self.values.pop(self._rep_index(ind))
-
-            elif axis == 1:
-                # values
-                [x.pop(self._rep_columns[ind]) for x in self.values]
+        if axis == 0:
+            dropped = set([self.index.get_loc(ind) for ind in index])
+            self._reorder([i for i in range(self._nrow) if i not in dropped])
+
+        elif axis == 1:
+            keep = [x for x in self.columns if x not in index]
+            positions = [self._rep_columns[x] for x in keep]
+            if self._columnar:
+                self._data = [self._data[i] for i in positions]
+            else:
+                self.values = [[x[i] for i in positions] for x in self._values]
 
-                # columns
-                self.columns.pop(self._rep_columns[ind])
-                self._get_rep_columns()
+            # columns
+            self.columns = tuple(keep)
+            self._get_rep_columns()
 
         # finish up - fix shape and _nrow
-        self._get_shape()
         self._get_nrow()
+        self._get_shape()
         return self
 
     def drop_duplicates(self, columns=None):
@@ -804,7 +1492,7 @@ class _DuffelDataFrame(object):
         ### get the sample values and return
         # if explicitly a single sample value, return a row
         if n is None and frac is None:
-            done = self._row(index_vals[0], columns=columns)
+            done = self._row(self.index.get_loc(index_vals[0]), columns=columns)
 
         # elif explicitly a single column, but not explicitly a single row
         if ndim(og_cols) == 0 and not og_cols == None:
@@ -812,7 +1500,7 @@ class _DuffelDataFrame(object):
             done = _DuffelCol(
                 [
                     x[self._rep_columns[col]]
-                    for x in [self.values[ix] for ix in index_vals]
+                    for x in [self._get_row(self.index.get_loc(ix)) for ix in index_vals]
                 ],
                 name=col,
                 index=index,
@@ -823,7 +1511,7 @@ class _DuffelDataFrame(object):
             done = _DuffelDataFrame(
                 [
                     [x[self._rep_columns[col]] for col in columns]
-                    for x in [self.values[self._rep_index[ix]] for ix in index_vals]
+                    for x in [self._get_row(self.index.get_loc(ix)) for ix in index_vals]
                 ],
                 columns=columns,
                 index=index,
@@ -834,29 +1522,65 @@ class _DuffelDataFrame(object):
     def from_dict(self, data, orient: str = "dict", columns: Optional[Iterable] = None):
         pass
 
-    def to_csv(self, filename, index=False):
+    def to_csv(
+        self,
+        path_or_buf,
+        index=False,
+        chunksize=None,
+        compression="infer",
+        threaded=False,
+    ):
         """
-        writes values to CSV located at filename
+        writes values to CSV located at filename (or to an open text file / buffer)
 
-        if index==True, write the index as the first row
+        if index==True, write the index as the first column
+        rows are formatted and written chunksize at a time, straight from the frame's storage
+        compression: "gzip", "bz2", "xz" or None; "infer" (the default) goes by the filename's extension
+        threaded: write from a background thread, so formatting the next chunk overlaps writing
+        (and compressing) the last one
         """
+        if chunksize is None:
+            chunksize = _WRITE_BATCH
+        assert (
+            isinstance(chunksize, int) and chunksize > 0
+        ), f"DF.to_csv chunksize must be a positive integer, not {chunksize}"
+
+        if isinstance(path_or_buf, str):
+            with _fileio._open_write(path_or_buf, compression) as fp:
+                return self.to_csv(
+                    fp, index=index, chunksize=chunksize, threaded=threaded
+                )
+
+        header = list(self.columns)
+        rows = self._rows()
         if index:
-            self.values = [[x] + v for x, v in zip(self.index, self.values)]
-        with open(filename, "w") as CSVreport:
-            wr = csv.writer(CSVreport)
-            wr.writerow([None, *self.columns])
-            wr.writerows(self.values)
-            CSVreport.close()
-        if index:
-            self.values = [x[1:] for x in self.values]
+            header = ["" if self._index_name is None else self._index_name, *header]
+            rows = ([label, *row] for label, row in zip(self.index, rows))
+
+        def batches():
+            buf = io.StringIO()
+            wr = csv.writer(buf)
+            wr.writerow(header)
+            for chunk in iter(lambda: list(islice(rows, chunksize)), []):
+                wr.writerows(chunk)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+
+        _fileio._write_batches(path_or_buf, batches(), threaded)
         return True
 
-    def to_json(self, filename, orient: str = "dict"):
+    def to_json(self, path_or_buf, orient: str = "dict", lines=False):
         """
-        take a input filename, orient str
+        take a input filename (or open text file / buffer), orient str
         save self.data as JSON to path at filename in orient format
         object is in dict form: {<index>: { field: value, ...}, ... }
 
+        orient="records" is written row by row, a batch of rows per write, without building the records first;
+        lines=True (orient="records" only) writes JSON Lines: one record per line, no enclosing list
+
         TODO: add ability to save as dict of lists (i.e. no index - faster to read later and smaller on disk)
         """
         # check orient type
@@ -868,14 +1592,56 @@ class _DuffelDataFrame(object):
             "series",
             "list",
         }, f"DF.to_dict orient must be in ('dict','records','index','split','series', 'list'), not {orient}"
+        assert not lines or orient == "records", "DF.to_json lines=True needs orient='records'"
 
-        with open(filename, "w") as fp:
-            json.dump(self.to_dict(orient), fp)
+        if isinstance(path_or_buf, str):
+            with open(path_or_buf, "w") as fp:
+                return self.to_json(fp, orient=orient, lines=lines)
 
+        if orient == "records":
+            self._write_json_records(path_or_buf, lines)
+        else:
+            json.dump(self.to_dict(orient), path_or_buf, default=_json_value)
         return True
 
-    def to_sql(self, con):
-        pass
+    def _write_json_records(self, fp, lines):
+        """stream the rows to fp as a json list of records, or as JSON Lines"""
+        columns = list(self.columns)
+        # what json.dump uses with its default arguments
+        dumps = json.JSONEncoder().encode
+        rows = self._rows()
+        batches = iter(lambda: list(islice(rows, _WRITE_BATCH)), [])
+        if lines:
+            for batch in batches:
+                fp.write("".join([dumps(dict(zip(columns, row))) + "\n" for row in batch]))
+            return
+        fp.write("[")
+        sep = ""
+        for batch in batches:
+            fp.write(sep + ", ".join([dumps(dict(zip(columns, row))) for row in batch]))
+            sep = ", "
+        fp.write("]")
+
+    def to_duffel(self, path):
+        """
+        write the DataFrame to path in duffel's binary columnar format; read it back with duffel.read_duffel
+        int / float columns are written as raw typed buffers (columnar storage packs them), str columns as
+        one utf-8 buffer, categoricals as their codes; anything else as json
+        """
+        return _binary._write(self, path)
+
+    def to_sql(self, name, con, if_exists="fail", index=False, chunksize=None):
+        """
+        write the DataFrame to the table name through a DB-API connection (or a SQLAlchemy engine)
+        if_exists: "fail", "replace" (drop and create it again) or "append"
+        rows are sent chunksize at a time with cursor.executemany, in a single transaction
+        column types: int -> INTEGER, float -> REAL, bool -> INTEGER, anything else -> TEXT;
+        sql has no portable bool type, so bool columns read back (read_sql) as 0 / 1 ints:
+        use .astype("bool") on them to restore the dtype
+        """
+        return _database._write(
+            self, name, con, if_exists=if_exists, index=index, chunksize=chunksize
+        )
 
     def to_dict(self, orient: str = "dict"):
         """
@@ -894,100 +1660,66 @@ class _DuffelDataFrame(object):
             return {
                 col: {
                     i: val
-                    for i, val in zip(
-                        self.index, [x[self._rep_columns[col]] for x in self.values]
-                    )
+                    for i, val in zip(self.index, self._get_column(col))
                 }
                 for col in self.columns
             }
     
         elif orient == "records":
-            return [{col: v for col, v in zip(self.columns, x)} for x in self.values]
+            return [{col: v for col, v in zip(self.columns, x)} for x in self._rows()]
         
         elif orient == "split":
             return {
-                "index": self.index,
+                "index": list(self.index),
                 "columns": list(self.columns),
-                "data": self.values,
+                "data": [list(row) for row in self._rows()],
             }
         
         elif orient == "index":
             return {
                 i: {col: row[self._rep_columns[col]] for col in self.columns}
-                for i, row in zip(self.index, self.values)
+                for i, row in zip(self.index, self._rows())
             }
      
         elif orient == "series":
             return {col: self.loc[:, col] for col in self.columns}
      
         elif orient == "list":
-            return {
-                col: [x[self._rep_columns[col]] for x in self.values]
-                for col in self.columns
-            }
+            return {col: list(self._get_column(col)) for col in self.columns}
 
     def head(self, n=5):
         """returns .loc of first 5 rows"""
-        return self._subset_loc(slice(0, n, None), None)
+        return self._subset_iloc(slice(0, n, None), None)
 
     def tail(self, n=5):
         """returns .loc of last 5 rows"""
-        return self._subset_loc(slice(-n, None, None), None)
+        return self._subset_iloc(slice(-n, None, None), None)
 
     #####################################################################################
     # special methods
     #####################################################################################
 
     def __setitem__(self, col, values):
-        """create a column"""
-        # check if col in columns
-        if col in self.columns:
-            col_index = self._rep_columns[col]
-        else:
-            col_index = len(self.columns)
-
-        # check data
-        if isinstance(values, Iterable):
-            # vector
-            l = len(values)
-            assert (
-                l == self._nrow
-            ), f"DF column values must match DF len; DF len {self._nrow}, values {l}"
-        else:
-            # scalar
-            values = [values for x in range(self._nrow)]
-
-        # edit data
-        self.values = [
-            [*x[:col_index], v, *x[col_index:]] for x, v in zip(self.values, values)
-        ]
-
-        # edit columns
-        cols = list(self.columns)
-        if col_index == len(cols):
-            # new column
-            cols.append(col)
-        else:
-            # edit current column
-            cols[col_index] = col
-        self.columns = tuple(cols)
-        self._get_rep_columns()
-
-        # shape & _nrow
-        self._get_nrow()
-        self._get_shape()
+        """create a column, or replace it if it exists"""
+        self._set_columns([col], [values])
 
     def __getitem__(self, index: str):
         """2D indexing on the data with slices and integers"""
-        assert isinstance(index, (str, int, float, Iterable)), "DF indexing must be a column name or a list of bool"
+        assert isinstance(
+            index, (str, int, float, slice, Iterable)
+        ), "DF indexing must be a column name, a slice, or a list of bool"
         
+        # grab DataFrame by row position
+        if isinstance(index, slice):
+            return self.iloc[index, :]
+
         # grab Col by column name
-        if ndim(index) == 0:
+        elif ndim(index) == 0:
             assert isinstance(index, (str, int, float)) and index in self.columns, f"DF indexing must be a column name; invalid: {index}"
             return self.loc[:, index ]
-        
-        # grab DataFrame by indecx
-        elif isinstance(index, slice) or isinstance(index, Iterable):
+
+        # grab DataFrame by index values or list of bool
+        elif isinstance(index, Iterable):
             return self.loc[index,:]
         
         else:
@@ -1067,13 +1799,14 @@ class _DuffelDataFrame(object):
         if self._index_name == 'index':
             index_name = ' '
         else:
-            index_name = self._index_name
+            index_name = str(self._index_name)
+        head = [self._get_row(i) for i in range(min(10, self._nrow))]
         strcols = [index_name , " --"] + [(" " + str(i)) for i in self.index[:10]]
         strcols = [strcols] + [
             [str(col), "----"]
             + [
                 str(val)
-                for val in [x[self._rep_columns[col]] for x in self.values[:10]]
+                for val in [x[self._rep_columns[col]] for x in head]
             ]
             for col in self.columns
         ]
@@ -0,0 +1,264 @@
+"""
+column types
+
+duffel keeps plain Python values, so a dtype is just a name for the kind of values in a column:
+    "int", "float", "bool", "str", or "object" (mixed / unknown)
+"category" is the one dtype that changes storage: values are dictionary-encoded (see categorical.py)
+
+read_csv infers one dtype per column from a sample and parses the whole column with one converter
+"""
+from array import array
+from typing import Iterable, Mapping
+
+from .na import NA
+from .categorical import _DuffelCategorical
+
+DTYPES = ("int", "float", "bool", "str", "object", "category")
+
+# how many non-empty values of each column read_csv looks at to pick a dtype
+SAMPLE_SIZE = 100
+
+# intern_strings="auto" interns a column if at most this share of its sampled values are distinct
+INTERN_RATIO = 0.5
+
+_BOOLS = {
+    "True": True,
+    "true": True,
+    "TRUE": True,
+    "False": False,
+    "false": False,
+    "FALSE": False,
+}
+
+
+def _asnumeric(obj):
+    try:
+        return int(obj)
+    except ValueError:
+        pass
+
+    try:
+        return float(obj)
+    except ValueError:
+        pass
+
+    if obj in ("True", "true", "TRUE"):
+        return True
+    elif obj in ("False", "false", "FALSE"):
+        return False
+    elif obj == "":
+        return NA
+    else:
+        return obj
+
+
+def _parse_bool(obj):
+    try:
+        return _BOOLS[obj]
+    except KeyError:
+        raise ValueError(f"not a bool: {obj}")
+
+
+def _parse_str(obj):
+    return obj if obj != "" else NA
+
+
+# first characters of the strings _asnumeric can turn into a number
+_NUMERIC_START = frozenset("0123456789+-.")
+
+
+def _inferred_str_parser():
+    """
+    _parse_str for a column that was inferred as str from its sample
+    later values that are numbers or bools are parsed the way an object column parses them, like
+    an int or float column falls back to a str for later values that aren't numbers
+    the first value that looks like a number but isn't one (an ip, a date, a zip code, ...) shows
+    the column isn't numeric, so the rest of it is no longer tried
+    """
+    numeric = True
+
+    def parse(obj):
+        nonlocal numeric
+        if numeric and obj[:1] in _NUMERIC_START:
+            value = _asnumeric(obj)
+            if value is obj:
+                numeric = False
+            return value
+        if obj in _BOOLS:
+            return _BOOLS[obj]
+        return obj if obj != "" else NA
+
+    return parse
+
+
+_PARSERS = {
+    "int": int,
+    "float": float,
+    "bool": _parse_bool,
+    "str": _parse_str,
+    "object": _asnumeric,
+}
+
+_TYPE_NAMES = {int: "int", float: "float", bool: "bool", str: "str", object: "object"}
+
+
+def _dtype_name(dtype):
+    """normalize a dtype given as a name or a Python type"""
+    dtype = _TYPE_NAMES.get(dtype, dtype)
+    assert dtype in DTYPES, f"duffel dtype must be in {DTYPES}, not {dtype}"
+    return dtype
+
+
+def _infer_dtype(samples: Iterable):
+    """pick the narrowest dtype that can parse every non-empty sample string"""
+    values = [s for s in samples if s != ""]
+    if not values:
+        return "object"
+    for name in ("int", "float", "bool"):
+        parse = _PARSERS[name]
+        try:
+            for v in values:
+                parse(v)
+        except ValueError:
+            continue
+        return name
+    return "str"
+
+
+def _converter(dtype, strict=False, name=None):
+    """
+    returns a function that parses a whole column of strings with one dtype
+    if a value doesn't parse:
+        strict=False => fall back to _asnumeric for that value
+        strict=True  => raise ValueError (empty strings still become NA)
+    every string parses as a str, so a str column with strict=False tries numbers (see _inferred_str_parser)
+    """
+    if dtype == "category":
+        return _DuffelCategorical._from_strings
+    parse = _PARSERS[dtype]
+    if dtype == "str" and not strict:
+        parse = _inferred_str_parser()
+
+    def fallback(obj):
+        try:
+            return parse(obj)
+        except ValueError:
+            if obj == "" or not strict:
+                return _asnumeric(obj)
+            raise ValueError(
+                f"duffel could not convert {obj!r} in column {name} to {dtype}"
+            )
+
+    def convert(values):
+        try:
+            return list(map(parse, values))
+        except ValueError:
+            return list(map(fallback, values))
+
+    return convert
+
+
+def _csv_dtypes(rows, columns, dtype=None, converters=None):
+    """
+    decide how read_csv parses each column; returns one spec per column:
+        a function of one string (from converters)
+        or a (dtype name, strict) tuple (from dtype, or inferred from a sample of rows)
+    converters[col] wins over dtype[col], which wins over inference
+    dtype can be one dtype for every column or a dict of column -> dtype
+    specs are plain data, so they can be sent to other processes
+    """
+    converters = converters or {}
+    if dtype is not None and not isinstance(dtype, Mapping):
+        dtype = {col: dtype for col in columns}
+    dtype = dtype or {}
+
+    specs = []
+    for i, col in enumerate(columns):
+        if col in converters:
+            specs.append(converters[col])
+        elif col in dtype:
+            specs.append((_dtype_name(dtype[col]), True))
+        else:
+            samples = []
+            for row in rows:
+                if i < len(row) and row[i] != "":
+                    samples.append(row[i])
+                    if len(samples) == SAMPLE_SIZE:
+                        break
+            specs.append((_infer_dtype(samples), False))
+    return specs
+
+
+def _spec_converter(spec, name=None):
+    """turn one _csv_dtypes spec into a function that parses a whole column; None keeps raw strings"""
+    if spec is None:
+        return list
+    if isinstance(spec, tuple):
+        return _converter(spec[0], strict=spec[1], name=name)
+    return lambda values: [spec(v) for v in values]
+
+
+def _column_dtype(values: Iterable):
+    """dtype name of a column of values; missing values (None, NA) are ignored"""
+    if isinstance(values, array):
+        return "int" if values.typecode == "q" else "float"
+    if isinstance(values, memoryview):
+        return "int" if values.format == "q" else "float"
+    if isinstance(values, _DuffelCategorical):
+        return "category"
+    seen = set()
+    for v in values:
+        if v is None or (type(v) is float and v != v):
+            continue
+        seen.add(type(v))
+        if len(seen) > 2:
+            break
+    if seen == {int, float}:
+        return "float"
+    if len(seen) == 1:
+        return _TYPE_NAMES.get(seen.pop(), "object")
+    return "object"
+
+
+def _intern(values, memo: dict):
+    """
+    values with every repeated str replaced by one shared object (the first one memo saw)
+    memo maps value -> shared object and is kept between calls, e.g. across the chunks of one file
+    only str (and missing values) go into memo, since 1, 1.0 and True would share an object
+    """
+    fresh = dict(zip(values, values))
+    if all([type(k) is str or k is None or k is NA for k in fresh]):
+        new = fresh.keys() - memo.keys()
+        memo.update(zip(new, new))
+        return list(map(memo.__getitem__, values))
+    # a str column with a few numbers (see _inferred_str_parser): leave the numbers alone
+    new = {k for k in fresh if type(k) is str} - memo.keys()
+    memo.update(zip(new, new))
+    return [memo[v] if type(v) is str else v for v in values]
+
+
+def _low_cardinality(samples: Iterable):
+    """True if a sample of values repeats enough to be worth interning"""
+    samples = [s for s in samples if s is not None and s == s and s != ""]
+    return bool(samples) and len(set(samples)) <= len(samples) * INTERN_RATIO
+
+
+def _csv_pad(records, ncol):
+    """check that no raw csv record is longer than ncol and pad short ones with empty strings"""
+    if not records:
+        return records
+    lengths = set(map(len, records))
+    assert (
+        max(lengths) <= ncol
+    ), f"DF columns length ({ncol}) must match length of values ({max(lengths)})"
+    if lengths != {ncol}:
+        records = [x + [""] * (ncol - len(x)) for x in records]
+    return records
+
+
+def _csv_columns(records, parsers, ncol):
+    """transpose raw csv records into ncol columns and convert each with its own parser"""
+    if not records:
+        return [[] for _ in range(ncol)]
+    records = _csv_pad(records, ncol)
+    return [parse(col) for parse, col in zip(parsers, zip(*records))]
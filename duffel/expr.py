@@ -0,0 +1,210 @@
+"""
+column expressions for lazy queries
+
+    duffel.col("age") > 30
+    (duffel.col("gender") == "Female") & duffel.col("id").isin([1, 2, 3])
+    duffel.col("price") * duffel.col("qty")
+
+an expression knows which columns it reads, so the lazy planner can push filters and projections down
+into the reader, and it is evaluated a whole column at a time against any source of columns
+
+comparisons with a missing value (None, NA) are False; arithmetic with a missing value is NA
+== / != against a scalar and isin compare codes when the column is a Categorical
+"""
+import operator
+from typing import Iterable
+
+from .na import NA
+from .categorical import _DuffelCategorical
+
+
+def _missing(v):
+    return v is None or v != v
+
+
+def _compare(op):
+    def compare(a, b):
+        return not (_missing(a) or _missing(b)) and op(a, b)
+
+    return compare
+
+
+def _arith(op):
+    def arith(a, b):
+        return NA if _missing(a) or _missing(b) else op(a, b)
+
+    return arith
+
+
+def _category_compare(op, other, values):
+    """== / != of a scalar against a Categorical's codes, or None if values isn't one"""
+    if op not in ("==", "!=") or not isinstance(values, _DuffelCategorical):
+        return None
+    hits = values._equal(other)
+    return list(map(bool, hits)) if op == "==" else [not x for x in hits]
+
+
+_OPS = {
+    "==": _compare(operator.eq),
+    "!=": lambda a, b: not _compare(operator.eq)(a, b),
+    "<": _compare(operator.lt),
+    "<=": _compare(operator.le),
+    ">": _compare(operator.gt),
+    ">=": _compare(operator.ge),
+    "+": _arith(operator.add),
+    "-": _arith(operator.sub),
+    "*": _arith(operator.mul),
+    "/": _arith(operator.truediv),
+    "//": _arith(operator.floordiv),
+    "%": _arith(operator.mod),
+    "&": lambda a, b: bool(a) and bool(b),
+    "|": lambda a, b: bool(a) or bool(b),
+}
+
+
+class _DuffelExpr(object):
+    """
+    a column expression
+        columns: names of the columns it reads
+        _eval(get): evaluate it, where get(name) returns the values of a column; returns a list
+    """
+
+    def __init__(self, evaluate, columns: Iterable, text: str):
+        self._evaluate = evaluate
+        self.columns = frozenset(columns)
+        self._text = text
+
+    def _eval(self, get):
+        return self._evaluate(get)
+
+    def _binary(self, op, other, reverse=False):
+        func = _OPS[op]
+        if isinstance(other, _DuffelExpr):
+            left, right = (other, self) if reverse else (self, other)
+            return _DuffelExpr(
+                lambda get: list(map(func, left._eval(get), right._eval(get))),
+                left.columns | right.columns,
+                f"({left._text} {op} {right._text})",
+            )
+        if reverse:
+            return _DuffelExpr(
+                lambda get: [func(other, v) for v in self._eval(get)],
+                self.columns,
+                f"({other!r} {op} {self._text})",
+            )
+
+        def evaluate(get):
+            values = self._eval(get)
+            out = _category_compare(op, other, values)
+            if out is None:
+                out = [func(v, other) for v in values]
+            return out
+
+        return _DuffelExpr(evaluate, self.columns, f"({self._text} {op} {other!r})")
+
+    def __eq__(self, other):
+        return self._binary("==", other)
+
+    def __ne__(self, other):
+        return self._binary("!=", other)
+
+    def __lt__(self, other):
+        return self._binary("<", other)
+
+    def __le__(self, other):
+        return self._binary("<=", other)
+
+    def __gt__(self, other):
+        return self._binary(">", other)
+
+    def __ge__(self, other):
+        return self._binary(">=", other)
+
+    def __add__(self, other):
+        return self._binary("+", other)
+
+    def __radd__(self, other):
+        return self._binary("+", other, reverse=True)
+
+    def __sub__(self, other):
+        return self._binary("-", other)
+
+    def __rsub__(self, other):
+        return self._binary("-", other, reverse=True)
+
+    def __mul__(self, other):
+        return self._binary("*", other)
+
+    def __rmul__(self, other):
+        return self._binary("*", other, reverse=True)
+
+    def __truediv__(self, other):
+        return self._binary("/", other)
+
+    def __rtruediv__(self, other):
+        return self._binary("/", other, reverse=True)
+
+    def __floordiv__(self, other):
+        return self._binary("//", other)
+
+    def __mod__(self, other):
+        return self._binary("%", other)
+
+    def __and__(self, other):
+        return self._binary("&", other)
+
+    def __or__(self, other):
+        return self._binary("|", other)
+
+    def __invert__(self):
+        return _DuffelExpr(
+            lambda get: [not v for v in self._eval(get)],
+            self.columns,
+            f"~{self._text}",
+        )
+
+    # expressions build new expressions from ==, so they can't be dict keys
+    __hash__ = None
+
+    def isin(self, values: Iterable):
+        """True where the value is one of values"""
+        values = set(values)
+
+        def evaluate(get):
+            column = self._eval(get)
+            if isinstance(column, _DuffelCategorical):
+                return list(map(bool, column._isin(values)))
+            return [v in values for v in column]
+
+        return _DuffelExpr(
+            evaluate,
+            self.columns,
+            f"{self._text}.isin({sorted(values, key=repr)})",
+        )
+
+    def isna(self):
+        return _DuffelExpr(
+            lambda get: [_missing(v) for v in self._eval(get)],
+            self.columns,
+            f"{self._text}.isna()",
+        )
+
+    def notna(self):
+        return _DuffelExpr(
+            lambda get: [not _missing(v) for v in self._eval(get)],
+            self.columns,
+            f"{self._text}.notna()",
+        )
+
+    def __bool__(self):
+        raise TypeError(
+            "duffel expressions have no truth value; combine them with &, |, ~ instead of and, or, not"
+        )
+
+    def __repr__(self):
+        return self._text
+
+
+def col(name):
+    """expression for the values of one column"""
+    return _DuffelExpr(lambda get: get(name), [name], f"col({name!r})")
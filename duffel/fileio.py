@@ -0,0 +1,117 @@
+"""
+opening files for the readers and writers
+
+compressed files are picked by extension (.gz, .bz2, .xz, and .zip for reading) or, when reading, by
+their first bytes, and opened through gzip / bz2 / lzma / zipfile; the rest of the code only ever sees
+a text stream that is decompressed as it is read, so chunked reads of big files stay small
+
+_write_batches can hand the writes to a background thread: gzip, bz2 and lzma compress (and the OS
+writes) without holding the GIL, so the caller formats the next batch while the last one is written
+"""
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+import zipfile
+
+COMPRESSIONS = {"gzip": gzip, "bz2": bz2, "xz": lzma, "zip": zipfile}
+_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zip": "zip"}
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"PK\x03\x04": "zip",
+}
+
+
+def _infer_compression(path, compression="infer"):
+    """name of the compression for path ("gzip", "bz2", "xz", "zip"), or None; "infer" goes by extension"""
+    if compression == "infer":
+        for ext, name in _EXTENSIONS.items():
+            if path.endswith(ext):
+                return name
+        return None
+    assert (
+        compression is None or compression in COMPRESSIONS
+    ), f"duffel compression must be 'infer', None or in {tuple(COMPRESSIONS)}, not {compression}"
+    return compression
+
+
+def _detect_compression(path, compression="infer"):
+    """_infer_compression, then, for "infer" without a known extension, the file's first bytes"""
+    name = _infer_compression(path, compression)
+    if name is not None or compression != "infer":
+        return name
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, name in _MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _open_read(path, compression="infer"):
+    """text file open for reading at path, decompressed as it is read"""
+    compression = _detect_compression(path, compression)
+    if compression is None:
+        return open(path, "r", newline="")
+    if compression == "zip":
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            assert (
+                len(names) == 1
+            ), f"duffel can only read a zip file with one file in it, not {len(names)}"
+            # the member keeps the archive's file open after the archive is closed
+            return io.TextIOWrapper(archive.open(names[0]), newline="")
+    return COMPRESSIONS[compression].open(path, "rt", newline="")
+
+
+def _open_write(path, compression="infer"):
+    """text file open for writing at path, compressed if asked for (or if the extension says so)"""
+    compression = _infer_compression(path, compression)
+    assert compression != "zip", "duffel can't write zip files; use gzip, bz2 or xz"
+    if compression is None:
+        return open(path, "w", newline="")
+    return COMPRESSIONS[compression].open(path, "wt", newline="")
+
+
+def _write_batches(fp, batches, threaded=False):
+    """
+    write each string from batches to fp
+    threaded: write from a background thread while the next batch is made; at most one batch waits,
+    so two are in memory at once (one being written, one being made)
+    an error in either thread stops both and is raised here
+    """
+    if not threaded:
+        for text in batches:
+            fp.write(text)
+        return
+
+    pending = queue.Queue(maxsize=1)
+    errors = []
+
+    def drain():
+        while True:
+            text = pending.get()
+            if text is None:
+                return
+            if not errors:
+                try:
+                    fp.write(text)
+                except BaseException as e:
+                    errors.append(e)
+
+    writer = threading.Thread(target=drain, daemon=True)
+    writer.start()
+    try:
+        for text in batches:
+            if errors:
+                break
+            pending.put(text)
+    finally:
+        pending.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,210 @@
+from typing import Mapping
+
+from .na import ndim
+from .col import _DuffelCol
+from .dtypes import _column_dtype
+from . import agg as _agg
+
+
+class _DuffelGroupBy(object):
+    """
+    result of DataFrame.groupby
+
+    group codes are computed once, in one pass over the key columns, and reused by every aggregation
+    aggregations write straight into the output columns; no per-group DataFrames are built
+    """
+
+    def __init__(self, df, by, sort=True, dropna=True, as_index=True, columns=None):
+        if ndim(by) == 0:
+            by = [by]
+        by = list(by)
+        for key in by:
+            assert key in df.columns, f"DF groupby key ({key}) not in columns"
+        if columns is None:
+            columns = [x for x in df.columns if x not in by]
+        for col in columns:
+            assert col in df.columns, f"DF groupby column ({col}) not in columns"
+
+        self.df = df
+        self.by = by
+        self.sort = sort
+        self.dropna = dropna
+        self.as_index = as_index
+        self.columns = list(columns)
+        self._grouping = None
+
+    #####################################################################################
+    # internals
+    #####################################################################################
+
+    def _get_grouping(self):
+        """(codes, labels, order): group of each row, key of each group, output order of groups"""
+        if self._grouping is None:
+            keys = [self.df._get_column(key) for key in self.by]
+            codes, labels = _agg._group_codes(keys, dropna=self.dropna)
+            order = list(range(len(labels)))
+            if self.sort:
+                try:
+                    order = sorted(order, key=labels.__getitem__)
+                except TypeError:
+                    # keys that don't compare keep their order of first appearance
+                    pass
+            self._grouping = (codes, labels, order)
+        return self._grouping
+
+    def _spec(self, func):
+        """normalize func to a list of (column, func, output name)"""
+        if isinstance(func, Mapping):
+            spec = []
+            for col, funcs in func.items():
+                assert col in self.df.columns, f"DF groupby agg column ({col}) not in columns"
+                if isinstance(funcs, (str,)) or callable(funcs):
+                    spec.append((col, funcs, col))
+                else:
+                    spec.extend(
+                        [(col, f, f"{col}_{_agg._func_name(f)}") for f in funcs]
+                    )
+            return spec
+        if isinstance(func, str) or callable(func):
+            return [(col, func, col) for col in self.columns]
+        return [
+            (col, f, f"{col}_{_agg._func_name(f)}")
+            for col in self.columns
+            for f in func
+        ]
+
+    def _frame(self, names, data):
+        """DataFrame of aggregated columns, one row per group"""
+        codes, labels, order = self._get_grouping()
+        data = [[col[g] for g in order] for col in data]
+        keys = [labels[g] for g in order]
+        if self.as_index:
+            return self.df._from_columns(
+                data,
+                names,
+                keys,
+                index_name=self.by[0] if len(self.by) == 1 else None,
+                storage=self.df.storage,
+            )
+        if len(self.by) == 1:
+            key_data = [keys]
+        else:
+            key_data = [list(x) for x in zip(*keys)] if keys else [[] for _ in self.by]
+        return self.df._from_columns(
+            key_data + data,
+            self.by + names,
+            range(len(keys)),
+            storage=self.df.storage,
+        )
+
+    def _numeric_columns(self):
+        return [
+            col
+            for col in self.columns
+            if _column_dtype(self.df._get_column(col)) in ("int", "float", "bool")
+        ]
+
+    #####################################################################################
+    # interface
+    #####################################################################################
+
+    def agg(self, func):
+        """
+        aggregate each group
+            func: an aggregation name ("sum", "count", "mean", "min", "max", "first", "last", "std", "var", "size")
+                  or a function of a list of values,
+                  a list of those (output columns are named <column>_<func>),
+                  or a dict of column -> one or a list of those
+        """
+        codes, labels, order = self._get_grouping()
+        spec = self._spec(func)
+        data, names, cache = [], [], {}
+        for col, f, name in spec:
+            values = cache.get(col)
+            if values is None:
+                values = cache[col] = self.df._get_column(col)
+            data.append(_agg._aggregate(codes, values, len(labels), f))
+            names.append(name)
+        return self._frame(names, data)
+
+    aggregate = agg
+
+    def _reduce(self, func, numeric_only=False):
+        columns = self._numeric_columns() if numeric_only else self.columns
+        return self.agg({col: func for col in columns})
+
+    def sum(self, numeric_only=False):
+        return self._reduce("sum", numeric_only)
+
+    def count(self):
+        return self._reduce("count")
+
+    def mean(self, numeric_only=False):
+        return self._reduce("mean", numeric_only)
+
+    def min(self, numeric_only=False):
+        return self._reduce("min", numeric_only)
+
+    def max(self, numeric_only=False):
+        return self._reduce("max", numeric_only)
+
+    def first(self):
+        return self._reduce("first")
+
+    def last(self):
+        return self._reduce("last")
+
+    def std(self, numeric_only=False):
+        return self._reduce("std", numeric_only)
+
+    def var(self, numeric_only=False):
+        return self._reduce("var", numeric_only)
+
+    def size(self):
+        """number of rows in each group, including missing values, as a Col"""
+        codes, labels, order = self._get_grouping()
+        sizes = _agg._agg_size(codes, None, len(labels))
+        return _DuffelCol(
+            [sizes[g] for g in order], name="size", index=[labels[g] for g in order]
+        )
+
+    @property
+    def groups(self):
+        """dict of group key -> list of index values"""
+        codes, labels, order = self._get_grouping()
+        rows = [[] for _ in labels]
+        for g, i in zip(codes, self.df.index):
+            if g >= 0:
+                rows[g].append(i)
+        return {labels[g]: rows[g] for g in order}
+
+    def __getitem__(self, columns):
+        """select the value columns to aggregate"""
+        if ndim(columns) == 0:
+            columns = [columns]
+        selected = _DuffelGroupBy(
+            self.df,
+            self.by,
+            sort=self.sort,
+            dropna=self.dropna,
+            as_index=self.as_index,
+            columns=columns,
+        )
+        selected._grouping = self._grouping
+        return selected
+
+    def __iter__(self):
+        """(key, DataFrame) for each group; builds the sub-DataFrames, so only use it when you need them"""
+        codes, labels, order = self._get_grouping()
+        positions = [[] for _ in labels]
+        for i, g in enumerate(codes):
+            if g >= 0:
+                positions[g].append(i)
+        for g in order:
+            yield labels[g], self.df._take(positions[g])
+
+    def __len__(self):
+        return len(self._get_grouping()[1])
+
+    def __repr__(self):
+        return f"duffel.GroupBy(by={self.by}, groups={len(self)})"
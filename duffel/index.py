@@ -1,2 +1,204 @@
-class _DuffelIndex(object):
-    pass
+from typing import Iterable, Sequence
+from bisect import bisect_left, bisect_right
+
+
+class _DuffelIndex(Sequence):
+    """
+    ordered, unique row labels
+
+    behaves like a read-only list of labels: positional [], len, iteration
+    adds label lookups on top of that:
+        - get_loc(label) is O(1) through a label -> position dict built on first use
+        - label slices are bisect-based when the labels are sorted ascending
+    """
+
+    def __init__(self, labels: Iterable = ()):
+        self._labels = list(labels)
+        self._positions = None
+        self._monotonic = None
+
+    #####################################################################################
+    # internals
+    #####################################################################################
+
+    def _get_positions(self):
+        if self._positions is None:
+            self._positions = {k: v for v, k in enumerate(self._labels)}
+        return self._positions
+
+    def _slice_positions(self, key: slice):
+        """
+        turn a label slice into a positional slice
+        both ends are inclusive, like pandas .loc
+        """
+        start, stop = None, None
+        if self.is_monotonic_increasing:
+            if key.start is not None:
+                start = bisect_left(self._labels, key.start)
+            if key.stop is not None:
+                stop = bisect_right(self._labels, key.stop)
+        else:
+            if key.start is not None:
+                start = self.get_loc(key.start)
+            if key.stop is not None:
+                stop = self.get_loc(key.stop) + 1
+        return slice(start, stop, key.step)
+
+    def _take(self, positions: Iterable):
+        """new index from integer positions"""
+        if isinstance(positions, range) and positions.step > 0:
+            return self[positions.start : positions.stop : positions.step]
+        labels = self._labels
+        return _DuffelIndex([labels[i] for i in positions])
+
+    def _copy(self):
+        """a copy that can be extended in place"""
+        copy = _DuffelIndex(self._labels)
+        if self._positions is not None:
+            copy._positions = dict(self._positions)
+        copy._monotonic = self._monotonic
+        return copy
+
+    def _extend(self, labels: Iterable):
+        """
+        append labels in place in O(1) each, keeping the lookup dict up to date
+        indexes are shared between frames, so only call this on an index no other object holds (see _copy);
+        the caller checks that the new labels are unique
+        """
+        labels = list(labels)
+        if not labels:
+            return self
+        positions = self._get_positions()
+        n = len(self._labels)
+        if self._monotonic:
+            try:
+                last = self._labels[-1] if n else None
+                for label in labels:
+                    if last is not None and not last < label:
+                        self._monotonic = False
+                        break
+                    last = label
+            except TypeError:
+                self._monotonic = False
+        for i, label in enumerate(labels, n):
+            positions[label] = i
+        self._labels.extend(labels)
+        return self
+
+    #####################################################################################
+    # interface
+    #####################################################################################
+
+    @property
+    def is_unique(self):
+        return len(self._get_positions()) == len(self._labels)
+
+    @property
+    def is_monotonic_increasing(self):
+        if self._monotonic is None:
+            labels = self._labels
+            try:
+                self._monotonic = all(
+                    labels[i] < labels[i + 1] for i in range(len(labels) - 1)
+                )
+            except TypeError:
+                # labels of types that don't compare (e.g. str and int)
+                self._monotonic = False
+        return self._monotonic
+
+    def get_loc(self, label):
+        """integer position of label; raises KeyError if label is not in the index"""
+        return self._get_positions()[label]
+
+    def slice_labels(self, key: slice):
+        """labels selected by a label slice"""
+        return self[self._slice_positions(key)]
+
+    def tolist(self):
+        return list(self._labels)
+
+    #####################################################################################
+    # special methods
+    #####################################################################################
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _DuffelIndex(self._labels[i])
+        return self._labels[i]
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __iter__(self):
+        return iter(self._labels)
+
+    def __contains__(self, label):
+        try:
+            return label in self._get_positions()
+        except TypeError:
+            # unhashable
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, _DuffelIndex):
+            other = other._labels
+        return isinstance(other, Iterable) and list(self._labels) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        labels = [str(x) for x in self._labels[:10]]
+        if len(self) > 10:
+            labels.append("...")
+        return f"duffel.Index([{', '.join(labels)}], len={len(self)})"
+
+
+class _DuffelRangeIndex(_DuffelIndex):
+    """
+    the default 0..n-1 index
+    labels are a range object, so nothing is materialized and lookups are arithmetic
+    """
+
+    def __init__(self, start=0, stop=None, step=1):
+        if isinstance(start, range):
+            self._labels = start
+        elif stop is None:
+            self._labels = range(start)
+        else:
+            self._labels = range(start, stop, step)
+        self._positions = None
+        self._monotonic = None
+
+    @property
+    def is_unique(self):
+        return True
+
+    @property
+    def is_monotonic_increasing(self):
+        return self._labels.step > 0 or len(self._labels) <= 1
+
+    def get_loc(self, label):
+        if type(label) is not int or label not in self._labels:
+            raise KeyError(label)
+        return self._labels.index(label)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _DuffelRangeIndex(self._labels[i])
+        return self._labels[i]
+
+    def __contains__(self, label):
+        return type(label) is int and label in self._labels
+
+    def __repr__(self):
+        r = self._labels
+        return f"duffel.RangeIndex(start={r.start}, stop={r.stop}, step={r.step})"
+
+
+def _ensure_index(labels):
+    """wrap labels in an index; existing indexes are immutable, so they are shared"""
+    if isinstance(labels, _DuffelIndex):
+        return labels
+    if isinstance(labels, range):
+        return _DuffelRangeIndex(labels)
+    return _DuffelIndex(labels)
@@ -0,0 +1,333 @@
+"""
+lazy queries
+
+a LazyFrame records steps (filter, select, assign, head, groupby) into a plan and runs nothing until
+collect(); collect() first rewrites the plan:
+    - filters that don't depend on an assign, head, or groupby before them (or on a column a select
+      before them dropped; filter() rejects those) are pushed into the source
+      (for csv: only the columns a filter reads are converted before it runs, and rejected rows are
+      never converted or stored)
+    - only the columns the plan reads are read from the source (for csv: passed on as usecols)
+    - a head() that only has pushed steps before it stops reading the source once it has enough rows
+the remaining steps then run eagerly on the (smaller) DataFrame
+"""
+from typing import Iterable
+
+from .na import ndim
+from .expr import _DuffelExpr
+from . import storage as _storage
+
+
+def _step_text(step):
+    kind, args = step
+    if kind == "filter":
+        return f"FILTER {args!r}"
+    if kind == "select":
+        return f"SELECT {list(args)}"
+    if kind == "assign":
+        return "ASSIGN " + ", ".join([f"{k}={v!r}" for k, v in args.items()])
+    if kind == "head":
+        return f"HEAD {args}"
+    by, func, kwargs = args
+    return f"GROUPBY {by} AGG {func!r}"
+
+
+def _frame_source(df):
+    """a source that reads from an existing DataFrame"""
+
+    def scan(where=None, usecols=None):
+        positions = list(range(len(df)))
+        if where is not None:
+            positions = [i for i, keep in zip(positions, where._eval(df._get_column)) if keep]
+        # _take copies, so the result never shares containers with the original frame
+        yield df._take(positions, columns=usecols)
+
+    return scan
+
+
+def _stitch(frames):
+    """one DataFrame from same-columned chunks, in order"""
+    if len(frames) == 1:
+        return frames[0]
+    first = frames[0]
+    return first._from_columns(
+        [_storage._concat([f._get_column(col) for f in frames]) for col in first.columns],
+        first.columns,
+        [label for f in frames for label in f.index],
+        index_name=first._index_name,
+        storage=first.storage,
+    )
+
+
+class _DuffelLazyFrame(object):
+    """
+    a query plan over a source of DataFrames; build one with duffel.scan_csv(...) or df.lazy()
+    every method returns a new LazyFrame; nothing is read or computed until collect()
+    """
+
+    def __init__(self, source, steps=(), name="frame", project=True):
+        # source(where=None, usecols=None) yields DataFrames
+        self._source = source
+        self._steps = tuple(steps)
+        self._name = name
+        # whether the source can read a subset of columns (csv with index_col can't)
+        self._project = project
+
+    def _with(self, step):
+        return _DuffelLazyFrame(
+            self._source, self._steps + (step,), self._name, self._project
+        )
+
+    #####################################################################################
+    # plan
+    #####################################################################################
+
+    def filter(self, predicate: _DuffelExpr):
+        """keep the rows where predicate (an expression, e.g. duffel.col("age") > 30) is True"""
+        assert isinstance(
+            predicate, _DuffelExpr
+        ), f"duffel lazy filter takes an expression like duffel.col('a') > 1, not {type(predicate)}"
+        visible = _visible_columns(self._steps)
+        if visible is not None:
+            missing = {col for col in predicate.columns if col is not None} - visible
+            assert (
+                not missing
+            ), f"duffel lazy filter column(s) {sorted(missing, key=str)} not in columns"
+        return self._with(("filter", predicate))
+
+    def select(self, columns):
+        """keep only these columns, in this order"""
+        if ndim(columns) == 0:
+            columns = [columns]
+        return self._with(("select", tuple(columns)))
+
+    def assign(self, **columns):
+        """add or replace columns; each value is an expression, a function of the DataFrame, or a scalar"""
+        assert columns, "duffel lazy assign needs at least one column"
+        return self._with(("assign", dict(columns)))
+
+    def head(self, n: int = 5):
+        """keep the first n rows"""
+        assert isinstance(n, int) and n >= 0, f"duffel lazy head n must be an int >= 0, not {n}"
+        return self._with(("head", n))
+
+    def groupby(self, by, sort=True, dropna=True, as_index=True):
+        """group rows; call .agg(...) (or .sum(), .mean(), ...) on the result to continue the plan"""
+        return _DuffelLazyGroupBy(
+            self, by, dict(sort=sort, dropna=dropna, as_index=as_index)
+        )
+
+    #####################################################################################
+    # optimizer
+    #####################################################################################
+
+    def _pushdown(self):
+        """
+        split the plan into (pushed filter, source columns, row limit, remaining steps)
+            pushed filter: the filters that can run inside the source, combined with &, or None
+            source columns: the columns the plan reads, or None for every column
+            row limit: stop reading the source after this many rows, or None
+        """
+        # walk the plan backwards to find the source columns it needs
+        # and, for each select, the columns of it that later steps still read
+        needed = None
+        narrowed = {}
+        for i in reversed(range(len(self._steps))):
+            kind, args = self._steps[i]
+            if kind == "select":
+                # a later (narrower) select drops the columns that aren't in needed anyway
+                needed = set(args) if needed is None else needed & set(args)
+                narrowed[i] = set(needed)
+            elif kind == "groupby":
+                by, func, kwargs = args
+                needed = set(by) | _agg_columns(func)
+            elif needed is None:
+                continue
+            elif kind == "filter":
+                needed |= args.columns
+            elif kind == "assign":
+                needed -= set(args)
+                for value in args.values():
+                    if isinstance(value, _DuffelExpr):
+                        needed |= value.columns
+                    elif callable(value):
+                        # a function may read any column
+                        needed = None
+                        break
+            if needed is not None and None in needed:
+                needed = None
+
+        pushed, rest = [], []
+        assigned = set()
+        blocked = False
+        # a filter only moves past a select that keeps every column it reads
+        visible = None
+        for i, (kind, args) in enumerate(self._steps):
+            if (
+                kind == "filter"
+                and not blocked
+                and not (args.columns & assigned)
+                and (visible is None or args.columns <= visible)
+            ):
+                pushed.append(args)
+                continue
+            if kind == "select":
+                visible = set(args)
+                args = tuple([col for col in args if col in narrowed[i]])
+            elif kind == "assign":
+                assigned.update(args)
+            elif kind in ("head", "groupby"):
+                blocked = True
+            rest.append((kind, args))
+
+        for expr in pushed:
+            if needed is not None:
+                needed |= expr.columns
+        usecols = None
+        if needed is not None and self._project:
+            usecols = sorted(needed, key=str)
+
+        # a head with nothing but selects before it (in the remaining steps) bounds the rows to read
+        limit = None
+        for kind, args in rest:
+            if kind == "head":
+                limit = args
+                break
+            if kind != "select":
+                break
+
+        where = None
+        for expr in pushed:
+            where = expr if where is None else where & expr
+        return where, usecols, limit, rest
+
+    def explain(self):
+        """the optimized plan as text, one step per line, from the source up"""
+        where, usecols, limit, rest = self._pushdown()
+        source = f"SCAN {self._name}"
+        if usecols is not None:
+            source += f" COLUMNS {usecols}"
+        if where is not None:
+            source += f" WHERE {where!r}"
+        if limit is not None:
+            source += f" LIMIT {limit}"
+        return "\n".join([source] + [_step_text(step) for step in rest])
+
+    #####################################################################################
+    # execution
+    #####################################################################################
+
+    def collect(self):
+        """run the plan; returns a DataFrame"""
+        where, usecols, limit, rest = self._pushdown()
+        frames, nrow = [], 0
+        for frame in self._source(where=where, usecols=usecols):
+            frames.append(frame)
+            nrow += len(frame)
+            if limit is not None and nrow >= limit:
+                break
+        df = _stitch(frames)
+        for step in rest:
+            df = _run(df, step)
+        return df
+
+    def __repr__(self):
+        plan = [f"SCAN {self._name}"] + [_step_text(step) for step in self._steps]
+        return "duffel.LazyFrame\n" + "\n".join(["  " + x for x in plan])
+
+
+class _DuffelLazyGroupBy(object):
+    """a pending groupby in a lazy plan; aggregating it adds the step and returns the LazyFrame"""
+
+    def __init__(self, lazy, by, kwargs):
+        self._lazy = lazy
+        self._by = [by] if ndim(by) == 0 else list(by)
+        self._kwargs = kwargs
+
+    def agg(self, func):
+        """see GroupBy.agg"""
+        return self._lazy._with(("groupby", (self._by, func, self._kwargs)))
+
+    aggregate = agg
+
+    def sum(self):
+        return self.agg("sum")
+
+    def count(self):
+        return self.agg("count")
+
+    def mean(self):
+        return self.agg("mean")
+
+    def min(self):
+        return self.agg("min")
+
+    def max(self):
+        return self.agg("max")
+
+
+def _visible_columns(steps):
+    """the columns the plan has after steps, or None when they aren't known (the source's, or a groupby's)"""
+    visible = None
+    for kind, args in steps:
+        if kind == "select":
+            visible = set(args)
+        elif kind == "assign" and visible is not None:
+            visible |= set(args)
+        elif kind == "groupby":
+            visible = None
+    return visible
+
+
+def _agg_columns(func):
+    """source columns a groupby aggregation reads; {None} means every column"""
+    if isinstance(func, dict):
+        return set(func)
+    return {None}
+
+
+def _run(df, step):
+    """run one plan step eagerly"""
+    kind, args = step
+    if kind == "filter":
+        keep = args._eval(df._get_column)
+        return df._take([i for i, k in enumerate(keep) if k])
+    if kind == "select":
+        for col in args:
+            assert col in df.columns, f"duffel lazy select column ({col}) not in columns"
+        return df._from_columns(
+            [df._get_column(col) for col in args],
+            args,
+            df.index,
+            index_name=df._index_name,
+            storage=df.storage,
+        )
+    if kind == "head":
+        return df._take(list(range(min(args, len(df)))))
+    if kind == "assign":
+        columns = list(df.columns)
+        data = [df._get_column(col) for col in columns]
+        for name, value in args.items():
+            if isinstance(value, _DuffelExpr):
+                values = value._eval(
+                    lambda col: data[columns.index(col)]
+                    if col in columns
+                    else df._get_column(col)
+                )
+            elif callable(value):
+                values = list(value(df))
+            else:
+                values = [value] * len(df)
+            assert len(values) == len(
+                df
+            ), f"duffel lazy assign {name} has {len(values)} values for {len(df)} rows"
+            if name in columns:
+                data[columns.index(name)] = values
+            else:
+                columns.append(name)
+                data.append(values)
+        return df._from_columns(
+            data, columns, df.index, index_name=df._index_name, storage=df.storage
+        )
+    by, func, kwargs = args
+    return df.groupby(by, **kwargs).agg(func)
@@ -0,0 +1,83 @@
+"""
+memory-mapped csv parsing
+
+the file is mapped read-only and scanned in blocks of whole records, straight from the page cache:
+    - a block ends on a record-ending newline (quote-aware, as in parallel.py), found on the raw bytes
+    - each block is decoded and split into records on its own; the file is never read into
+      Python memory as a whole, and one mapping is shared by every chunk of a read
+    - with usecols, only the wanted fields of each record are kept, so the other fields are
+      dropped a block at a time instead of being buffered for the whole file
+
+blocks without quotes are split with str.split at C speed; blocks with quotes (or lone \\r line
+endings) go through csv.reader, so quoted commas and newlines parse exactly as they do elsewhere
+"""
+from itertools import repeat
+from operator import itemgetter
+import csv
+import io
+import mmap as _mmap
+import os
+
+from .builder import _paused_gc
+from .parallel import _ENCODING, _count_quotes, _record_end
+
+# blocks start small, so nrows and the first chunk don't parse megabytes, and double up to _MAX_BLOCK
+_MIN_BLOCK = 1 << 16
+_MAX_BLOCK = 1 << 22
+
+
+def _map(path):
+    """read-only mmap of the file at path; None for an empty file, which can't be mapped"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+
+
+def _parse_block(data, positions=None):
+    """
+    records (lists of raw strings) in bytes of whole csv records, skipping empty ones
+    with positions, each record is a tuple of just the fields at those positions
+    """
+    text = str(data, _ENCODING)
+    if "\r" in text and '"' not in text:
+        text = text.replace("\r\n", "\n")
+    if '"' in text or "\r" in text:
+        records = csv.reader(io.StringIO(text, newline=""))
+    else:
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        records = map(str.split, lines, repeat(","))
+    records = list(filter(any, records))
+    if positions is None:
+        return records
+    try:
+        if len(positions) == 1:
+            return list(zip(map(itemgetter(*positions), records)))
+        return list(map(itemgetter(*positions), records))
+    except IndexError:
+        # short records: missing fields are empty
+        return [tuple([x[i] if i < len(x) else "" for i in positions]) for x in records]
+
+
+def _blocks(mm, start, positions=None):
+    """yield lists of records (see _parse_block) from byte offset start of the mapped file mm to its end"""
+    size = len(mm)
+    block = _MIN_BLOCK
+    pos = start
+    while pos < size:
+        target = pos + block
+        nl = mm.find(b"\n", target)
+        if target >= size or nl == -1:
+            end = size
+        elif mm.find(b'"', pos, nl) == -1:
+            # no quotes up to the next newline, so it ends a record
+            end = nl + 1
+        else:
+            end = _record_end(mm, target, size, _count_quotes(mm, pos, target) % 2 == 1)
+        with _paused_gc():
+            records = _parse_block(mm[pos:end], positions)
+        yield records
+        pos = end
+        block = min(block * 2, _MAX_BLOCK)
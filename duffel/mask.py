@@ -0,0 +1,146 @@
+"""
+boolean masks
+
+a Mask is what Col comparisons return: one byte (0 or 1) per row in a bytearray
+    - & | ~ work on the whole buffer at once instead of value by value
+    - .loc / [] recognize a Mask by type and gather the selected rows straight from it,
+      without checking what kind of list they were given
+"""
+from array import array
+from itertools import compress
+from typing import Iterable
+
+from .categorical import _DuffelCategorical
+
+# byte translation table for ~: 0 => 1, 1 => 0
+_FLIP = bytes([1, 0]) + bytes(254)
+
+
+class _DuffelMask(object):
+    """
+    one True/False per row, stored as a bytearray of 0 and 1
+    build one from any iterable of truthy values, or get one from a Col comparison
+    """
+
+    def __init__(self, values: Iterable = ()):
+        if isinstance(values, _DuffelMask):
+            self._data = bytearray(values._data)
+        else:
+            self._data = bytearray(map(bool, values))
+
+    @classmethod
+    def _from_bytes(cls, data: bytearray):
+        """wrap a bytearray of 0 and 1 without copying or checking it"""
+        self = cls.__new__(cls)
+        self._data = data
+        return self
+
+    #####################################################################################
+    # internals
+    #####################################################################################
+
+    def _other(self, other):
+        """the bytes of another mask or iterable of bools, checked for length"""
+        data = other._data if isinstance(other, _DuffelMask) else bytearray(map(bool, other))
+        assert len(data) == len(
+            self._data
+        ), f"Mask lengths must match; {len(self._data)} != {len(data)}"
+        return data
+
+    def _positions(self):
+        """integer positions of the True rows"""
+        return list(compress(range(len(self._data)), self._data))
+
+    def _compress(self, values):
+        """the values at the True rows, in a container of the same kind"""
+        if isinstance(values, array):
+            return array(values.typecode, compress(values, self._data))
+        if isinstance(values, _DuffelCategorical):
+            return values._compress(self._data)
+        if isinstance(values, memoryview):
+            return array(values.format, compress(values, self._data))
+        return list(compress(values, self._data))
+
+    #####################################################################################
+    # interface
+    #####################################################################################
+
+    def sum(self):
+        """number of True rows"""
+        return self._data.count(1)
+
+    def any(self):
+        return 1 in self._data
+
+    def all(self):
+        return 0 not in self._data
+
+    def tolist(self):
+        return [x == 1 for x in self._data]
+
+    #####################################################################################
+    # special methods
+    #####################################################################################
+
+    def __and__(self, other):
+        other = self._other(other)
+        n = len(self._data)
+        return self._from_bytes(
+            bytearray(
+                (
+                    int.from_bytes(self._data, "little") & int.from_bytes(other, "little")
+                ).to_bytes(n, "little")
+            )
+        )
+
+    __rand__ = __and__
+
+    def __or__(self, other):
+        other = self._other(other)
+        n = len(self._data)
+        return self._from_bytes(
+            bytearray(
+                (
+                    int.from_bytes(self._data, "little") | int.from_bytes(other, "little")
+                ).to_bytes(n, "little")
+            )
+        )
+
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        other = self._other(other)
+        n = len(self._data)
+        return self._from_bytes(
+            bytearray(
+                (
+                    int.from_bytes(self._data, "little") ^ int.from_bytes(other, "little")
+                ).to_bytes(n, "little")
+            )
+        )
+
+    def __invert__(self):
+        return self._from_bytes(self._data.translate(_FLIP))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._from_bytes(self._data[i])
+        return self._data[i] == 1
+
+    def __eq__(self, other):
+        if isinstance(other, _DuffelMask):
+            return self._data == other._data
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        shown = ", ".join(["True" if x else "False" for x in self._data[:16]])
+        more = ", ..." if len(self._data) > 16 else ""
+        return f"duffel.Mask([{shown}{more}], len={len(self._data)}, true={self.sum()})"
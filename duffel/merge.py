@@ -0,0 +1,242 @@
+"""
+hash joins
+
+the smaller side is loaded into a dict of key -> row position(s) and the larger side is streamed past it
+the join itself only produces two lists of row positions; output columns are gathered straight from
+storage with them, so no intermediate rows or _DuffelRow objects are built
+"""
+from .na import NA, ndim
+from .categorical import _DuffelCategorical
+from . import storage as _storage
+
+HOWS = ("inner", "left", "right", "outer")
+
+
+def _join_keys(key_columns):
+    """one hashable key per row: the value itself for one key column, a tuple for several"""
+    if len(key_columns) == 1:
+        return key_columns[0]
+    return list(zip(*key_columns))
+
+
+def _category_keys(left_keys, right_keys):
+    """
+    for a single key column that is a Categorical on either side: both sides' keys as integer codes of
+    the same category table, so the join hashes small ints instead of values; None otherwise
+    values the table doesn't have get None, which never matches a code
+    """
+    if len(left_keys) != 1:
+        return None
+    left, right = left_keys[0], right_keys[0]
+    if isinstance(left, _DuffelCategorical):
+        if isinstance(right, _DuffelCategorical):
+            if right._table is not left._table:
+                # right's codes in left's table, computed once per category
+                remap = [0] + left._codes_for(right.categories)
+                return left._codes, list(map(remap.__getitem__, right._codes))
+            return left._codes, right._codes
+        return left._codes, left._codes_for(right)
+    if isinstance(right, _DuffelCategorical):
+        return right._codes_for(left), right._codes
+    return None
+
+
+def _hash_positions(keys):
+    """dict of key -> row position, or list of positions for repeated keys"""
+    table = {}
+    for i, k in enumerate(keys):
+        p = table.get(k)
+        if p is None:
+            table[k] = i
+        elif type(p) is int:
+            table[k] = [p, i]
+        else:
+            p.append(i)
+    return table
+
+
+def _join_positions(a_keys, b_keys, how="inner"):
+    """
+    row position pairs of a join of a and b, in the row order of a
+        how="inner": only matching pairs
+        how="left":  also a rows without a match
+        how="outer": also b rows without a match, appended at the end in b order
+    rows without a match on the other side are paired with -1
+    """
+    na, nb = len(a_keys), len(b_keys)
+    keep_a = how in ("left", "outer")
+    matched = bytearray(nb) if how == "outer" else None
+    apos, bpos = [], []
+
+    if nb <= na:
+        # hash b, stream a: pairs come out in a order
+        table = _hash_positions(b_keys)
+        get = table.get
+        for i, k in enumerate(a_keys):
+            m = get(k)
+            if m is None:
+                if keep_a:
+                    apos.append(i)
+                    bpos.append(-1)
+            elif type(m) is int:
+                apos.append(i)
+                bpos.append(m)
+                if matched is not None:
+                    matched[m] = 1
+            else:
+                apos.extend([i] * len(m))
+                bpos.extend(m)
+                if matched is not None:
+                    for j in m:
+                        matched[j] = 1
+    else:
+        # hash a, stream b, then bucket the matches by a position to restore a order
+        table = _hash_positions(a_keys)
+        get = table.get
+        buckets = [None] * na
+        for j, k in enumerate(b_keys):
+            m = get(k)
+            if m is None:
+                continue
+            if matched is not None:
+                matched[j] = 1
+            for i in [m] if type(m) is int else m:
+                bucket = buckets[i]
+                if bucket is None:
+                    buckets[i] = [j]
+                else:
+                    bucket.append(j)
+        for i, bucket in enumerate(buckets):
+            if bucket is not None:
+                apos.extend([i] * len(bucket))
+                bpos.extend(bucket)
+            elif keep_a:
+                apos.append(i)
+                bpos.append(-1)
+
+    if matched is not None:
+        for j in range(nb):
+            if not matched[j]:
+                apos.append(-1)
+                bpos.append(j)
+    return apos, bpos
+
+
+def _take_or_na(values, positions, missing):
+    """gather values at positions; position -1 gives NA"""
+    if not missing:
+        return _storage._take(values, positions)
+    return [values[i] if i >= 0 else NA for i in positions]
+
+
+def _merge(
+    left,
+    right,
+    how: str = "inner",
+    on=None,
+    left_on=None,
+    right_on=None,
+    left_index: bool = False,
+    right_index: bool = False,
+    suffixes=("_x", "_y"),
+):
+    """
+    database-style join of two DataFrames
+
+    how: "inner", "left", "right", or "outer"
+        inner/left/outer keep the row order of left (outer appends right-only rows at the end)
+        right keeps the row order of right
+    on: column name(s) in both frames to join on
+    left_on, right_on: column name(s) to join on when they differ between the frames
+    left_index, right_index: join on the index instead of columns
+    suffixes: added to overlapping non-key column names from left and right
+
+    if no keys are given, joins on the columns the frames have in common
+    many-to-many matches produce every pair of rows
+    """
+    # df.py imports this module, so the DataFrame class is imported here instead of at the top
+    from .df import _DuffelDataFrame
+
+    assert how in HOWS, f"duffel merge how must be in {HOWS}, not {how}"
+    assert isinstance(
+        right, _DuffelDataFrame
+    ), f"duffel merge right must be a DataFrame, not {type(right)}"
+
+    ### resolve keys
+    if on is not None:
+        assert (
+            left_on is None and right_on is None
+        ), "duffel merge takes on OR left_on/right_on, not both"
+        left_on = right_on = on
+    if left_on is None and right_on is None and not left_index and not right_index:
+        left_on = right_on = [c for c in left.columns if c in right._rep_columns]
+        assert left_on, "duffel merge needs on=, left_on/right_on, or columns in common"
+    if left_on is not None and ndim(left_on) == 0:
+        left_on = [left_on]
+    if right_on is not None and ndim(right_on) == 0:
+        right_on = [right_on]
+    assert (
+        left_index or left_on is not None
+    ), "duffel merge needs left_on or left_index=True"
+    assert (
+        right_index or right_on is not None
+    ), "duffel merge needs right_on or right_index=True"
+
+    left_keys = [left.index] if left_index else [left._get_column(c) for c in left_on]
+    right_keys = (
+        [right.index] if right_index else [right._get_column(c) for c in right_on]
+    )
+    assert len(left_keys) == len(
+        right_keys
+    ), f"duffel merge must join on the same number of keys; left {len(left_keys)}, right {len(right_keys)}"
+
+    ### join => row position pairs
+    codes = _category_keys(left_keys, right_keys)
+    if codes is not None:
+        lkeys, rkeys = codes
+    else:
+        lkeys, rkeys = _join_keys(left_keys), _join_keys(right_keys)
+    if how == "right":
+        rpos, lpos = _join_positions(rkeys, lkeys, "left")
+    else:
+        lpos, rpos = _join_positions(lkeys, rkeys, how)
+    left_missing = how in ("right", "outer")
+    right_missing = how in ("left", "outer")
+
+    ### output columns
+    # key columns with the same name on both sides are kept once, filled from whichever side matched
+    shared = []
+    if left_on is not None and right_on is not None:
+        shared = [l for l, r in zip(left_on, right_on) if l == r]
+    left_cols = list(left.columns)
+    right_cols = [c for c in right.columns if c not in shared]
+    overlap = set(left_cols) & set(right_cols)
+
+    names, data = [], []
+    for col in left_cols:
+        values = left._get_column(col)
+        if col in shared and left_missing:
+            other = right._get_column(col)
+            values = [
+                values[i] if i >= 0 else other[j] for i, j in zip(lpos, rpos)
+            ]
+        else:
+            values = _take_or_na(values, lpos, left_missing)
+        names.append(f"{col}{suffixes[0]}" if col in overlap else col)
+        data.append(values)
+    for col in right_cols:
+        names.append(f"{col}{suffixes[1]}" if col in overlap else col)
+        data.append(_take_or_na(right._get_column(col), rpos, right_missing))
+
+    ### output index
+    if left_index and right_index:
+        lindex, rindex = left.index, right.index
+        index = [lindex[i] if i >= 0 else rindex[j] for i, j in zip(lpos, rpos)]
+        index_name = left._index_name
+    else:
+        index = range(len(lpos))
+        index_name = None
+
+    return left._from_columns(
+        data, names, index, index_name=index_name, storage=left.storage
+    )
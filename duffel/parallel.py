@@ -0,0 +1,163 @@
+"""
+multi-process csv parsing
+
+the data section of a file is split into byte ranges that start and end on record boundaries;
+each range is parsed and converted in its own process, and the columns come back in file order
+
+a newline only ends a record when the quotes before it are balanced, so quoted newlines are safe
+"""
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import io
+import locale
+import os
+
+from .dtypes import _spec_converter, _csv_columns
+from .storage import _to_column, _concat
+
+# the same encoding open(filename, "r") uses
+_ENCODING = locale.getpreferredencoding(False)
+
+_BLOCK = 1 << 16
+
+
+def _count_quotes(f, start, end):
+    """number of quote bytes in f between byte offsets start and end"""
+    f.seek(start)
+    n = 0
+    while start < end:
+        block = f.read(min(_BLOCK, end - start))
+        if not block:
+            break
+        n += block.count(b'"')
+        start += len(block)
+    return n
+
+
+def _record_end(f, pos, size, quoted):
+    """
+    byte offset just after the first record-ending newline at or after pos
+    quoted says whether pos is inside a quoted field
+    """
+    f.seek(pos)
+    while pos < size:
+        block = f.read(_BLOCK)
+        if not block:
+            break
+        j = 0
+        while True:
+            nl = block.find(b"\n", j)
+            if nl == -1:
+                quoted ^= block.count(b'"', j) % 2 == 1
+                break
+            quoted ^= block.count(b'"', j, nl) % 2 == 1
+            if not quoted:
+                return pos + nl + 1
+            j = nl + 1
+        pos += len(block)
+    return size
+
+
+def _split_ranges(path, start, workers):
+    """split bytes [start, end of file) into at most workers (start, end) ranges of whole records"""
+    size = os.path.getsize(path)
+    bounds = [start]
+    with open(path, "rb") as f:
+        for k in range(1, workers):
+            target = start + (size - start) * k // workers
+            pos = bounds[-1]
+            if target <= pos:
+                continue
+            quoted = _count_quotes(f, pos, target) % 2 == 1
+            end = _record_end(f, target, size, quoted)
+            if end >= size:
+                break
+            bounds.append(end)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _read_head(path, skiprows, header, nsample):
+    """
+    parse the start of the file in this process
+    returns (header record or None, byte offset where the data starts, first nsample data records)
+    """
+    with open(path, "rb") as f:
+        return _scan_head(f, skiprows, header, nsample)
+
+
+def _scan_head(f, skiprows, header, nsample):
+    """_read_head on an open binary file (or mmap), from its current position"""
+    found_header = None
+    data_start = None
+    sample = []
+    while len(sample) < nsample:
+        pos = f.tell()
+        raw = f.readline()
+        if not raw:
+            break
+        # a record continues onto the next line while a quoted field is open
+        while raw.count(b'"') % 2 == 1:
+            more = f.readline()
+            if not more:
+                break
+            raw += more
+        record = next(csv.reader(io.StringIO(raw.decode(_ENCODING), newline="")), [])
+
+        if skiprows > 0:
+            skiprows -= 1
+            continue
+        if not any(record):
+            continue
+        if header and found_header is None:
+            found_header = record
+            continue
+        if data_start is None:
+            data_start = pos
+        sample.append(record)
+    if data_start is None:
+        data_start = f.tell()
+    return found_header, data_start, sample
+
+
+def _parse_range(path, start, end, positions, specs, names):
+    """worker: parse and convert the records in bytes [start, end) of path"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    text = io.TextIOWrapper(io.BytesIO(data), encoding=_ENCODING, newline="")
+    records = []
+    for line in csv.reader(text):
+        if not any(line):
+            continue
+        if positions is not None:
+            n = len(line)
+            line = [line[i] if i < n else "" for i in positions]
+        records.append(line)
+    if positions is None:
+        width = max(map(len, records), default=0)
+        assert width <= len(names), (
+            f"duffel.read_csv found a row with {width} fields in bytes {start}-{end}, but the file has "
+            f"{len(names)} columns (from the header, columns, or its first rows); pass columns= to name them all"
+        )
+    parsers = [_spec_converter(spec, name=name) for spec, name in zip(specs, names)]
+    # typed buffers pickle as raw bytes, which keeps the trip back to the parent cheap
+    return [_to_column(col) for col in _csv_columns(records, parsers, len(names))]
+
+
+def _parse_parallel(path, data_start, positions, specs, names, workers):
+    """parse the data section of path with a pool of workers; returns converted columns in order"""
+    ranges = _split_ranges(path, data_start, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(
+            pool.map(
+                _parse_range,
+                [path for _ in ranges],
+                [a for a, b in ranges],
+                [b for a, b in ranges],
+                [positions for _ in ranges],
+                [specs for _ in ranges],
+                [names for _ in ranges],
+            )
+        )
+    return [_concat([part[i] for part in parts]) for i in range(len(names))]
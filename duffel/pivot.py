@@ -0,0 +1,136 @@
+"""
+pivot tables
+
+rows get a row-group code and a column-group code in one pass each over the key columns (agg._group_codes);
+each (row group, column group) pair that actually occurs gets one accumulator slot, and every value column is
+then aggregated into those slots in a single pass with the groupby kernels
+the wide result is filled straight from the slots; no long intermediate frame is built and reshaped
+"""
+from .na import NA, ndim
+from .dtypes import _column_dtype
+from . import agg as _agg
+
+
+def _keys(df, keys, what):
+    if keys is None:
+        return []
+    if ndim(keys) == 0:
+        keys = [keys]
+    keys = list(keys)
+    for key in keys:
+        assert key in df.columns, f"DF pivot_table {what} ({key}) not in columns"
+    return keys
+
+
+def _sorted_order(labels, sort):
+    order = list(range(len(labels)))
+    if sort:
+        try:
+            order = sorted(order, key=labels.__getitem__)
+        except TypeError:
+            # keys that don't compare keep their order of first appearance
+            pass
+    return order
+
+
+def _label_name(label):
+    return "_".join(map(str, label)) if isinstance(label, tuple) else label
+
+
+def _pivot_table(
+    df,
+    values=None,
+    index=None,
+    columns=None,
+    aggfunc="mean",
+    fill_value=None,
+    dropna=True,
+    sort=True,
+):
+    """
+    spreadsheet-style pivot table; see DataFrame.pivot_table
+    """
+    index = _keys(df, index, "index")
+    columns = _keys(df, columns, "columns")
+    assert index or columns, "DF pivot_table needs index= and/or columns="
+    if values is None:
+        values = [
+            col
+            for col in df.columns
+            if col not in index
+            and col not in columns
+            and _column_dtype(df._get_column(col)) in ("int", "float", "bool")
+        ]
+    else:
+        values = _keys(df, values, "values")
+    funcs = [aggfunc] if isinstance(aggfunc, str) or callable(aggfunc) else list(aggfunc)
+    fill = NA if fill_value is None else fill_value
+
+    ### one code per row for the row keys and for the column keys
+    nrow = len(df)
+    if index:
+        rcodes, rlabels = _agg._group_codes(
+            [df._get_column(x) for x in index], dropna=dropna
+        )
+    else:
+        rcodes, rlabels = [0] * nrow, [values[0] if len(values) == 1 else None]
+    if columns:
+        ccodes, clabels = _agg._group_codes(
+            [df._get_column(x) for x in columns], dropna=dropna
+        )
+    else:
+        ccodes, clabels = [0] * nrow, [None]
+    ncl = len(clabels)
+
+    ### one accumulator slot per (row group, column group) pair that occurs
+    slots = {}
+    codes = []
+    append = codes.append
+    for r, c in zip(rcodes, ccodes):
+        if r < 0 or c < 0:
+            append(-1)
+            continue
+        key = r * ncl + c
+        s = slots.get(key)
+        if s is None:
+            s = slots[key] = len(slots)
+        append(s)
+    cells = [(key // ncl, key % ncl, s) for key, s in slots.items()]
+
+    ### aggregate every value column into the slots, then spread the slots out wide
+    rorder = _sorted_order(rlabels, sort)
+    corder = _sorted_order(clabels, sort)
+    rpos = [0] * len(rlabels)
+    for i, r in enumerate(rorder):
+        rpos[r] = i
+
+    names, data = [], []
+    for value in values:
+        column = df._get_column(value)
+        for func in funcs:
+            result = _agg._aggregate(codes, column, len(slots), func)
+            wide = [[fill] * len(rlabels) for _ in clabels]
+            for r, c, s in cells:
+                wide[c][rpos[r]] = result[s]
+            for c in corder:
+                parts = []
+                if len(values) > 1 or not columns:
+                    parts.append(value)
+                if len(funcs) > 1:
+                    parts.append(_agg._func_name(func))
+                if columns:
+                    parts.append(_label_name(clabels[c]))
+                names.append(
+                    parts[0] if len(parts) == 1 else "_".join(map(str, parts))
+                )
+                data.append(wide[c])
+
+    if index:
+        row_index = [rlabels[r] for r in rorder]
+        index_name = index[0] if len(index) == 1 else None
+    else:
+        row_index = [rlabels[0]] if rlabels else []
+        index_name = None
+    return df._from_columns(
+        data, names, row_index, index_name=index_name, storage=df.storage
+    )
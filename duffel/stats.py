@@ -0,0 +1,359 @@
+"""
+column reductions
+
+every reduction walks a column once and skips missing values (None, NA)
+median and quantiles use selection (quickselect) instead of sorting the column;
+asking for several quantiles at once partitions the column once for all of them
+"""
+import math
+from array import array
+from collections import Counter
+from operator import mul as _mul
+from typing import Iterable
+
+from .na import NA
+from .categorical import _DuffelCategorical
+
+DESCRIBE = ("count", "mean", "std", "min", "25%", "50%", "75%", "max")
+
+# below this many values sorting is cheaper than partitioning
+_SORT_SIZE = 32
+
+
+def _present(values: Iterable):
+    """the non-missing values of a column, as a list"""
+    if isinstance(values, array) and values.typecode == "q":
+        return list(values)
+    return [v for v in values if v is not None and v == v]
+
+
+def _col_sum(values):
+    # start from the first value instead of 0 so that e.g. str columns concatenate
+    total = None
+    for v in values:
+        if v is not None and v == v:
+            total = v if total is None else total + v
+    return 0 if total is None else total
+
+
+def _col_min(values):
+    out = None
+    for v in values:
+        if v is not None and v == v and (out is None or v < out):
+            out = v
+    return NA if out is None else out
+
+
+def _col_max(values):
+    out = None
+    for v in values:
+        if v is not None and v == v and (out is None or v > out):
+            out = v
+    return NA if out is None else out
+
+
+def _col_mode(values):
+    """most common non-missing value(s), sorted when they compare"""
+    counts = Counter(v for v in values if v is not None and v == v)
+    if not counts:
+        return []
+    top = max(counts.values())
+    modes = [v for v, n in counts.items() if n == top]
+    try:
+        modes.sort()
+    except TypeError:
+        pass
+    return modes
+
+
+def _col_nunique(values, dropna=True):
+    """number of distinct values; missing values (None, NA) count as one more if dropna is False"""
+    if isinstance(values, _DuffelCategorical):
+        counts = values._counts()
+        return len(counts) - 1 if dropna and 0 in counts else len(counts)
+    distinct = set(values)
+    missing = len([v for v in distinct if v is None or v != v])
+    n = len(distinct) - missing
+    return n if dropna or not missing else n + 1
+
+
+def _pivot(values):
+    """median of the first, middle, and last values"""
+    a, b, c = values[0], values[len(values) // 2], values[-1]
+    if a > b:
+        a, b = b, a
+    if b > c:
+        b = c
+    return a if a > b else b
+
+
+def _select_many(values, ranks):
+    """
+    {rank: value} for the k-th smallest values (0-based) at each of ranks, by multi-quickselect
+    each partition step splits the requested ranks between its sides, so several ranks share the work
+    values is not modified
+    """
+    out = {}
+    # stack of (values, ranks wanted from them, rank offset of values[0])
+    stack = [(values, sorted(set(ranks)), 0)]
+    while stack:
+        values, ranks, offset = stack.pop()
+        if len(values) <= _SORT_SIZE:
+            values = sorted(values)
+            for k in ranks:
+                out[k] = values[k - offset]
+            continue
+        pivot = _pivot(values)
+        lo = [v for v in values if v < pivot]
+        hi = [v for v in values if v > pivot]
+        nlo = offset + len(lo)
+        nhi = offset + len(values) - len(hi)
+        lo_ranks = [k for k in ranks if k < nlo]
+        hi_ranks = [k for k in ranks if k >= nhi]
+        for k in ranks:
+            if nlo <= k < nhi:
+                out[k] = pivot
+        if lo_ranks:
+            stack.append((lo, lo_ranks, offset))
+        if hi_ranks:
+            stack.append((hi, hi_ranks, nhi))
+    return out
+
+
+def _quantiles(present, qs):
+    """
+    linearly interpolated quantiles of a list of non-missing values, one per q in qs
+    all the order statistics needed are selected together
+    """
+    n = len(present)
+    if not n:
+        return [NA for _ in qs]
+    for q in qs:
+        assert 0 <= q <= 1, f"duffel quantile must be between 0 and 1, not {q}"
+    positions = [q * (n - 1) for q in qs]
+    ranks = set()
+    for p in positions:
+        ranks.add(math.floor(p))
+        ranks.add(math.ceil(p))
+    ranked = _select_many(present, ranks)
+    out = []
+    for p in positions:
+        lo, hi = math.floor(p), math.ceil(p)
+        a, b = ranked[lo], ranked[hi]
+        out.append(a if lo == hi else a + (b - a) * (p - lo))
+    return out
+
+
+def _col_median(values):
+    return _quantiles(_present(values), [0.5])[0]
+
+
+def _describe(values):
+    """
+    count, mean, std, min, 25%, 50%, 75%, max of a numeric column
+    one pass gathers the non-missing values with a running mean / sum of squares (Welford) and min / max;
+    the quartiles are then selected together from the gathered values
+    """
+    present = []
+    append = present.append
+    n, mean, m2 = 0, 0.0, 0.0
+    lo = hi = None
+    for v in values:
+        if v is None or v != v:
+            continue
+        append(v)
+        n += 1
+        delta = v - mean
+        mean += delta / n
+        m2 += delta * (v - mean)
+        if lo is None or v < lo:
+            lo = v
+        if hi is None or v > hi:
+            hi = v
+    if not n:
+        return [0] + [NA] * (len(DESCRIBE) - 1)
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else NA
+    return [n, mean, std, lo, *_quantiles(present, [0.25, 0.5, 0.75]), hi]
+
+
+def _map_present(func, values):
+    """apply func to every non-missing value, keeping the column's container type when it still fits"""
+    out = [v if v is None or v != v else func(v) for v in values]
+    if isinstance(values, array):
+        try:
+            return array(values.typecode, out)
+        except TypeError:
+            pass
+    return out
+
+
+# rows per block when accumulating co-moments; bounds the centered copies kept in memory
+_BLOCK_ROWS = 1 << 16
+
+
+def _combine(a, b):
+    """
+    merge two (n, mean x, mean y, M2 x, M2 y, C xy) co-moment tuples (Chan et al.'s parallel update)
+    M2 is the sum of squared deviations from the mean and C the sum of cross-deviations
+    """
+    na, nb = a[0], b[0]
+    if not na:
+        return b
+    if not nb:
+        return a
+    n = na + nb
+    dx = b[1] - a[1]
+    dy = b[2] - a[2]
+    f = na * nb / n
+    return (
+        n,
+        a[1] + dx * nb / n,
+        a[2] + dy * nb / n,
+        a[3] + b[3] + dx * dx * f,
+        a[4] + b[4] + dy * dy * f,
+        a[5] + b[5] + dx * dy * f,
+    )
+
+
+class _DuffelComoments(object):
+    """
+    mergeable pairwise co-moments of numeric columns, for cov and corr
+
+    every pair of columns keeps (count, means, sums of squared deviations, sum of cross-deviations)
+    over the rows where both are present; rows are folded in block by block and blocks are combined
+    with the parallel (Chan) form of Welford's update, so no pass over the data is ever repeated
+
+    accumulators built from separate chunks or processes can be combined with merge()
+
+        acc = duffel.Comoments()
+        for chunk in duffel.read_csv(filename, chunksize=100000):
+            acc.update(chunk)
+        acc.corr()
+    """
+
+    def __init__(self, columns: Iterable = None):
+        self.columns = None if columns is None else list(columns)
+        self._pairs = None
+        # results are built as DataFrames of the same class and storage as the first frame seen
+        self._frame = None
+        self._storage = "rows"
+
+    def _start(self, df):
+        if self.columns is None:
+            self.columns = df._numeric_columns()
+        k = len(self.columns)
+        self._pairs = [(0, 0.0, 0.0, 0.0, 0.0, 0.0)] * (k * k)
+        self._frame = type(df)
+        self._storage = df.storage
+
+    def update(self, df):
+        """fold the rows of a DataFrame into the accumulator; returns self"""
+        if self._pairs is None:
+            self._start(df)
+        for col in self.columns:
+            assert col in df.columns, f"duffel comoments column ({col}) not in columns"
+        data = [df._get_column(col) for col in self.columns]
+        nrow = len(df)
+        for start in range(0, nrow, _BLOCK_ROWS):
+            self._update_block([x[start : start + _BLOCK_ROWS] for x in data])
+        return self
+
+    def _update_block(self, data):
+        """fold one block of columns in; centered copies of each column are made once, not per pair"""
+        k = len(data)
+        nrow = len(data[0]) if data else 0
+        centered, squares, present, totals = [], [], [], []
+        for values in data:
+            mask = [0.0 if v is None or v != v else 1.0 for v in values]
+            count = sum(mask)
+            shift = (
+                math.fsum([v for v, m in zip(values, mask) if m]) / count if count else 0.0
+            )
+            xc = [v - shift if m else 0.0 for v, m in zip(values, mask)]
+            sq = list(map(_mul, xc, xc))
+            centered.append((xc, shift))
+            squares.append(sq)
+            # columns without missing values skip the masked sums below
+            present.append(None if count == nrow else mask)
+            totals.append((sum(xc), sum(sq)))
+
+        pairs = self._pairs
+        for i in range(k):
+            xc, x_shift = centered[i]
+            pi = present[i]
+            for j in range(i, k):
+                yc, y_shift = centered[j]
+                pj = present[j]
+                if pi is None and pj is None:
+                    n = nrow
+                    sx, sxx = totals[i]
+                    sy, syy = totals[j]
+                elif pi is None:
+                    n = sum(pj)
+                    sx, sxx = sum(map(_mul, xc, pj)), sum(map(_mul, squares[i], pj))
+                    sy, syy = totals[j]
+                elif pj is None:
+                    n = sum(pi)
+                    sx, sxx = totals[i]
+                    sy, syy = sum(map(_mul, yc, pi)), sum(map(_mul, squares[j], pi))
+                else:
+                    n = sum(map(_mul, pi, pj))
+                    sx, sxx = sum(map(_mul, xc, pj)), sum(map(_mul, squares[i], pj))
+                    sy, syy = sum(map(_mul, yc, pi)), sum(map(_mul, squares[j], pi))
+                if not n:
+                    continue
+                sxy = sxx if i == j else sum(map(_mul, xc, yc))
+                block = (
+                    n,
+                    x_shift + sx / n,
+                    y_shift + sy / n,
+                    sxx - sx * sx / n,
+                    syy - sy * sy / n,
+                    sxy - sx * sy / n,
+                )
+                pairs[i * k + j] = _combine(pairs[i * k + j], block)
+
+    def merge(self, other):
+        """combine another accumulator over the same columns into this one; returns self"""
+        if other._pairs is None:
+            return self
+        if self._pairs is None:
+            self.columns = list(other.columns)
+            self._pairs = list(other._pairs)
+            self._frame = other._frame
+            self._storage = other._storage
+            return self
+        assert (
+            self.columns == other.columns
+        ), f"duffel comoments columns must match to merge; {self.columns} != {other.columns}"
+        self._pairs = [_combine(a, b) for a, b in zip(self._pairs, other._pairs)]
+        return self
+
+    def _matrix(self, func):
+        assert self._pairs is not None, "duffel comoments has no data; call update() first"
+        k = len(self.columns)
+        out = [[NA] * k for _ in range(k)]
+        for i in range(k):
+            for j in range(i, k):
+                out[i][j] = out[j][i] = func(self._pairs[i * k + j])
+        return self._frame._from_columns(
+            out, self.columns, self.columns, storage=self._storage
+        )
+
+    def cov(self, ddof: int = 1):
+        """pairwise covariance matrix as a DataFrame"""
+        return self._matrix(lambda p: p[5] / (p[0] - ddof) if p[0] > ddof else NA)
+
+    def corr(self):
+        """pairwise Pearson correlation matrix as a DataFrame"""
+
+        def corr(p):
+            denom = math.sqrt(p[3] * p[4])
+            if p[0] < 2 or not denom:
+                return NA
+            return max(-1.0, min(1.0, p[5] / denom))
+
+        return self._matrix(corr)
+
+    def __repr__(self):
+        return f"duffel.Comoments(columns={self.columns})"
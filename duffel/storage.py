@@ -0,0 +1,146 @@
+"""
+column-major storage for DataFrames
+
+a columnar DataFrame keeps one container per column instead of one list per row
+    - columns of only ints are packed into array.array("q")
+    - columns of only floats are packed into array.array("d")
+    - anything else (str, bool, None, mixed types) stays a plain list
+
+ints and floats are never mixed into the same typed buffer; duffel does not typecast
+
+a column can also be a Categorical (see categorical.py), which is only ever made on request
+"""
+from array import array
+from typing import Iterable
+
+from .categorical import _DuffelCategorical
+
+STORAGE_TYPES = ("rows", "columns")
+
+_INT_MIN = -(2 ** 63)
+_INT_MAX = 2 ** 63 - 1
+
+
+def _typecode(values: Iterable):
+    """
+    returns the array typecode that can hold every value without changing its type
+        "q" if every value is an int that fits in 64 bits
+        "d" if every value is a float
+        None otherwise (including empty columns)
+    """
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    types = set(map(type, values))
+    if types == {int}:
+        if _INT_MIN <= min(values) and max(values) <= _INT_MAX:
+            return "q"
+        return None
+    if types == {float}:
+        return "d"
+    return None
+
+
+def _fits(column, value):
+    """True if value can be stored in column without changing the type of value"""
+    if not isinstance(column, array):
+        # lists and Categoricals take any value
+        return True
+    if column.typecode == "q":
+        return type(value) is int and _INT_MIN <= value <= _INT_MAX
+    return type(value) is float
+
+
+def _to_column(values: Iterable):
+    """pack values into the most compact container that keeps their types"""
+    if isinstance(values, array):
+        return array(values.typecode, values)
+    if isinstance(values, _DuffelCategorical):
+        return values._copy()
+    if isinstance(values, memoryview):
+        # frombytes only takes a buffer of bytes, not one of "q" / "d" items
+        column = array(values.format)
+        column.frombytes(values.cast("B"))
+        return column
+    values = list(values)
+    code = _typecode(values)
+    if code is None:
+        return values
+    return array(code, values)
+
+
+def _pack(values: Iterable):
+    """
+    like _to_column, but typed buffers and Categoricals are kept as they are instead of copied,
+    and so are read-only memoryviews (numeric columns read from a file with read_duffel)
+    """
+    if isinstance(values, (array, _DuffelCategorical, memoryview)):
+        return values
+    return _to_column(values)
+
+
+def _to_columns(rows: Iterable, ncol: int):
+    """transpose a list of rows into a list of ncol packed columns"""
+    rows = [row for row in rows if len(row)]
+    if not rows:
+        return [[] for _ in range(ncol)]
+    return [_to_column(col) for col in zip(*rows)]
+
+
+def _take(column, positions: Iterable):
+    """gather values at integer positions into a new container of the same kind"""
+    if isinstance(column, array):
+        return array(column.typecode, [column[i] for i in positions])
+    if isinstance(column, _DuffelCategorical):
+        return column._take(positions)
+    if isinstance(column, memoryview):
+        return array(column.format, [column[i] for i in positions])
+    return [column[i] for i in positions]
+
+
+def _set_value(column, i: int, value):
+    """
+    set column[i] = value
+    returns the column, which is unpacked to a list if value does not fit its typed buffer
+    """
+    if not _fits(column, value):
+        column = list(column)
+    column[i] = value
+    return column
+
+
+def _append_value(column, value):
+    """append value to column; returns the column, unpacked to a list if needed"""
+    if not _fits(column, value):
+        column = list(column)
+    column.append(value)
+    return column
+
+
+def _extend_values(column, values: Iterable):
+    """append values to column; returns the column, unpacked to a list if any value doesn't fit"""
+    values = list(values)
+    if isinstance(column, array) and not all([_fits(column, v) for v in values]):
+        column = list(column)
+    column.extend(values)
+    return column
+
+
+def _concat(pieces: Iterable):
+    """
+    one container with the values of every piece in order
+    typed if every piece has the same typecode, a Categorical if every piece is one
+    """
+    pieces = list(pieces)
+    if pieces and all([isinstance(x, _DuffelCategorical) for x in pieces]):
+        column = pieces[0]._copy()
+        for x in pieces[1:]:
+            column.extend(x)
+        return column
+    codes = set([getattr(x, "typecode", None) for x in pieces])
+    if len(codes) == 1 and None not in codes:
+        column = array(codes.pop())
+    else:
+        column = []
+    for x in pieces:
+        column.extend(x)
+    return column
@@ -1,13 +1,38 @@
-from typing import Iterable, IO
+from typing import Iterable
+from itertools import islice
 import csv
 import json
 
-from .na import NA
 from .df import _DuffelDataFrame
 from .col import _DuffelCol
+from .index import _DuffelRangeIndex, _ensure_index
+from .dtypes import (
+    _csv_dtypes,
+    _spec_converter,
+    _csv_columns,
+    _csv_pad,
+    _intern,
+    _low_cardinality,
+    _column_dtype,
+    SAMPLE_SIZE,
+)
+from .merge import _merge
+from .builder import _paused_gc
+from .lazy import _DuffelLazyFrame
+from .categorical import _DuffelCategorical
+from . import parallel
+from . import mapped
+from . import storage as _storage
+from . import binary as _binary
+from . import fileio as _fileio
+from . import database as _database
 from . import base_utils
 
 
+# rows per chunk when a lazy query reads a csv file
+_SCAN_CHUNKSIZE = 1 << 16
+
+
 def _isna(val):
     pass
 
@@ -24,10 +49,6 @@ def _dropna(data):
     pass
 
 
-def _merge(data, on, how="inner"):
-    pass
-
-
 def _concat(values, axis=0, ignore_index=False):
     """
     uses base_utils _base_concat
@@ -36,27 +57,6 @@ def _concat(values, axis=0, ignore_index=False):
     return _DuffelDataFrame(data, index=index, columns=columns)
 
 
-def _asnumeric(obj):
-    try:
-        return int(obj)
-    except ValueError:
-        pass
-
-    try:
-        return float(obj)
-    except ValueError:
-        pass
-
-    if obj in ("True", "true", "TRUE"):
-        return True
-    elif obj in ("False", "false", "FALSE"):
-        return False
-    elif obj == "":
-        return NA
-    else:
-        return obj
-
-
 def _read_csv(
     reader,
     header=True,
@@ -65,6 +65,16 @@ def _read_csv(
     columns=None,
     index=None,
     index_col=None,
+    storage="rows",
+    nrows=None,
+    usecols=None,
+    chunksize=None,
+    dtype=None,
+    converters=None,
+    workers=None,
+    intern_strings=False,
+    mmap=False,
+    compression="infer",
 ):
     """
     Reads a file in as a DataFrame.
@@ -73,46 +83,506 @@ def _read_csv(
     :param headers: True if headers are on the first line of data, false otherwise.
     :param skiprows: Skip this number of rows before reading data.
     :param numeric: True if data should be converted to numeric (if possible).
-    :return: A DataFrame with the resulting data.
+    :param storage: "rows" (list of row lists) or "columns" (packed column-major storage).
+    :param nrows: Only read this many data rows.
+    :param usecols: Only keep these columns (names or positions); the rest are never converted.
+    :param chunksize: If set, return an iterator of DataFrames with at most this many rows each.
+    :param dtype: One dtype ("int", "float", "bool", "str", "object", "category") for every column, or a dict of column -> dtype.
+        Columns without a dtype get one inferred from a sample of their values.
+        "category" columns are dictionary-encoded; a frame with one always has storage="columns".
+    :param intern_strings: True to make equal strings in each str column share one object, which cuts
+        memory and speeds up later hashing and ==; "auto" to do it only for columns whose first rows
+        repeat (low cardinality); False (the default) keeps every parsed string as its own object.
+    :param converters: Dict of column -> function applied to each raw string; overrides dtype.
+    :param workers: Parse a large file with this many processes. The file is split into byte ranges
+        on record boundaries and the results are stitched back together in order.
+        Only for filenames, not with chunksize or nrows; converters must be picklable. The column count
+        comes from the header, columns, or the first rows; a wider row later on is an error.
+    :param mmap: True to memory-map the file instead of reading it (filenames only). Record boundaries
+        are found on the raw bytes and the file is split and decoded a block at a time, keeping only
+        the usecols fields, so the OS pages the file in and every chunk shares the one mapping.
+    :param compression: "gzip", "bz2", "xz", "zip" or None for a filename. "infer" (the default) goes by the
+        extension, then by the file's first bytes. Compressed files are decompressed as they are read, so
+        chunksize keeps memory bounded; they are never memory-mapped or split between workers.
+    :return: A DataFrame with the resulting data, or an iterator of DataFrames if chunksize is set.
     """
-    fname = None
-    if type(reader == "str"):
-        # is a filename
-        if not isinstance(reader, str):
-            raise ValueError("Reader parameter is not an open file or a filename")
-        fname = reader
-        freader = open(fname, "r")
+    if chunksize is not None:
+        assert (
+            isinstance(chunksize, int) and chunksize > 0
+        ), f"duffel.read_csv chunksize must be a positive integer, not {chunksize}"
+        assert (
+            index is None
+        ), "duffel.read_csv can't take index values with chunksize; use index_col"
+    if nrows is not None:
+        assert (
+            isinstance(nrows, int) and nrows >= 0
+        ), f"duffel.read_csv nrows must be a non-negative integer, not {nrows}"
 
-    csvreader = csv.reader(freader)
-    records = []
-    detected_columns = None
-    for line in csvreader:
-        if skiprows > 0:
-            skiprows -= 1
-            continue
-        if not records and not detected_columns:
-            # look for data
-            if any([bool(c) for c in line]):
-                if header:
-                    detected_columns = line
-                else:
-                    if numeric:
-                        records.append([_asnumeric(c) for c in line])
-                    else:
-                        records.append(line)
-            else:
+    if mmap:
+        assert isinstance(
+            reader, str
+        ), "duffel.read_csv mmap needs a filename, not an open file"
+
+    # a compressed stream can't be split into byte ranges
+    if (
+        workers is not None
+        and workers > 1
+        and isinstance(reader, str)
+        and _fileio._detect_compression(reader, compression) is not None
+    ):
+        workers = None
+
+    if workers is not None and workers > 1:
+        assert isinstance(
+            reader, str
+        ), "duffel.read_csv workers needs a filename, not an open file"
+        assert (
+            chunksize is None and nrows is None
+        ), "duffel.read_csv workers can't be used with chunksize or nrows"
+        return _read_csv_parallel(
+            reader,
+            workers,
+            header=header,
+            skiprows=skiprows,
+            numeric=numeric,
+            columns=columns,
+            index=index,
+            index_col=index_col,
+            storage=storage,
+            usecols=usecols,
+            dtype=dtype,
+            converters=converters,
+            intern_strings=intern_strings,
+        )
+
+    chunks = _read_csv_chunks(
+        reader,
+        header=header,
+        skiprows=skiprows,
+        numeric=numeric,
+        columns=columns,
+        index=index,
+        index_col=index_col,
+        storage=storage,
+        nrows=nrows,
+        usecols=usecols,
+        chunksize=chunksize,
+        dtype=dtype,
+        converters=converters,
+        intern_strings=intern_strings,
+        mmap=mmap,
+        compression=compression,
+    )
+    if chunksize is not None:
+        return chunks
+    return next(chunks)
+
+
+def _scan_csv(
+    reader,
+    header=True,
+    skiprows=0,
+    numeric=True,
+    columns=None,
+    index_col=None,
+    storage="rows",
+    dtype=None,
+    converters=None,
+    intern_strings=False,
+    mmap=False,
+    compression="infer",
+):
+    """
+    Lazily reads a csv file; returns a LazyFrame that reads the file on .collect().
+
+    Filters are pushed into the reader (rows they reject are never converted or stored)
+    and only the columns the query uses are read. The file is read in chunks.
+    Columns can't be projected when index_col is set, since it is a position.
+
+    Takes the same parameters as read_csv.
+    """
+    if mmap:
+        assert isinstance(
+            reader, str
+        ), "duffel.scan_csv mmap needs a filename, not an open file"
+    if isinstance(reader, str):
+        name = reader
+    else:
+        name = getattr(reader, "name", "csv")
+
+    def scan(where=None, usecols=None):
+        return _read_csv_chunks(
+            reader,
+            header=header,
+            skiprows=skiprows,
+            numeric=numeric,
+            columns=columns,
+            index_col=index_col,
+            storage=storage,
+            usecols=usecols,
+            chunksize=_SCAN_CHUNKSIZE,
+            dtype=dtype,
+            converters=converters,
+            where=where,
+            intern_strings=intern_strings,
+            mmap=mmap,
+            compression=compression,
+        )
+
+    return _DuffelLazyFrame(scan, name=name, project=index_col is None)
+
+
+def _open_reader(reader, compression="infer"):
+    """returns (file handle, whether we opened it and must close it)"""
+    if isinstance(reader, str):
+        # is a filename; compressed files are decompressed as they are read
+        return _fileio._open_read(reader, compression), True
+    elif hasattr(reader, "read"):
+        # is an open file
+        return reader, False
+    raise ValueError("Reader parameter is not an open file or a filename")
+
+
+def _resolve_usecols(usecols, columns):
+    """positions of the usecols columns, given the detected/passed column names"""
+    positions = []
+    for col in usecols:
+        if columns is not None and col in columns:
+            positions.append(list(columns).index(col))
+        elif isinstance(col, int):
+            positions.append(col)
+        else:
+            raise KeyError(f"duffel.read_csv usecols column {col} not in columns")
+    return positions
+
+
+def _csv_selection(usecols, columns, header_columns):
+    """
+    (positions, names) of the columns to keep
+    columns (or else the header) names every column of the file; with usecols, positions are the
+    kept ones and the names are narrowed to match (positions is None when every column is kept)
+    names is None when neither columns nor a header names the columns
+    """
+    names = columns or header_columns
+    names = None if names is None else list(names)
+    if usecols is None:
+        return None, names
+    positions = _resolve_usecols(usecols, names)
+    if names is not None:
+        assert max(positions, default=-1) < len(
+            names
+        ), f"duffel.read_csv usecols positions {positions} out of range for {len(names)} columns"
+        names = [names[i] for i in positions]
+    return positions, names
+
+
+def _read_csv_chunks(
+    reader,
+    header=True,
+    skiprows=0,
+    numeric=True,
+    columns=None,
+    index=None,
+    index_col=None,
+    storage="rows",
+    nrows=None,
+    usecols=None,
+    chunksize=None,
+    dtype=None,
+    converters=None,
+    where=None,
+    intern_strings=False,
+    mmap=False,
+    compression="infer",
+):
+    """
+    generator behind _read_csv
+    parses the file lazily and yields a DataFrame every chunksize rows
+    if chunksize is None, yields exactly one DataFrame with every row
+
+    raw strings are buffered per chunk and converted a whole column at a time;
+    column converters are chosen once, from the first chunk
+
+    where is an expression (see expr.py) pushed down from a lazy query: only the columns it reads are
+    converted before it runs, and the rows it rejects are dropped before any other column is converted;
+    kept rows keep their row number as their index label
+
+    with mmap, the records come from _read_csv_mapped instead of csv.reader (unless the file is compressed)
+    """
+    if mmap and _fileio._detect_compression(reader, compression) is None:
+        mm = mapped._map(reader)
+        if mm is not None:
+            try:
+                yield from _read_csv_mapped(
+                    mm,
+                    header=header,
+                    skiprows=skiprows,
+                    numeric=numeric,
+                    columns=columns,
+                    index=index,
+                    index_col=index_col,
+                    storage=storage,
+                    nrows=nrows,
+                    usecols=usecols,
+                    chunksize=chunksize,
+                    dtype=dtype,
+                    converters=converters,
+                    where=where,
+                    intern_strings=intern_strings,
+                )
+            finally:
+                mm.close()
+            return
+    freader, close = _open_reader(reader, compression)
+    try:
+        csvreader = csv.reader(freader)
+        records = []
+        # an empty file has no header; columns still names it
+        names_given = list(columns) if columns else None
+        positions = None
+        started = False
+        parsers = None
+        nread = 0
+        start = 0
+        for line in csvreader:
+            if skiprows > 0:
+                skiprows -= 1
+                continue
+            if not any(line):
                 # no data
                 continue
+            if not started:
+                started = True
+                positions, names_given = _csv_selection(
+                    usecols, columns, line if header else None
+                )
+                if header:
+                    continue
+            if nrows is not None and nread >= nrows:
+                break
+
+            # drop unused columns before anything is converted
+            if positions is not None:
+                n = len(line)
+                line = [line[i] if i < n else "" for i in positions]
+            records.append(line)
+            nread += 1
+
+            if chunksize is not None and len(records) == chunksize:
+                names = _csv_names(records, names_given)
+                if parsers is None:
+                    parsers = _csv_parsers(
+                        records, names, numeric, dtype, converters, intern_strings
+                    )
+                yield _csv_frame(
+                    records, names, parsers, index, index_col, storage, start, where
+                )
+                start += len(records)
+                records = []
+
+        if records or chunksize is None:
+            names = _csv_names(records, names_given)
+            if parsers is None:
+                parsers = _csv_parsers(
+                    records, names, numeric, dtype, converters, intern_strings
+                )
+            yield _csv_frame(
+                records, names, parsers, index, index_col, storage, start, where
+            )
+    finally:
+        if close:
+            freader.close()
+
+
+def _read_csv_mapped(
+    mm,
+    header=True,
+    skiprows=0,
+    numeric=True,
+    columns=None,
+    index=None,
+    index_col=None,
+    storage="rows",
+    nrows=None,
+    usecols=None,
+    chunksize=None,
+    dtype=None,
+    converters=None,
+    where=None,
+    intern_strings=False,
+):
+    """
+    _read_csv_chunks over a memory-mapped file (see mapped.py)
+    records arrive a block at a time, already split and cut down to the usecols fields
+    """
+    header_columns, data_start, _ = parallel._scan_head(mm, skiprows, header, 1)
+    positions, names_given = _csv_selection(usecols, columns, header_columns)
+
+    records = []
+    parsers = None
+    nread = 0
+    start = 0
+    for block in mapped._blocks(mm, data_start, positions):
+        if nrows is not None:
+            block = block[: nrows - nread]
+        nread += len(block)
+        records += block
+
+        if chunksize is not None and len(records) >= chunksize:
+            n = len(records) - len(records) % chunksize
+            for i in range(0, n, chunksize):
+                chunk = records[i : i + chunksize]
+                names = _csv_names(chunk, names_given)
+                if parsers is None:
+                    parsers = _csv_parsers(
+                        chunk, names, numeric, dtype, converters, intern_strings
+                    )
+                yield _csv_frame(
+                    chunk, names, parsers, index, index_col, storage, start, where
+                )
+                start += len(chunk)
+            records = records[n:]
+        if nrows is not None and nread >= nrows:
+            break
+
+    if records or chunksize is None:
+        names = _csv_names(records, names_given)
+        if parsers is None:
+            parsers = _csv_parsers(
+                records, names, numeric, dtype, converters, intern_strings
+            )
+        yield _csv_frame(
+            records, names, parsers, index, index_col, storage, start, where
+        )
+
+
+def _read_csv_parallel(
+    fname,
+    workers,
+    header=True,
+    skiprows=0,
+    numeric=True,
+    columns=None,
+    index=None,
+    index_col=None,
+    storage="rows",
+    usecols=None,
+    dtype=None,
+    converters=None,
+    intern_strings=False,
+):
+    """
+    _read_csv with a process pool
+    the header and a sample for dtype inference are read here; workers parse and convert the rest
+    """
+    detected_columns, data_start, sample = parallel._read_head(
+        fname, skiprows, header, SAMPLE_SIZE
+    )
+    positions, names = _csv_selection(usecols, columns, detected_columns)
+    if positions is not None:
+        sample = [[x[i] if i < len(x) else "" for i in positions] for x in sample]
+    names = _csv_names(sample, names)
+    specs = _csv_specs(sample, names, numeric, dtype, converters)
+
+    data = parallel._parse_parallel(fname, data_start, positions, specs, names, workers)
+    # strings from different workers are different objects; intern once, after stitching
+    for i, spec in enumerate(specs):
+        if _csv_interned(sample, i, spec, intern_strings):
+            data[i] = _intern(data[i], {})
+    return _csv_build(data, names, index, index_col, storage)
+
+
+def _csv_names(records, columns):
+    """column names; headerless files are numbered by position"""
+    if columns is not None:
+        return list(columns)
+    return list(range(max([len(x) for x in records], default=0)))
+
+
+def _csv_specs(records, names, numeric, dtype, converters):
+    """how to parse each column (see dtypes._csv_dtypes); None keeps raw strings"""
+    if not numeric and dtype is None and converters is None:
+        return [None for _ in names]
+    return _csv_dtypes(records, names, dtype=dtype, converters=converters)
+
+
+def _csv_parsers(records, names, numeric, dtype, converters, intern_strings=False):
+    """one function per column that turns a column of raw strings into values"""
+    specs = _csv_specs(records, names, numeric, dtype, converters)
+    parsers = []
+    for i, (spec, name) in enumerate(zip(specs, names)):
+        parse = _spec_converter(spec, name=name)
+        if _csv_interned(records, i, spec, intern_strings):
+            parse = _interning(parse)
+        parsers.append(parse)
+    return parsers
+
+
+def _csv_interned(records, i, spec, intern_strings):
+    """whether the strings of column i are interned (see dtypes._intern); only str columns are"""
+    if not intern_strings:
+        return False
+    if not (spec is None or (isinstance(spec, tuple) and spec[0] == "str")):
+        return False
+    if intern_strings == "auto":
+        return _low_cardinality([x[i] for x in records[:SAMPLE_SIZE] if i < len(x)])
+    return True
+
+
+def _interning(parse):
+    """parse, then intern; the memo is shared by every chunk of the file"""
+    memo = {}
+    return lambda values: _intern(parse(values), memo)
+
+
+def _csv_frame(
+    records, columns, parsers, index, index_col, storage, start=0, where=None
+):
+    """
+    build one DataFrame from raw csv records, converting one column at a time
+    runs with the cyclic gc paused (see builder._paused_gc): the columns and rows built here can't form cycles
+    """
+    with _paused_gc():
+        if where is not None:
+            data, kept = _csv_filter(records, columns, parsers, where)
+            if index is None and index_col is None:
+                index = [start + i for i in kept]
+            return _csv_build(data, columns, index, index_col, storage, start)
+        data = _csv_columns(records, parsers, len(columns))
+        return _csv_build(data, columns, index, index_col, storage, start)
+
+
+def _csv_filter(records, columns, parsers, where):
+    """
+    convert the columns where reads, evaluate it, then convert the other columns for the kept rows only
+    returns (converted columns, positions of the kept rows)
+    """
+    records = _csv_pad(records, len(columns))
+    positions = {name: i for i, name in enumerate(columns)}
+    converted = {}
+
+    def get(name):
+        assert name in positions, f"duffel.read_csv filter column ({name}) not in columns"
+        i = positions[name]
+        if i not in converted:
+            converted[i] = parsers[i]([x[i] for x in records])
+        return converted[i]
+
+    kept = [i for i, keep in enumerate(where._eval(get)) if keep]
+    rows = [records[i] for i in kept]
+    data = []
+    for i, parse in enumerate(parsers):
+        if i in converted:
+            data.append(_storage._take(converted[i], kept))
         else:
-            # already a df
-            if numeric:
-                records.append([_asnumeric(c) for c in line])
-            else:
-                records.append(line)
-    if fname:
-        freader.close()
-    if columns is None:
-        columns = detected_columns
+            data.append(parse([x[i] for x in rows]))
+    return data, kept
+
+
+def _csv_build(data, columns, index, index_col, storage, start=0):
+    """build one DataFrame from converted csv columns"""
+    columns = list(columns)
+    nrow = len(data[0]) if data else 0
 
     #
     # TODO - known issue
@@ -130,26 +600,75 @@ def _read_csv(
         assert isinstance(
             index_col, int
         ), f"DF index_col must be an interger; index col was ({index_col})"
-        index = [x.pop(index_col) for x in records]
-        if columns is not None:
-            index_col_name = columns.pop(index_col)
-        else:
-            index_col_name = None
+        index = data.pop(index_col)
+        index_col_name = columns.pop(index_col)
     else:
         index_col_name = None
-
-    return _DuffelDataFrame(
-        records, columns=columns, index=index, _index_name=index_col_name
+        if index is None:
+            # chunks continue the row numbering of the chunks before them
+            index = _DuffelRangeIndex(start, start + nrow)
+
+    # same checks as the DataFrame constructor
+    index = _ensure_index(index)
+    assert index.is_unique, "DF index values must be unique"
+    assert (
+        len(index) == nrow
+    ), f"DF index length ({len(index)}) must match number of rows ({nrow})"
+    assert len(columns) == len(
+        set(columns)
+    ), f"DF columns values must be unique - duplicates are {[c for c in set(columns) if columns.count(c) > 1]}"
+
+    # category columns only exist in column storage
+    if any([isinstance(x, _DuffelCategorical) for x in data]):
+        storage = "columns"
+    return _DuffelDataFrame._from_columns(
+        data, columns, index, index_name=index_col_name, storage=storage
     )
 
 
-def _read_json(path_or_buf, orient: str = "dict", typ: str = "frame"):
+def _read_duffel(path, columns: Iterable = None, mmap: bool = True, storage="columns"):
+    """
+    Reads a file written by DataFrame.to_duffel.
+
+    :param path: The filename.
+    :param columns: Only read these columns; the others are never touched.
+    :param mmap: Map the file into memory; int and float columns are then zero-copy views of it,
+        copied only if the DataFrame is changed in place. False reads every column into memory.
+    :param storage: "columns" (the default, needed for zero-copy) or "rows".
+    :return: A DataFrame.
+    """
+    assert (
+        storage in _storage.STORAGE_TYPES
+    ), f"DF storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+    return _binary._read(_DuffelDataFrame, path, columns, mmap=mmap, storage=storage)
+
+
+def _read_json(
+    path_or_buf,
+    orient: str = "dict",
+    typ: str = "frame",
+    intern_strings=False,
+    lines=False,
+    chunksize=None,
+    columns: Iterable = None,
+    nrows=None,
+    storage="rows",
+    compression="infer",
+):
     """
     reads the file or buffer to dict
     returns a DataFrame based on the orient
+    intern_strings: True / "auto" / False, as in read_csv
+
+    lines=True reads JSON Lines (one record per line) incrementally, without loading the whole file:
+        columns: only keep these keys of each record
+        nrows: only read this many records
+        chunksize: return an iterator of DataFrames with at most this many rows each
+        storage: "rows" or "columns", as in read_csv
+    compression: as in read_csv; compressed files are decompressed as they are read
     """
     # parameter checking
-    assert isinstance(path_or_buf, IO) or isinstance(
+    assert hasattr(path_or_buf, "read") or isinstance(
         path_or_buf, str
     ), f"duffel.read_json only accepts path-like or buffer-like objects, not {type(path_or_buf)}"
     
@@ -167,27 +686,153 @@ def _read_json(path_or_buf, orient: str = "dict", typ: str = "frame"):
         "list",
     }, f"duffel.read_json orient must be in ('dict','records','index','split','series', 'list'), not {orient}"
 
+    if lines:
+        assert typ == "frame", "duffel.read_json lines=True only reads a frame"
+        if chunksize is not None:
+            assert (
+                isinstance(chunksize, int) and chunksize > 0
+            ), f"duffel.read_json chunksize must be a positive integer, not {chunksize}"
+        chunks = _read_json_lines(
+            path_or_buf, chunksize, columns, nrows, storage, intern_strings, compression
+        )
+        if chunksize is not None:
+            return chunks
+        return next(chunks)
+    assert (
+        chunksize is None and columns is None and nrows is None
+    ), "duffel.read_json chunksize, columns and nrows need lines=True"
+
     # set up to read into either a series or a dataframe
     typ_d = {"series": _DuffelCol, "frame": _DuffelDataFrame}
 
+    # a list of records (what to_json(orient="records") writes) isn't something the constructor reads
+    if orient == "records" and typ == "frame":
+        typ_d["frame"] = _DuffelDataFrame.from_records
+
     # finish up
-    if isinstance(path_or_buf, IO):
-        return typ_d[typ](json.load(path_or_buf))
+    if hasattr(path_or_buf, "read"):
+        out = typ_d[typ](json.load(path_or_buf))
 
     elif isinstance(path_or_buf, str):
-        return typ_d[typ](json.load(open(path_or_buf)))
+        with _fileio._open_read(path_or_buf, compression) as f:
+            out = typ_d[typ](json.load(f))
 
+    if intern_strings:
+        _intern_columns(out, intern_strings)
+    return out
 
-def _read_sql(statement, con):
-    '''
+
+def _read_json_lines(
+    path_or_buf, chunksize, columns, nrows, storage, intern_strings, compression="infer"
+):
+    """
+    generator behind read_json(lines=True)
+    records are parsed one line at a time as they are consumed, so only the current chunk is in memory;
+    yields one DataFrame per chunksize records, or exactly one if chunksize is None
+    """
+    freader, close = _open_reader(path_or_buf, compression)
+    try:
+        # blank lines (and the newline after the last record) aren't records
+        records = map(json.loads, filter(str.strip, freader))
+        if nrows is not None:
+            records = islice(records, nrows)
+        start = 0
+        while True:
+            batch = list(islice(records, chunksize)) if chunksize else list(records)
+            if not batch and chunksize is not None:
+                break
+            df = _DuffelDataFrame.from_records(
+                batch,
+                columns=columns,
+                # chunks continue the row numbering of the chunks before them
+                index=range(start, start + len(batch)),
+                storage=storage,
+            )
+            if intern_strings:
+                _intern_columns(df, intern_strings)
+            yield df
+            start += len(batch)
+            if chunksize is None or len(batch) < chunksize:
+                break
+    finally:
+        if close:
+            freader.close()
+
+
+def _intern_columns(data, intern_strings):
+    """intern the str columns of a DataFrame or the values of a Col in place (see dtypes._intern)"""
+
+    def interned(values):
+        if _column_dtype(values) != "str":
+            return None
+        if intern_strings == "auto" and not _low_cardinality(values[:SAMPLE_SIZE]):
+            return None
+        return _intern(values, {})
+
+    if isinstance(data, _DuffelCol):
+        values = interned(data.values)
+        if values is not None:
+            data.values = values
+        return data
+    names, columns = [], []
+    for col in data.columns:
+        values = interned(data._get_column(col))
+        if values is not None:
+            names.append(col)
+            columns.append(values)
+    if names:
+        data._set_columns(names, columns)
+    return data
+
+
+def _read_sql(statement, con, params=None, chunksize=None, storage="columns"):
+    """
     accepts a query and connection
-    gets the response in records form (dict of col:vals)
-    passes output dadta to a DataFrame and return it
-
-    uses three connection types:
-        - basic connector with a cursor that has a cursor.execute method, to which the statement is passeed and outputs cast to list-like
-        - sqlalchemy engine: a context manager; tests for __enter__ method; uses a begin statement to return and cast to list-like
-        -
-    then casts output to list-like and attempts to ingest that list-like
-    '''
-    pass
\ No newline at end of file
+    returns a DataFrame of the result, or an iterator of DataFrames if chunksize is set
+
+    con is a DB-API connection (sqlite3, psycopg2, ...) or a SQLAlchemy engine (through its raw_connection)
+    params are passed to cursor.execute with the statement, in the driver's paramstyle
+    rows are fetched with cursor.fetchmany, chunksize (or database.ARRAYSIZE) at a time, and go straight
+    into storage="columns" (the default) or "rows"
+    """
+    assert (
+        storage in _storage.STORAGE_TYPES
+    ), f"duffel.read_sql storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+    if chunksize is not None:
+        assert (
+            isinstance(chunksize, int) and chunksize > 0
+        ), f"duffel.read_sql chunksize must be a positive integer, not {chunksize}"
+    chunks = _database._read(
+        _DuffelDataFrame, statement, con, params, chunksize, storage
+    )
+    if chunksize is not None:
+        return chunks
+    return next(chunks)
+
+
+def _sql(query, params=None, storage="columns", **frames):
+    """
+    run a sql query over DataFrames, each one a table named by its keyword:
+        duffel.sql("SELECT a.id, b.total FROM a JOIN b ON a.id = b.id", a=df1, b=df2)
+
+    the frames are loaded into an in-memory sqlite database (one per thread) and the columns the query
+    joins on are indexed; a frame that hasn't changed since it was last loaded under the same name isn't
+    loaded again, so repeated queries over the same frames only run the query
+    the cache only holds weak references to the frames: tables of frames that are gone are dropped,
+    as are the least recently used beyond database.MAX_TABLES; duffel.clear_sql() drops them all
+    the index of a frame isn't loaded (reset_index first to query it)
+    returns the result as a DataFrame with storage="columns" (the default) or "rows"
+    """
+    assert (
+        storage in _storage.STORAGE_TYPES
+    ), f"duffel.sql storage must be in {_storage.STORAGE_TYPES}, not {storage}"
+    for name, df in frames.items():
+        assert isinstance(
+            df, _DuffelDataFrame
+        ), f"duffel.sql tables must be DataFrames; {name} is a {type(df)}"
+    return _database._query(_DuffelDataFrame, query, frames, params, storage)
+
+
+def _clear_sql():
+    """drop every table duffel.sql has loaded (and cached) in this thread"""
+    _database._clear()
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+import duffel as pd
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_append_lists_dicts_and_short_rows(storage):
+    df = pd.DataFrame({"id": [1], "event": ["a"]}, storage=storage)
+    df.append([2, "b"])
+    df.append({"event": "c"})
+    df.append([4])
+    assert _frame_dict(df) == {"id": [1, 2, None, 4], "event": ["a", "b", "c", None]}
+    assert isinstance(df.index, pd.RangeIndex)
+    assert list(df.index) == [0, 1, 2, 3]
+    assert df.shape == (4, 2)
+
+
+def test_append_with_labels():
+    df = pd.DataFrame({"x": [1, 2]}, index=["a", "b"])
+    df.append([3], index="c")
+    df.append_rows([[4], [5]], index=["d", "e"])
+    assert list(df.index) == ["a", "b", "c", "d", "e"]
+    assert df.loc["d", "x"] == 4
+    with pytest.raises(AssertionError):
+        df.append([6], index="a")
+    with pytest.raises(AssertionError):
+        df.append_rows([[6], [7]], index=["f", "f"])
+    with pytest.raises(AssertionError):
+        # a labelled index needs labels
+        df.append([6])
+
+
+def test_append_doesnt_change_a_shared_index():
+    df = pd.DataFrame({"x": [1, 2]}, index=["a", "b"])
+    other = pd.DataFrame({"y": [3, 4]}, index=df.index)
+    df.append([5], index="c")
+    assert list(other.index) == ["a", "b"]
+
+
+def test_many_appends_are_linear():
+    def run(n):
+        df = pd.DataFrame({"x": [0]}, index=["r0"])
+        start = time.perf_counter()
+        for i in range(1, n):
+            df.append([i], index=f"r{i}")
+        return time.perf_counter() - start
+
+    run(1000)
+    small = min([run(5000) for _ in range(3)])
+    large = min([run(40000) for _ in range(3)])
+    # 8x the rows; quadratic appends would take ~64x as long
+    assert large < small * 24
+    df = pd.DataFrame({"x": [0]})
+    for i in range(1, 20000):
+        df.append([i])
+    assert len(df) == 20000 and df.index[-1] == 19999
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_builder(storage):
+    builder = pd.DataFrame.builder(["id", "event"], storage=storage)
+    builder.append([1, "a"]).append({"id": 2})
+    builder.append_rows(([i, str(i)] for i in range(3, 6)))
+    assert len(builder) == 5
+    df = builder.build()
+    assert df.storage == storage
+    assert _frame_dict(df) == {
+        "id": [1, 2, 3, 4, 5],
+        "event": ["a", None, "3", "4", "5"],
+    }
+    # the builder starts over
+    assert len(builder) == 0 and len(builder.build()) == 0
+
+
+def test_builder_labels_are_all_or_nothing():
+    builder = pd.DataFrame.builder(["x"])
+    builder.append([1], index="a").append_rows([[2], [3]], index=["b", "c"])
+    assert list(builder.build().index) == ["a", "b", "c"]
+    builder.append([1])
+    with pytest.raises(AssertionError):
+        builder.append([2], index="b")
+    with pytest.raises(AssertionError):
+        pd.DataFrame.builder(["x"]).append({"y": 1})
@@ -0,0 +1,67 @@
+import pytest
+
+import duffel as pd
+from duffel import col
+
+
+def _frame_dict(df):
+    return {c: list(df._get_column(c)) for c in df.columns}
+
+
+def _frame(storage):
+    return pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}, storage=storage)
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_setitem_replaces_an_existing_column(storage):
+    df = _frame(storage)
+    df["a"] = [10, 20, 30]
+    assert list(df.columns) == ["a", "b"]
+    assert _frame_dict(df) == {"a": [10, 20, 30], "b": ["x", "y", "z"]}
+    assert df.shape == (3, 2)
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_setitem_adds_a_column_at_the_end(storage):
+    df = _frame(storage)
+    df["c"] = 0
+    df["d"] = df["a"] > 1
+    df["e"] = df["a"]
+    assert list(df.columns) == ["a", "b", "c", "d", "e"]
+    assert _frame_dict(df)["c"] == [0, 0, 0]
+    assert _frame_dict(df)["d"] == [False, True, True]
+    assert _frame_dict(df)["e"] == [1, 2, 3]
+    with pytest.raises(AssertionError):
+        df["f"] = [1, 2]
+
+
+def test_setitem_keeps_the_other_row_slots():
+    df = _frame("rows")
+    rows = df._values
+    df["a"] = [7, 8, 9]
+    # rows are written in place, not rebuilt
+    assert df._values is rows
+    assert df.values == [[7, "x"], [8, "y"], [9, "z"]]
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_assign_many_columns(storage):
+    df = _frame(storage)
+    out = df.assign(
+        c=1,
+        a=[5, 6, 7],
+        d=col("a") * 2,
+        e=lambda f: [v + "!" for v in f._get_column("b")],
+        b="same",
+    )
+    # expressions and functions see the columns assigned before them
+    assert list(out.columns) == ["a", "b", "c", "d", "e"]
+    assert _frame_dict(out) == {
+        "a": [5, 6, 7],
+        "b": ["same"] * 3,
+        "c": [1, 1, 1],
+        "d": [10, 12, 14],
+        "e": ["x!", "y!", "z!"],
+    }
+    # the original is not changed
+    assert _frame_dict(df) == {"a": [1, 2, 3], "b": ["x", "y", "z"]}
@@ -0,0 +1,147 @@
+import json
+import struct
+import sys
+from array import array
+
+import pytest
+
+import duffel as pd
+from duffel.na import NA
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _same(a, b):
+    """equal values, counting NA (nan) as equal to itself"""
+    return len(a) == len(b) and all(
+        [x == y or (x != x and y != y) for x, y in zip(a, b)]
+    )
+
+
+@pytest.fixture
+def frame():
+    df = pd.DataFrame(
+        {
+            "i": [1, 2, 3, 4],
+            "f": [1.5, -2.5, 3.0, 0.25],
+            "s": ["a", "bé", "", "d"],
+            "m": ["x", None, NA, "y"],
+            "c": ["lo", "hi", "lo", None],
+            "j": [True, 1, "two", [3]],
+        },
+        index=["w", "x", "y", "z"],
+        storage="columns",
+    )
+    return df.astype({"c": "category"})
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, frame, mmap):
+    path = str(tmp_path / "f.duffel")
+    frame.to_duffel(path)
+    df = pd.read_duffel(path, mmap=mmap)
+    assert list(df.columns) == list(frame.columns)
+    assert list(df.index) == ["w", "x", "y", "z"]
+    for col in frame.columns:
+        assert _same(list(df._get_column(col)), list(frame._get_column(col))), col
+    assert df._get_column("m")[1] is None
+    assert df.dtypes == frame.dtypes
+
+
+def test_mmap_numbers_are_views(tmp_path, frame):
+    path = str(tmp_path / "f.duffel")
+    frame.to_duffel(path)
+    assert isinstance(pd.read_duffel(path)._get_column("i"), memoryview)
+    assert isinstance(pd.read_duffel(path, mmap=False)._get_column("i"), array)
+
+
+def test_columns_projection(tmp_path, frame):
+    path = str(tmp_path / "f.duffel")
+    frame.to_duffel(path)
+    df = pd.read_duffel(path, columns=["s", "i"])
+    assert _frame_dict(df) == {"s": ["a", "bé", "", "d"], "i": [1, 2, 3, 4]}
+    with pytest.raises(AssertionError):
+        pd.read_duffel(path, columns=["nope"])
+
+
+def test_rows_storage(tmp_path, frame):
+    path = str(tmp_path / "f.duffel")
+    frame.loc[:, ["i", "s"]].to_duffel(path)
+    df = pd.read_duffel(path, storage="rows")
+    assert df.values == [[1, "a"], [2, "bé"], [3, ""], [4, "d"]]
+
+
+def _byteswapped(path, out):
+    """a copy of the .duffel file at path as written on a machine of the other byte order"""
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+        data = bytearray(f.read())
+    header["byteorder"] = "big" if sys.byteorder == "little" else "little"
+    for spec in header["columns"]:
+        code = spec["kind"] if spec["kind"] in ("q", "d") else spec.get("codes")
+        if code in ("q", "d", "b", "h", "i", "l"):
+            for o, n in spec["buffers"]:
+                values = array(code, bytes(data[o : o + n]))
+                values.byteswap()
+                data[o : o + n] = values.tobytes()
+    text = json.dumps(header).encode("utf-8")
+    text += b" " * (-(len(text) + 16) % 8)
+    with open(out, "wb") as f:
+        f.write(magic + struct.pack("<Q", len(text)) + text + bytes(data))
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_byteswapped_file(tmp_path, frame, mmap):
+    path, swapped = str(tmp_path / "f.duffel"), str(tmp_path / "s.duffel")
+    frame.loc[:, ["i", "f", "c"]].to_duffel(path)
+    _byteswapped(path, swapped)
+    df = pd.read_duffel(swapped, mmap=mmap)
+    assert list(df._get_column("i")) == [1, 2, 3, 4]
+    assert list(df._get_column("f")) == [1.5, -2.5, 3.0, 0.25]
+    assert list(df._get_column("c"))[:3] == ["lo", "hi", "lo"]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "n.duffel")
+    pd.DataFrame({"x": [1, 2, 3], "y": [1.5, 2.5, 3.5]}, storage="columns").to_duffel(
+        path
+    )
+    return path
+
+
+def test_append_to_a_mapped_frame(path):
+    df = pd.read_duffel(path)
+    df.append([4, 4.5])
+    assert _frame_dict(df) == {"x": [1, 2, 3, 4], "y": [1.5, 2.5, 3.5, 4.5]}
+    assert list(pd.read_duffel(path)._get_column("x")) == [1, 2, 3]
+
+
+def test_setitem_on_a_mapped_frame(path):
+    df = pd.read_duffel(path)
+    df["x"] = [7, 8, 9]
+    df["z"] = 0
+    assert _frame_dict(df)["x"] == [7, 8, 9]
+    assert list(df._get_column("y")) == [1.5, 2.5, 3.5]
+
+
+def test_col_write_on_a_mapped_frame(path):
+    df = pd.read_duffel(path)
+    col = df["x"]
+    col[0] = 100
+    assert list(col.values) == [100, 2, 3]
+    assert list(df._get_column("x")) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("part", [lambda df: df.head(2), lambda df: df.iloc[1:3]])
+def test_append_to_a_part_of_a_mapped_frame(path, part):
+    df = pd.read_duffel(path)
+    view = part(df)
+    n = len(view)
+    view.append([9, 9.5])
+    assert list(view._get_column("x"))[n:] == [9]
+    assert list(df._get_column("x")) == [1, 2, 3]
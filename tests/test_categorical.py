@@ -0,0 +1,100 @@
+from array import array
+
+import pytest
+
+import duffel as pd
+
+GENDER = ["Male", "Female", None, "Male", "Female", "Male"]
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _pair():
+    plain = pd.DataFrame({"gender": GENDER, "n": [1, 2, 3, 4, 5, 6]}, storage="columns")
+    return plain, plain.astype({"gender": "category"})
+
+
+def test_astype_category():
+    plain, cat = _pair()
+    values = cat._get_column("gender")
+    assert isinstance(values, pd.Categorical)
+    assert values.categories == ["Male", "Female"]
+    assert isinstance(values._codes, bytearray)
+    assert values.codes == [0, 1, -1, 0, 1, 0]
+    # a missing value comes back as NA
+    assert [v if v == v else None for v in values] == GENDER
+    assert cat.dtypes.values[0] == "category"
+    # row storage can't hold a categorical, so the result is columnar
+    assert pd.DataFrame({"g": GENDER}).astype("category").storage == "columns"
+    back = list(cat.astype({"gender": "str"})._get_column("gender"))
+    assert [v if v == v else None for v in back] == GENDER
+
+
+def test_read_csv_dtype_category(tmp_path):
+    path = tmp_path / "g.csv"
+    path.write_text("gender,n\nMale,1\nFemale,2\n,3\nMale,4\n")
+    df = pd.read_csv(str(path), dtype={"gender": "category"}, storage="columns")
+    values = df._get_column("gender")
+    assert isinstance(values, pd.Categorical)
+    assert values.categories == ["Male", "Female"]
+    assert list(values)[:2] == ["Male", "Female"] and list(values)[2] != list(values)[2]
+
+
+def test_equality_and_isin_match_plain_values():
+    plain, cat = _pair()
+    for value in ["Male", "Female", "Other"]:
+        assert (cat["gender"] == value) == (plain["gender"] == value)
+        assert (cat["gender"] != value) == (plain["gender"] != value)
+    assert cat["gender"].isin(["Female", "Other"]) == plain["gender"].isin(
+        ["Female", "Other"]
+    )
+    assert (
+        cat[cat["gender"] == "Male"].values == plain[plain["gender"] == "Male"].values
+    )
+
+
+def test_groupby_and_value_counts_match_plain_values():
+    plain, cat = _pair()
+    assert _frame_dict(cat.groupby("gender").sum()) == _frame_dict(
+        plain.groupby("gender").sum()
+    )
+    assert list(cat.groupby("gender").sum().index) == ["Female", "Male"]
+    counts = cat["gender"].value_counts(dropna=True)
+    assert dict(zip(counts.index, counts.values)) == {"Male": 3, "Female": 2}
+
+
+def test_merge_on_category_keys():
+    plain, cat = _pair()
+    names = pd.DataFrame(
+        {"gender": ["Female", "Male", "Other"], "code": ["f", "m", "o"]},
+        storage="columns",
+    )
+    expected = _frame_dict(plain.merge(names, on="gender", how="left"))
+    both = cat.merge(names.astype({"gender": "category"}), on="gender", how="left")
+    one = cat.merge(names, on="gender", how="left")
+    for out in (both, one):
+        result = _frame_dict(out)
+        assert result["code"][:2] == expected["code"][:2]
+        assert result["n"] == expected["n"]
+
+
+def test_writes_add_categories_and_widen_codes():
+    values = pd.Categorical(["a", "b"])
+    values.append("c")
+    values[0] = "d"
+    assert list(values) == ["d", "b", "c"]
+    values.extend([str(i) for i in range(300)])
+    assert isinstance(values._codes, array)
+    assert values.codes[:3] == [3, 1, 2]
+    assert len(values.categories) == 304
+    assert list(values)[-1] == "299"
+
+
+def test_slices_share_the_table_safely():
+    values = pd.Categorical(["a", "b", "a"])
+    part = values._take([0, 1])
+    part.append("z")
+    assert "z" not in values.categories
+    assert list(values) == ["a", "b", "a"]
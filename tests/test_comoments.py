@@ -0,0 +1,99 @@
+import random
+import statistics
+
+import pytest
+
+import duffel as pd
+from duffel.na import NA
+
+COLUMNS = ["x", "y", "z"]
+
+
+def _data(n=400, seed=3):
+    rng = random.Random(seed)
+    x = [rng.gauss(0, 1) for _ in range(n)]
+    y = [2 * v + rng.gauss(0, 0.5) for v in x]
+    z = [rng.randint(-50, 50) for _ in range(n)]
+    for i in range(0, n, 13):
+        y[i] = NA
+    z[5] = None
+    return {"x": x, "y": y, "z": z}
+
+
+def _pairwise(data, a, b):
+    """the values of a and b on the rows where both are present"""
+    rows = [
+        (u, v)
+        for u, v in zip(data[a], data[b])
+        if u is not None and u == u and v is not None and v == v
+    ]
+    return [u for u, _ in rows], [v for _, v in rows]
+
+
+def _reference(data, func):
+    return [[func(*_pairwise(data, a, b)) for b in COLUMNS] for a in COLUMNS]
+
+
+def _matrix(df):
+    return [list(df._get_column(col)) for col in df.columns]
+
+
+def _approx(matrix):
+    return [pytest.approx(row) for row in matrix]
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_cov_and_corr_match_a_reference(storage):
+    data = _data()
+    df = pd.DataFrame(data, storage=storage)
+    cov, corr = df.cov(), df.corr()
+    assert list(cov.columns) == COLUMNS and list(cov.index) == COLUMNS
+    assert _matrix(cov) == _approx(_reference(data, statistics.covariance))
+    assert _matrix(corr) == _approx(_reference(data, statistics.correlation))
+    assert _matrix(df.cov(columns=["z", "x"]))[0][1] == pytest.approx(
+        statistics.covariance(*_pairwise(data, "z", "x"))
+    )
+
+
+def test_chunks_and_merged_accumulators_match_one_pass():
+    data = _data()
+    whole = pd.DataFrame(data).corr()
+    acc = pd.Comoments()
+    left, right = pd.Comoments(), pd.Comoments()
+    for start in range(0, 400, 70):
+        chunk = pd.DataFrame({k: v[start : start + 70] for k, v in data.items()})
+        acc.update(chunk)
+        (left if start < 200 else right).update(chunk)
+    assert _matrix(acc.corr()) == _approx(_matrix(whole))
+    assert _matrix(left.merge(right).corr()) == _approx(_matrix(whole))
+    assert _matrix(pd.Comoments().merge(acc).cov()) == _approx(
+        _matrix(pd.DataFrame(data).cov())
+    )
+
+
+def test_chunked_csv_read(tmp_path):
+    data = _data()
+    path = tmp_path / "c.csv"
+    pd.DataFrame(data).to_csv(str(path))
+    acc = pd.Comoments(["x", "z"])
+    for chunk in pd.read_csv(str(path), chunksize=64):
+        acc.update(chunk)
+    assert _matrix(acc.cov())[0][1] == pytest.approx(
+        statistics.covariance(*_pairwise(data, "x", "z"))
+    )
+
+
+def test_stable_with_a_large_offset():
+    rng = random.Random(1)
+    x = [1e9 + rng.random() for _ in range(1000)]
+    y = [v * 3 for v in x]
+    cov = pd.DataFrame({"x": x, "y": y}).cov()
+    assert _matrix(cov)[0][0] == pytest.approx(statistics.variance(x), rel=1e-6)
+    assert _matrix(pd.DataFrame({"x": x, "y": y}).corr())[0][1] == pytest.approx(1.0)
+
+
+def test_merge_needs_the_same_columns():
+    a = pd.Comoments(["x"]).update(pd.DataFrame({"x": [1.0, 2.0], "y": [1.0, 3.0]}))
+    b = pd.Comoments(["y"]).update(pd.DataFrame({"x": [1.0, 2.0], "y": [1.0, 3.0]}))
+    with pytest.raises(AssertionError):
+        a.merge(b)
@@ -0,0 +1,98 @@
+import bz2
+import gzip
+import json
+import lzma
+import zipfile
+
+import pytest
+
+import duffel as pd
+from duffel import col
+
+CSV = "id,name\n" + "".join([f"{i},n{i}\n" for i in range(50)])
+RECORDS = [{"id": i, "name": f"n{i}"} for i in range(50)]
+
+
+def _frame_dict(df):
+    return {c: list(df._get_column(c)) for c in df.columns}
+
+
+EXPECTED = {"id": list(range(50)), "name": [f"n{i}" for i in range(50)]}
+
+
+def _write(path, text, kind):
+    data = text.encode("utf-8")
+    if kind == "zip":
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("data", data)
+        return
+    opener = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open, None: open}[kind]
+    with opener(path, "wb") as f:
+        f.write(data)
+
+
+KINDS = [("gzip", ".gz"), ("bz2", ".bz2"), ("xz", ".xz"), ("zip", ".zip")]
+
+
+@pytest.mark.parametrize("kind, ext", KINDS)
+@pytest.mark.parametrize("named", [True, False])
+def test_read_csv(tmp_path, kind, ext, named):
+    # without the extension, the file's first bytes give the compression away
+    path = str(tmp_path / ("data.csv" + (ext if named else "")))
+    _write(path, CSV, kind)
+    assert _frame_dict(pd.read_csv(path)) == EXPECTED
+    assert _frame_dict(pd.read_csv(path, compression=kind)) == EXPECTED
+
+
+@pytest.mark.parametrize("kind, ext", KINDS)
+def test_read_csv_in_chunks(tmp_path, kind, ext):
+    path = str(tmp_path / ("data.csv" + ext))
+    _write(path, CSV, kind)
+    chunks = list(pd.read_csv(path, chunksize=16))
+    assert [len(c) for c in chunks] == [16, 16, 16, 2]
+    assert [v for c in chunks for v in c._get_column("id")] == EXPECTED["id"]
+
+
+@pytest.mark.parametrize("kwargs", [{"workers": 2}, {"mmap": True}])
+def test_compressed_files_are_streamed(tmp_path, kwargs):
+    path = str(tmp_path / "data.csv.gz")
+    _write(path, CSV, "gzip")
+    # neither can split or map a compressed file; both fall back to reading it as a stream
+    assert _frame_dict(pd.read_csv(path, **kwargs)) == EXPECTED
+
+
+def test_scan_csv(tmp_path):
+    path = str(tmp_path / "data.csv.xz")
+    _write(path, CSV, "xz")
+    out = pd.scan_csv(path).filter(col("id") >= 48).collect()
+    assert _frame_dict(out) == {"id": [48, 49], "name": ["n48", "n49"]}
+
+
+@pytest.mark.parametrize("kind, ext", KINDS)
+def test_read_json(tmp_path, kind, ext):
+    path = str(tmp_path / ("data.json" + ext))
+    _write(path, json.dumps(RECORDS), kind)
+    assert _frame_dict(pd.read_json(path, orient="records")) == EXPECTED
+    lines = str(tmp_path / ("data.jsonl" + ext))
+    _write(lines, "\n".join(map(json.dumps, RECORDS)), kind)
+    chunks = list(pd.read_json(lines, lines=True, chunksize=20))
+    assert [len(c) for c in chunks] == [20, 20, 10]
+
+
+def test_plain_file_and_no_compression(tmp_path):
+    path = str(tmp_path / "data.csv")
+    _write(path, CSV, None)
+    assert _frame_dict(pd.read_csv(path)) == EXPECTED
+    gz = str(tmp_path / "data.csv.gz")
+    _write(gz, CSV, None)
+    # compression=None reads the file as it is, whatever its name
+    assert _frame_dict(pd.read_csv(gz, compression=None)) == EXPECTED
+
+
+def test_zip_with_several_files(tmp_path):
+    path = str(tmp_path / "data.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("a.csv", CSV)
+        archive.writestr("b.csv", CSV)
+    with pytest.raises(AssertionError):
+        pd.read_csv(path)
@@ -0,0 +1,31 @@
+import pytest
+
+import duffel as pd
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}],
+        [{"a": 1}, {"b": 2}],
+        [{"a": 1, "b": 2}, {"c": 3, "a": 4}],
+    ],
+)
+def test_list_of_dicts_matches_from_records(records):
+    df = pd.DataFrame(records)
+    expected = pd.DataFrame.from_records(records)
+    assert list(df.columns) == list(expected.columns)
+    assert _frame_dict(df) == _frame_dict(expected)
+    assert list(df.index) == list(expected.index)
+
+
+def test_list_of_dicts_keeps_the_columns_asked_for():
+    records = [{"a": 1, "b": 2, "c": 3}, {"a": 4, "c": 6}]
+    df = pd.DataFrame(records, columns=["c", "a"])
+    expected = pd.DataFrame.from_records(records, columns=["c", "a"])
+    assert list(df.columns) == ["c", "a"]
+    assert _frame_dict(df) == _frame_dict(expected) == {"c": [3, 6], "a": [1, 4]}
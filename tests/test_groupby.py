@@ -0,0 +1,15 @@
+import pytest
+
+import duffel as pd
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_mean_skips_missing_values(storage):
+    df = pd.DataFrame(
+        {"key": ["a", "b", "a", "b", "c"], "x": [1, None, 4, 3, None]}, storage=storage
+    )
+    out = df.groupby("key").mean()
+    assert list(out.index) == ["a", "b", "c"]
+    means = list(out._get_column("x"))
+    assert means[:2] == [2.5, 3.0]
+    assert means[2] != means[2]
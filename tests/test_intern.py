@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+
+import duffel as pd
+
+CITIES = ["Lisbon", "Oslo", "Quito"]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "c.csv"
+    rows = [f"{CITIES[i % 3]},name{i},{i}" for i in range(300)]
+    path.write_text("city,name,n\n" + "\n".join(rows) + "\n")
+    return str(path)
+
+
+def _distinct_objects(values):
+    return len({id(v) for v in values})
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"storage": "columns"}, {"mmap": True}, {"workers": 2}],
+)
+def test_read_csv_interns_str_columns(path, kwargs):
+    df = pd.read_csv(path, intern_strings=True, **kwargs)
+    city = list(df._get_column("city"))
+    assert city[:3] == CITIES
+    assert _distinct_objects(city) == 3
+    assert list(df._get_column("n"))[:3] == [0, 1, 2]
+
+
+def test_read_csv_keeps_separate_strings_by_default(path):
+    city = list(pd.read_csv(path)._get_column("city"))
+    assert _distinct_objects(city) == 300
+
+
+def test_auto_interns_only_low_cardinality_columns(path):
+    df = pd.read_csv(path, intern_strings="auto")
+    assert _distinct_objects(df._get_column("city")) == 3
+    assert _distinct_objects(df._get_column("name")) == 300
+
+
+def test_chunks_share_one_memo(path):
+    chunks = list(pd.read_csv(path, intern_strings=True, chunksize=64))
+    city = [v for chunk in chunks for v in chunk._get_column("city")]
+    assert len(city) == 300
+    assert _distinct_objects(city) == 3
+
+
+@pytest.mark.parametrize("lines", [False, True])
+def test_read_json_interns(lines):
+    records = [{"city": CITIES[i % 3], "n": i} for i in range(60)]
+    # json.loads makes a new str object for every value
+    if lines:
+        text, kwargs = "\n".join(map(json.dumps, records)), {"lines": True}
+    else:
+        text, kwargs = json.dumps(records), {"orient": "records"}
+    plain = pd.read_json(io.StringIO(text), **kwargs)
+    interned = pd.read_json(io.StringIO(text), intern_strings=True, **kwargs)
+    assert list(interned._get_column("city")) == list(plain._get_column("city"))
+    assert _distinct_objects(plain._get_column("city")) == 60
+    assert _distinct_objects(interned._get_column("city")) == 3
+
+
+def test_cardinality_stats(path):
+    df = pd.read_csv(path, intern_strings="auto")
+    counts = df.nunique()
+    assert list(counts.index) == ["city", "name", "n"]
+    assert list(counts.values) == [3, 300, 300]
+    assert df["city"].nunique() == 3
@@ -0,0 +1,44 @@
+import io
+import json
+
+import pytest
+
+import duffel as pd
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize(
+    "orient", ["dict", "records", "index", "split", "series", "list"]
+)
+def test_to_json_every_orient(orient, storage):
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}, storage=storage)
+    buf = io.StringIO()
+    df.to_json(buf, orient=orient)
+    json.loads(buf.getvalue())
+
+
+def test_to_dict_split_index_is_a_list():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    split = df.to_dict("split")
+    assert split == {
+        "index": [0, 1],
+        "columns": ["a", "b"],
+        "data": [[1, "x"], [2, "y"]],
+    }
+    # the rows are copies, not the frame's storage
+    split["data"][0][0] = 100
+    assert df.to_dict("list")["a"] == [1, 2]
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize(
+    "orient", ["dict", "records", "index", "split", "series", "list"]
+)
+def test_to_dict_does_not_touch_storage(orient, storage):
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}, storage=storage)
+    head = df.head(2)
+    shared, version = head._shared, head._version
+    head.to_dict(orient)
+    # a read-only export neither copies shared storage nor counts as a change
+    assert head._shared or not shared
+    assert head._version == version
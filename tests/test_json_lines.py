@@ -0,0 +1,108 @@
+import io
+import json
+
+import pytest
+
+import duffel as pd
+
+RECORDS = [{"id": i, "name": f"n{i}", "score": i / 2} for i in range(10)]
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _lines(records=RECORDS):
+    return "\n".join(map(json.dumps, records)) + "\n\n"
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_read_lines(storage):
+    df = pd.read_json(io.StringIO(_lines()), lines=True, storage=storage)
+    assert df.storage == storage
+    assert list(df.columns) == ["id", "name", "score"]
+    assert _frame_dict(df)["name"] == [r["name"] for r in RECORDS]
+
+
+def test_read_lines_in_chunks_with_columns_and_nrows():
+    chunks = list(
+        pd.read_json(
+            io.StringIO(_lines()), lines=True, chunksize=4, columns=["score", "id"]
+        )
+    )
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert all([list(c.columns) == ["score", "id"] for c in chunks])
+    # chunks continue the row numbering
+    assert list(chunks[2].index) == [8, 9]
+    df = pd.read_json(io.StringIO(_lines()), lines=True, nrows=3)
+    assert list(df._get_column("id")) == [0, 1, 2]
+
+
+def test_read_lines_is_lazy():
+    consumed = []
+
+    def lines():
+        for line in _lines().splitlines(keepends=True):
+            consumed.append(line)
+            yield line
+
+    class Reader(io.TextIOBase):
+        def __init__(self):
+            self._lines = lines()
+
+        def __iter__(self):
+            return self._lines
+
+        def read(self, n=-1):
+            return "".join(self._lines)
+
+    chunks = pd.read_json(Reader(), lines=True, chunksize=3)
+    next(chunks)
+    assert len(consumed) < len(RECORDS)
+
+
+def test_records_with_new_keys():
+    records = [{"a": 1}, {"a": 2, "b": "x"}]
+    df = pd.read_json(io.StringIO(_lines(records)), lines=True)
+    assert _frame_dict(df) == {"a": [1, 2], "b": [None, "x"]}
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize("lines", [False, True])
+def test_to_json_records_round_trip(storage, lines, tmp_path):
+    df = pd.DataFrame.from_records(RECORDS, storage=storage)
+    buf = io.StringIO()
+    df.to_json(buf, orient="records", lines=lines)
+    text = buf.getvalue()
+    if lines:
+        assert [json.loads(x) for x in text.splitlines()] == RECORDS
+        back = pd.read_json(io.StringIO(text), lines=True)
+    else:
+        assert json.loads(text) == RECORDS
+        back = pd.read_json(io.StringIO(text), orient="records")
+    assert _frame_dict(back) == _frame_dict(df)
+    path = str(tmp_path / "r.json")
+    df.to_json(path, orient="records", lines=lines)
+    with open(path) as f:
+        assert f.read() == text
+
+
+def test_to_json_writes_in_batches():
+    writes = []
+
+    class Buffer(io.StringIO):
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+
+    df = pd.DataFrame.from_records([{"i": i} for i in range(10000)])
+    df.to_json(Buffer(), orient="records", lines=True)
+    assert len(writes) > 1
+    assert "".join(writes).count("\n") == 10000
+
+
+def test_lines_needs_records():
+    with pytest.raises(AssertionError):
+        pd.DataFrame({"a": [1]}).to_json(io.StringIO(), lines=True)
+    with pytest.raises(AssertionError):
+        pd.read_json(io.StringIO("[]"), chunksize=2)
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+import duffel as pd
+from duffel import col
+
+CSV = "id,gender,age\n1,Male,30\n2,Female,40\n3,Male,50\n"
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_filter_on_a_column_a_select_dropped_fails(path):
+    with pytest.raises(AssertionError):
+        pd.scan_csv(path).select(["id"]).filter(col("gender") == "Male")
+    # the eager equivalent fails too
+    with pytest.raises(Exception):
+        df = pd.read_csv(path)[["id"]]
+        df[df["gender"] == "Male"]
+
+
+def test_filter_is_pushed_past_a_select_that_keeps_its_columns(path):
+    lazy = pd.scan_csv(path).select(["id", "gender"]).filter(col("gender") == "Male")
+    assert "WHERE" in lazy.explain().splitlines()[0]
+    out = lazy.collect()
+    assert list(out.columns) == ["id", "gender"]
+    assert list(out._get_column("id")) == [1, 3]
+
+
+def test_filter_on_an_assigned_column_after_a_select(path):
+    out = (
+        pd.scan_csv(path)
+        .select(["id"])
+        .assign(double=col("id") * 2)
+        .filter(col("double") > 2)
+        .collect()
+    )
+    assert list(out._get_column("double")) == [4, 6]
+
+
+def test_scan_csv_mmap_needs_a_filename():
+    with pytest.raises(AssertionError):
+        pd.scan_csv(io.StringIO(CSV), mmap=True)
+
+
+def test_only_the_columns_the_last_select_keeps_are_read(path):
+    lazy = pd.scan_csv(path).select(["id", "gender", "age"]).select(["id"])
+    assert "COLUMNS ['id']" in lazy.explain().splitlines()[0]
+    assert list(lazy.collect().columns) == ["id"]
+
+
+def test_narrowed_select_keeps_columns_later_steps_read(path):
+    out = (
+        pd.scan_csv(path)
+        .select(["id", "gender", "age"])
+        .assign(old=col("age") > 35)
+        .select(["id", "old"])
+        .collect()
+    )
+    assert list(out.columns) == ["id", "old"]
+    assert list(out._get_column("old")) == [False, True, True]
@@ -0,0 +1,73 @@
+import pytest
+
+import duffel as pd
+
+AGE = [25, 31, None, 40, 30, 52]
+GENDER = ["Male", "Female", "Male", "Male", "Female", "Male"]
+
+
+def _frame(storage="rows"):
+    return pd.DataFrame({"age": AGE, "gender": GENDER}, storage=storage)
+
+
+@pytest.mark.parametrize(
+    "compare, expected",
+    [
+        (lambda c: c == 31, [a == 31 for a in AGE]),
+        (lambda c: c != 31, [a != 31 for a in AGE]),
+        # None doesn't compare with a number, so it is never selected
+        (lambda c: c > 30, [a is not None and a > 30 for a in AGE]),
+        (lambda c: c >= 30, [a is not None and a >= 30 for a in AGE]),
+        (lambda c: c < 31, [a is not None and a < 31 for a in AGE]),
+        (lambda c: c <= 31, [a is not None and a <= 31 for a in AGE]),
+        (lambda c: c.isin([25, 40]), [a in (25, 40) for a in AGE]),
+    ],
+)
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_comparisons_return_masks(storage, compare, expected):
+    mask = compare(_frame(storage)["age"])
+    assert isinstance(mask, pd.Mask)
+    assert mask.tolist() == expected
+    assert mask.sum() == sum(expected)
+
+
+def test_combining_masks():
+    a = pd.Mask([1, 1, 0, 0])
+    b = pd.Mask([True, False, True, False])
+    assert (a & b).tolist() == [True, False, False, False]
+    assert (a | b).tolist() == [True, True, True, False]
+    assert (a ^ b).tolist() == [False, True, True, False]
+    assert (~a).tolist() == [False, False, True, True]
+    assert (a & [1, 1, 1, 0]).tolist() == [True, True, False, False]
+    assert a.any() and not (a & ~a).any() and (a | ~a).all()
+    with pytest.raises(AssertionError):
+        a & pd.Mask([1, 0])
+
+
+def test_vector_comparison():
+    df = pd.DataFrame({"a": [1, 5, 3], "b": [2, 4, 3]})
+    assert (df["a"] > df["b"]).tolist() == [False, True, False]
+    assert (df["a"] == [1, 0, 3]).tolist() == [True, False, True]
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_filter_chain(storage):
+    df = _frame(storage)
+    out = df[(df["age"] > 30) & (df["gender"] == "Male")]
+    keep = [
+        i for i, (a, g) in enumerate(zip(AGE, GENDER)) if a and a > 30 and g == "Male"
+    ]
+    assert list(out.index) == keep
+    assert list(out._get_column("age")) == [AGE[i] for i in keep]
+    assert list(df.loc[~(df["gender"] == "Male"), :].index) == [1, 4]
+    # a plain list of bools still works, and agrees with the mask
+    assert df[(df["age"] > 30).tolist()].values == df[df["age"] > 30].values
+
+
+def test_mask_on_a_col_and_a_category_column():
+    df = _frame("columns").astype({"gender": "category"})
+    mask = df["gender"] == "Female"
+    assert mask.tolist() == [g == "Female" for g in GENDER]
+    assert (df["gender"] != "Female").tolist() == [g != "Female" for g in GENDER]
+    age = df["age"]
+    assert list(age[age > 30].values) == [31, 40, 52]
@@ -0,0 +1,20 @@
+import pytest
+
+import duffel as pd
+
+
+class _Frame(pd.DataFrame):
+    pass
+
+
+def test_merge_takes_a_dataframe_subclass():
+    left = pd.DataFrame({"k": [1, 2], "a": ["x", "y"]})
+    right = _Frame({"k": [2, 1], "b": [20, 10]})
+    out = pd.merge(left, right, on="k")
+    assert list(out._get_column("b")) == [10, 20]
+
+
+def test_merge_rejects_other_types():
+    left = pd.DataFrame({"k": [1, 2]})
+    with pytest.raises(AssertionError, match="must be a DataFrame"):
+        pd.merge(left, {"k": [1, 2]}, on="k")
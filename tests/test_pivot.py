@@ -0,0 +1,107 @@
+import pytest
+
+import duffel as pd
+
+REGION = ["n", "s", "n", "e", "s", "n", None]
+PRODUCT = ["b", "a", "a", "b", "a", "b", "a"]
+SALES = [10, 20, 30, 40, 50, 60, 70]
+UNITS = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+
+
+def _frame(storage="rows"):
+    return pd.DataFrame(
+        {"region": REGION, "product": PRODUCT, "sales": SALES, "units": UNITS},
+        storage=storage,
+    )
+
+
+def _reference(values, func):
+    """{(region, product): func(list of values)} for rows with both keys"""
+    groups = {}
+    for r, p, v in zip(REGION, PRODUCT, values):
+        if r is not None:
+            groups.setdefault((r, p), []).append(v)
+    return {key: func(x) for key, x in groups.items()}
+
+
+def _cells(out):
+    """{(row label, column name): value}, leaving out missing cells"""
+    return {
+        (label, col): v
+        for col in out.columns
+        for label, v in zip(out.index, out._get_column(col))
+        if v == v
+    }
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize(
+    "aggfunc, func",
+    [
+        ("sum", sum),
+        ("mean", lambda x: sum(x) / len(x)),
+        ("count", len),
+        ("max", max),
+        (lambda x: sorted(x)[0], min),
+    ],
+)
+def test_matches_a_reference(storage, aggfunc, func):
+    out = _frame(storage).pivot_table(
+        values="sales", index="region", columns="product", aggfunc=aggfunc
+    )
+    assert list(out.index) == ["e", "n", "s"]
+    assert list(out.columns) == ["a", "b"]
+    expected = {(r, p): v for (r, p), v in _reference(SALES, func).items()}
+    assert _cells(out) == expected
+
+
+def test_fill_value_and_unsorted_keys():
+    out = _frame().pivot_table(
+        values="sales",
+        index="region",
+        columns="product",
+        aggfunc="sum",
+        fill_value=0,
+        sort=False,
+    )
+    assert list(out.index) == ["n", "s", "e"]
+    assert list(out.columns) == ["b", "a"]
+    assert list(out._get_column("a")) == [30, 70, 0]
+
+
+def test_missing_keys_are_kept_with_dropna_false():
+    out = _frame().pivot_table(
+        values="sales", index="region", aggfunc="sum", dropna=False, sort=False
+    )
+    assert list(out.index) == ["n", "s", "e", None]
+    assert list(out._get_column("sales")) == [100, 70, 40, 70]
+
+
+def test_several_values_and_aggfuncs_are_named():
+    out = _frame().pivot_table(
+        values=["sales", "units"],
+        index="region",
+        columns="product",
+        aggfunc=["sum", "max"],
+    )
+    assert list(out.columns) == [
+        "sales_sum_a",
+        "sales_sum_b",
+        "sales_max_a",
+        "sales_max_b",
+        "units_sum_a",
+        "units_sum_b",
+        "units_max_a",
+        "units_max_b",
+    ]
+    units = list(out._get_column("units_max_b"))
+    assert units[:2] == [4.0, 6.0]
+    # no row has region s and product b
+    assert units[2] != units[2]
+
+
+def test_default_values_and_several_index_keys():
+    out = _frame().pivot_table(index=["region", "product"], aggfunc="sum")
+    assert list(out.columns) == ["sales", "units"]
+    assert list(out.index) == [("e", "b"), ("n", "a"), ("n", "b"), ("s", "a")]
+    assert list(out._get_column("sales")) == [40, 30, 70, 70]
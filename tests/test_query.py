@@ -0,0 +1,76 @@
+import gc
+
+import duffel as pd
+from duffel import database
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _tables():
+    con, _ = database._engine()
+    return {
+        name
+        for (name,) in con.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+
+
+def setup_function():
+    pd.clear_sql()
+
+
+def test_join():
+    people = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+    orders = pd.DataFrame({"pid": [1, 1, 3], "amount": [1.0, 2.0, 5.0]})
+    out = pd.sql(
+        "SELECT p.name, SUM(o.amount) AS total FROM people p JOIN orders o ON p.id = o.pid "
+        "GROUP BY p.name ORDER BY p.name",
+        people=people,
+        orders=orders,
+    )
+    assert _frame_dict(out) == {"name": ["a", "c"], "total": [3.0, 5.0]}
+    _, tables = database._engine()
+    assert tables["people"][2] == {"id"} and tables["orders"][2] == {"pid"}
+
+
+def test_unchanged_frames_are_not_reloaded():
+    df = pd.DataFrame({"x": [1, 2, 3]})
+    pd.sql("SELECT * FROM t", t=df)
+    _, tables = database._engine()
+    loaded = tables["t"]
+    pd.sql("SELECT * FROM t", t=df)
+    assert tables["t"] is loaded
+    # loading doesn't touch the frame's copy-on-write state
+    assert df._shared is False
+
+
+def test_changed_frames_are_reloaded():
+    for storage in ["rows", "columns"]:
+        df = pd.DataFrame({"x": [1, 2, 3]}, storage=storage)
+        assert pd.sql("SELECT SUM(x) AS s FROM t", t=df).to_dict("list") == {"s": [6]}
+        df["x"] = [10, 20, 30]
+        assert pd.sql("SELECT SUM(x) AS s FROM t", t=df).to_dict("list") == {"s": [60]}
+        df.append([40])
+        assert pd.sql("SELECT SUM(x) AS s FROM t", t=df).to_dict("list") == {"s": [100]}
+
+
+def test_frames_are_not_kept_alive():
+    df = pd.DataFrame({"x": [1, 2, 3]})
+    pd.sql("SELECT * FROM gone", gone=df)
+    del df
+    gc.collect()
+    pd.sql("SELECT * FROM t", t=pd.DataFrame({"y": [1]}))
+    assert "gone" not in _tables()
+
+
+def test_cache_is_capped_and_cleared():
+    frames = [pd.DataFrame({"x": [i]}) for i in range(database.MAX_TABLES + 5)]
+    for i, df in enumerate(frames):
+        pd.sql(f"SELECT * FROM t{i}", **{f"t{i}": df})
+    assert len(_tables()) == database.MAX_TABLES
+    assert "t0" not in _tables()
+    pd.clear_sql()
+    assert _tables() == set()
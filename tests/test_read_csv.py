@@ -0,0 +1,120 @@
+import pytest
+
+import duffel as pd
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def test_columns_and_usecols_with_header(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text("x,y,z\n1,2.5,a\n4,5.5,b\n")
+    df = pd.read_csv(str(path), columns=["A", "B", "C"], usecols=["A", "C"])
+    assert list(df.columns) == ["A", "C"]
+    assert _frame_dict(df) == {"A": [1, 4], "C": ["a", "b"]}
+
+
+def test_columns_and_usecols_without_header(tmp_path):
+    path = tmp_path / "n.csv"
+    path.write_text("1,2.5,a\n4,5.5,b\n")
+    df = pd.read_csv(
+        str(path), header=False, columns=["A", "B", "C"], usecols=["C", "A"]
+    )
+    assert list(df.columns) == ["C", "A"]
+    assert _frame_dict(df) == {"C": ["a", "b"], "A": [1, 4]}
+
+
+def test_usecols_positions_without_header(tmp_path):
+    path = tmp_path / "p.csv"
+    path.write_text("1,2.5,a\n4,5.5,b\n")
+    df = pd.read_csv(str(path), header=False, usecols=[2, 0])
+    # unnamed columns are numbered in the order they are kept
+    assert _frame_dict(df) == {0: ["a", "b"], 1: [1, 4]}
+
+
+def test_columns_and_usecols_chunks(tmp_path):
+    path = tmp_path / "c.csv"
+    path.write_text("".join([f"{i},{i}.5,s{i}\n" for i in range(10)]))
+    chunks = list(
+        pd.read_csv(
+            str(path),
+            header=False,
+            columns=["A", "B", "C"],
+            usecols=["A", "C"],
+            chunksize=4,
+        )
+    )
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert all([list(c.columns) == ["A", "C"] for c in chunks])
+    assert list(chunks[2]._get_column("C")) == ["s8", "s9"]
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_mmap_matches_the_stream_reader(tmp_path, header):
+    path = tmp_path / "m.csv"
+    head = "x,y,z\n" if header else ""
+    path.write_text(head + "".join([f'{i},{i}.5,"s,{i}"\n' for i in range(50)]))
+    for kwargs in [
+        {},
+        {"usecols": [2, 0]},
+        {"columns": ("A", "B", "C"), "usecols": ["C", "A"]},
+        {"columns": ["A", "B", "C"], "usecols": ["A"], "nrows": 7},
+    ]:
+        plain = pd.read_csv(str(path), header=header, **kwargs)
+        mapped = pd.read_csv(str(path), header=header, mmap=True, **kwargs)
+        assert list(mapped.columns) == list(plain.columns)
+        assert _frame_dict(mapped) == _frame_dict(plain)
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_workers_match_the_stream_reader(tmp_path, header):
+    path = tmp_path / "w.csv"
+    head = "x,y,z\n" if header else ""
+    path.write_text(head + "".join([f'{i},{i}.5,"s,{i}"\n' for i in range(500)]))
+    for kwargs in [
+        {},
+        {"usecols": [2, 0]},
+        {"columns": ("A", "B", "C"), "usecols": ["C", "A"]},
+    ]:
+        plain = pd.read_csv(str(path), header=header, **kwargs)
+        parallel = pd.read_csv(str(path), header=header, workers=2, **kwargs)
+        assert list(parallel.columns) == list(plain.columns)
+        assert _frame_dict(parallel) == _frame_dict(plain)
+
+
+def test_workers_reject_a_row_wider_than_the_sample(tmp_path):
+    path = tmp_path / "wide.csv"
+    path.write_text("1,2\n" * 500 + "5,6,7\n")
+    with pytest.raises(AssertionError, match="row with 3 fields"):
+        pd.read_csv(str(path), header=False, workers=2)
+
+
+def test_str_column_parses_later_numbers(tmp_path):
+    path = tmp_path / "s.csv"
+    rows = [f"s{i},{i}" for i in range(150)] + ["7,x", "2.5,", "True,8"]
+    path.write_text("a,b\n" + "\n".join(rows) + "\n")
+    for kwargs in [{}, {"mmap": True}, {"intern_strings": True}]:
+        df = pd.read_csv(str(path), **kwargs)
+        # the sample says str / int; values past it fall back in both directions
+        assert list(df._get_column("a"))[-3:] == [7, 2.5, True]
+        assert list(df._get_column("b"))[-4:-2] == [149, "x"]
+    df = pd.read_csv(str(path), dtype={"a": "str"})
+    assert list(df._get_column("a"))[-3:] == ["7", "2.5", "True"]
+
+
+def test_str_column_stops_trying_numbers(tmp_path, monkeypatch):
+    from duffel import dtypes
+
+    calls = []
+    asnumeric = dtypes._asnumeric
+    monkeypatch.setattr(
+        dtypes, "_asnumeric", lambda obj: calls.append(obj) or asnumeric(obj)
+    )
+    path = tmp_path / "ip.csv"
+    rows = [f"host{i}" for i in range(150)] + [f"10.0.0.{i}" for i in range(50)]
+    path.write_text("a\n" + "\n".join(rows + ["7"]) + "\n")
+    df = pd.read_csv(str(path))
+    # the first ip shows the column isn't numeric; nothing after it is tried
+    assert calls == ["10.0.0.0"]
+    assert list(df._get_column("a"))[-2:] == ["10.0.0.49", "7"]
@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+import duffel as pd
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "id": list(range(10)),
+            "score": [i / 2 for i in range(10)],
+            "name": [f"n{i}" for i in range(10)],
+            "flag": [i % 2 == 0 for i in range(10)],
+        }
+    )
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_round_trip(con, df, storage):
+    df.to_sql("t", con)
+    back = pd.read_sql("SELECT * FROM t", con, storage=storage)
+    assert back.storage == storage
+    assert list(back.columns) == list(df.columns)
+    expected = _frame_dict(df)
+    # bools come back as 0 / 1 ints
+    expected["flag"] = [int(x) for x in expected["flag"]]
+    assert _frame_dict(back) == expected
+    assert (
+        back.astype({"flag": "bool"}).to_dict("list")["flag"]
+        == df.to_dict("list")["flag"]
+    )
+
+
+def test_read_chunksize(con, df):
+    df.to_sql("t", con)
+    chunks = list(pd.read_sql("SELECT id FROM t ORDER BY id", con, chunksize=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert list(chunks[1].index) == [4, 5, 6, 7]
+    assert [x for c in chunks for x in c._get_column("id")] == list(range(10))
+    assert list(pd.read_sql("SELECT id FROM t WHERE 0", con, chunksize=4)) == []
+
+
+def test_read_params(con, df):
+    df.to_sql("t", con)
+    back = pd.read_sql(
+        "SELECT name FROM t WHERE id >= ? AND flag = ?", con, params=(6, 1)
+    )
+    assert _frame_dict(back) == {"name": ["n6", "n8"]}
+
+
+def test_write_chunksize(con, df):
+    df.to_sql("t", con, chunksize=3)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone() == (10,)
+
+
+def test_if_exists_fail(con, df):
+    df.to_sql("t", con)
+    with pytest.raises(AssertionError):
+        df.to_sql("t", con)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone() == (10,)
+
+
+def test_if_exists_replace(con, df):
+    df.to_sql("t", con)
+    df.head(3).to_sql("t", con, if_exists="replace")
+    assert _frame_dict(pd.read_sql("SELECT id FROM t", con)) == {"id": [0, 1, 2]}
+
+
+def test_if_exists_append(con, df):
+    df.to_sql("t", con)
+    df.to_sql("t", con, if_exists="append", chunksize=4)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone() == (20,)
+
+
+def test_index(con, df):
+    df.to_sql("t", con, index=True)
+    back = pd.read_sql("SELECT * FROM t", con)
+    assert list(back.columns) == ["index", *df.columns]
+
+
+def test_failed_write_is_rolled_back(con):
+    bad = pd.DataFrame({"x": [1, 2, object()]})
+    with pytest.raises(sqlite3.Error):
+        bad.to_sql("bad", con)
+    assert con.execute("SELECT name FROM sqlite_master").fetchall() == []
@@ -0,0 +1,131 @@
+import random
+import statistics
+
+import pytest
+
+import duffel as pd
+from duffel.na import NA
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_abs_of_a_frame_with_text_columns(storage):
+    df = pd.DataFrame(
+        {"a": [-1, 2, None], "b": [-1.5, 2.0, -3.0], "s": ["x", "y", "z"]},
+        storage=storage,
+    )
+    df["t"] = [True, False, True]
+    out = df.abs()
+    assert _frame_dict(out) == {
+        "a": [1, 2, None],
+        "b": [1.5, 2.0, 3.0],
+        "s": ["x", "y", "z"],
+        "t": [True, False, True],
+    }
+    assert list(df.abs("a").values) == [1, 2, None]
+
+
+def test_abs_keeps_category_columns():
+    df = pd.DataFrame({"a": [-1, 2], "c": ["x", "y"]}, storage="columns")
+    out = df.astype({"c": "category"}).abs()
+    assert _frame_dict(out) == {"a": [1, 2], "c": ["x", "y"]}
+
+
+def _reference_quantile(values, q):
+    """linear interpolation between the closest ranks, as pandas does by default"""
+    x = sorted(values)
+    pos = q * (len(x) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(x) - 1)
+    return x[lo] + (x[hi] - x[lo]) * (pos - lo)
+
+
+def _random_frame(storage, n=501):
+    rng = random.Random(7)
+    ints = [rng.randint(-1000, 1000) for _ in range(n)]
+    floats = [rng.uniform(-5, 5) for _ in range(n)]
+    for i in range(0, n, 17):
+        floats[i] = NA
+    ints[3] = None
+    return (
+        pd.DataFrame(
+            {"i": ints, "f": floats, "s": [str(v % 7) for v in range(n)]},
+            storage=storage,
+        ),
+        [v for v in ints if v is not None],
+        [v for v in floats if v == v],
+    )
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_reductions_skip_missing_values(storage):
+    df, ints, floats = _random_frame(storage)
+    assert df.sum("i") == sum(ints)
+    assert df.max("i") == max(ints) and df.min("i") == min(ints)
+    assert df.sum("f") == pytest.approx(sum(floats))
+    assert df.max("f") == max(floats) and df.min("f") == min(floats)
+    assert df.min("s") == "0" and df.max("s") == "6"
+    assert df.nunique("s") == 7
+    sums = df.sum(numeric_only=True)
+    assert list(sums.index) == ["i", "f"]
+    assert list(sums.values)[0] == sum(ints)
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_median_and_quantiles_match_sorting(storage):
+    df, ints, floats = _random_frame(storage)
+    assert df.median("i") == statistics.median(ints)
+    assert df.median("f") == pytest.approx(statistics.median(floats))
+    qs = [0.0, 0.1, 0.25, 0.5, 0.9, 0.999, 1.0]
+    for q in qs:
+        assert df.quantile(q, "f") == pytest.approx(_reference_quantile(floats, q))
+    together = df.quantile(qs, "i")
+    assert list(together.index) == qs
+    assert list(together.values) == pytest.approx(
+        [_reference_quantile(ints, q) for q in qs]
+    )
+    frame = df.quantile(qs)
+    assert list(frame.columns) == ["i", "f"]
+    assert list(frame._get_column("f")) == pytest.approx(
+        [_reference_quantile(floats, q) for q in qs]
+    )
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_describe_matches_a_reference(storage):
+    df, ints, floats = _random_frame(storage)
+    out = df.describe()
+    assert list(out.columns) == ["i", "f"]
+    assert list(out.index) == [
+        "count",
+        "mean",
+        "std",
+        "min",
+        "25%",
+        "50%",
+        "75%",
+        "max",
+    ]
+    for col, values in [("i", ints), ("f", floats)]:
+        expected = [
+            len(values),
+            statistics.mean(values),
+            statistics.stdev(values),
+            min(values),
+            *[_reference_quantile(values, q) for q in (0.25, 0.5, 0.75)],
+            max(values),
+        ]
+        assert list(out._get_column(col)) == pytest.approx(expected)
+
+
+def test_mode_and_round():
+    df = pd.DataFrame({"a": [1, 2, 2, 3, 3, None], "b": [1.26, -1.24, 0.5, 1, 2, 3]})
+    assert list(df.mode("a").values) == [2, 3]
+    modes = df.mode()
+    # every b value appears once, so all six are modes and a is padded with NA
+    assert len(modes) == 6
+    assert list(modes._get_column("a"))[:2] == [2, 3]
+    assert list(df.round(1, "b").values) == [1.3, -1.2, 0.5, 1, 2, 3]
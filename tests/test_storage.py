@@ -0,0 +1,100 @@
+from array import array
+
+import pytest
+
+import duffel as pd
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _data():
+    return {
+        "id": [3, 1, 2, 5],
+        "score": [1.5, 9.0, -2.0, 4.25],
+        "name": ["c", "a", "b", "e"],
+        "flag": [True, False, None, True],
+    }
+
+
+def _pair():
+    return pd.DataFrame(_data()), pd.DataFrame(_data(), storage="columns")
+
+
+def test_columns_are_packed():
+    df = pd.DataFrame(_data(), storage="columns")
+    assert df.storage == "columns"
+    assert isinstance(df._get_column("id"), array)
+    assert df._get_column("id").typecode == "q"
+    assert df._get_column("score").typecode == "d"
+    assert isinstance(df._get_column("name"), list)
+    assert isinstance(df._get_column("flag"), list)
+
+
+def test_ints_too_big_for_64_bits_stay_a_list():
+    df = pd.DataFrame({"x": [1, 2**70]}, storage="columns")
+    assert list(df._get_column("x")) == [1, 2**70]
+    assert not isinstance(df._get_column("x"), array)
+
+
+def test_values_and_storage_round_trip():
+    rows, cols = _pair()
+    assert cols.values == rows.values
+    assert _frame_dict(cols) == _frame_dict(rows)
+    rows._set_storage("columns")
+    cols._set_storage("rows")
+    assert rows.storage == "columns" and cols.storage == "rows"
+    assert rows.values == cols.values == pd.DataFrame(_data()).values
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda df: df.sort_values("id"),
+        lambda df: df.sort_values("name").sort_index(),
+        lambda df: df.set_index("name"),
+        lambda df: df.set_index("name").reset_index(),
+        lambda df: df.append([7, 0.5, "g", False]),
+        lambda df: df.append_rows([{"id": 8, "name": "h"}, [9, 1.0, "i", True]]),
+        lambda df: df.__setitem__("id", [1.5, 2.5, 3.5, 4.5]),
+        lambda df: df.__setitem__("new", "x"),
+        lambda df: df.transpose(),
+    ],
+)
+def test_changes_in_place_match(change):
+    rows, cols = _pair()
+    change(rows)
+    change(cols)
+    assert cols.storage == "columns"
+    assert list(cols.columns) == list(rows.columns)
+    assert list(cols.index) == list(rows.index)
+    assert cols.values == rows.values
+
+
+def test_value_that_doesnt_fit_unpacks_the_column():
+    df = pd.DataFrame({"x": [1, 2, 3]}, storage="columns")
+    df.append([4.5])
+    assert list(df._get_column("x")) == [1, 2, 3, 4.5]
+    assert [type(v) for v in df._get_column("x")] == [int, int, int, float]
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda df: df.loc[df["score"] > 0, :].values,
+        lambda df: df.iloc[1:3].values,
+        lambda df: df.head(2).values,
+        lambda df: df.tail(2).values,
+        lambda df: list(df["name"].values),
+        lambda df: df.to_dict("list"),
+        lambda df: df.to_dict("records"),
+        lambda df: df.idxmax("score"),
+        lambda df: df.sum("score"),
+        lambda df: list(df.dtypes.values),
+        lambda df: df.groupby("flag").sum().to_dict("list"),
+    ],
+)
+def test_reads_match(read):
+    rows, cols = _pair()
+    assert read(cols) == read(rows)
@@ -0,0 +1,91 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+
+import pytest
+
+import duffel as pd
+
+DATA = {"id": [1, 2, 3], "name": ["a", "b,c", 'd"e'], "score": [0.5, None, 2.0]}
+ROWS = [
+    ["id", "name", "score"],
+    ["1", "a", "0.5"],
+    ["2", "b,c", ""],
+    ["3", 'd"e', "2.0"],
+]
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _parse(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def _csv_text():
+    buf = io.StringIO()
+    csv.writer(buf).writerows(ROWS)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize("threaded", [False, True])
+@pytest.mark.parametrize("chunksize", [None, 1, 2])
+def test_to_csv_doesnt_change_the_frame(storage, threaded, chunksize):
+    df = pd.DataFrame(DATA, storage=storage)
+    values, index, columns = df.values, list(df.index), df.columns
+    buf = io.StringIO()
+    df.to_csv(buf, chunksize=chunksize, threaded=threaded)
+    assert _parse(buf.getvalue()) == ROWS
+    buf = io.StringIO()
+    df.to_csv(buf, index=True, chunksize=chunksize, threaded=threaded)
+    assert _parse(buf.getvalue()) == [
+        ["index", *ROWS[0]],
+        *[[str(i), *row] for i, row in enumerate(ROWS[1:])],
+    ]
+    assert df.values == values
+    assert list(df.index) == index and df.columns == columns
+
+
+def test_a_failed_write_leaves_the_frame_alone():
+    class Broken(io.StringIO):
+        def write(self, text):
+            raise OSError("disk full")
+
+    df = pd.DataFrame(DATA)
+    values = df.values
+    for threaded in (False, True):
+        with pytest.raises(OSError):
+            df.to_csv(Broken(), chunksize=1, threaded=threaded)
+    assert df.values == values
+
+
+@pytest.mark.parametrize(
+    "ext, module", [(".gz", gzip), (".bz2", bz2), (".xz", lzma), ("", None)]
+)
+@pytest.mark.parametrize("threaded", [False, True])
+def test_compression_by_extension(tmp_path, ext, module, threaded):
+    path = str(tmp_path / f"out.csv{ext}")
+    pd.DataFrame(DATA).to_csv(path, threaded=threaded)
+    opener = open if module is None else module.open
+    with opener(path, "rt", newline="") as f:
+        assert _parse(f.read()) == ROWS
+    back = pd.read_csv(path)
+    assert back.values == pd.read_csv(io.StringIO(_csv_text())).values
+
+
+def test_explicit_compression(tmp_path):
+    path = str(tmp_path / "out.data")
+    pd.DataFrame(DATA).to_csv(path, compression="gzip")
+    with gzip.open(path, "rt", newline="") as f:
+        assert _parse(f.read()) == ROWS
+    with pytest.raises(AssertionError):
+        pd.DataFrame(DATA).to_csv(str(tmp_path / "out.zip"))
+
+
+def test_bad_chunksize():
+    with pytest.raises(AssertionError):
+        pd.DataFrame(DATA).to_csv(io.StringIO(), chunksize=0)
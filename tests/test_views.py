@@ -0,0 +1,77 @@
+import pytest
+
+import duffel as pd
+
+DATA = {"a": [1, 2, 3, 4], "b": [0.5, 1.5, 2.5, 3.5], "c": ["w", "x", "y", "z"]}
+
+
+def _frame_dict(df):
+    return {col: list(df._get_column(col)) for col in df.columns}
+
+
+def _frame(storage):
+    return pd.DataFrame({k: list(v) for k, v in DATA.items()}, storage=storage)
+
+
+VIEWS = {
+    "whole": lambda df: pd.DataFrame._from_dataframe(df),
+    "head": lambda df: df.head(2),
+    "tail": lambda df: df.tail(2),
+    "iloc": lambda df: df.iloc[1:3],
+    "columns": lambda df: df.loc[:, ["a", "c"]],
+}
+
+CHANGES = {
+    "replace column": lambda df: df.__setitem__("a", [-1] * len(df)),
+    "new column": lambda df: df.__setitem__("d", 0),
+    "append": lambda df: df.append({"a": 9, "c": "q"}),
+    "sort_values": lambda df: df.sort_values("c").sort_values("a"),
+    "set_index": lambda df: df.set_index("c"),
+    "values": lambda df: df.values[0].__setitem__(0, -5),
+    "assign values": lambda df: setattr(df, "values", df.values[::-1]),
+}
+
+
+@pytest.mark.parametrize("view", ["whole", "head", "tail", "iloc"])
+def test_row_slices_share_row_lists(view):
+    df = _frame("rows")
+    part = VIEWS[view](df)
+    first = list(df.index).index(part.index[0])
+    assert part._values[0] is df._values[first]
+    assert part._shared and df._shared
+
+
+@pytest.mark.parametrize("view", ["whole", "columns"])
+def test_column_selections_share_containers(view):
+    df = _frame("columns")
+    part = VIEWS[view](df)
+    assert part._get_column("a") is df._get_column("a")
+    assert part._shared and df._shared
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+@pytest.mark.parametrize("view", list(VIEWS))
+@pytest.mark.parametrize("change", list(CHANGES))
+@pytest.mark.parametrize("changed", ["view", "parent"])
+def test_a_change_on_one_side_isnt_seen_on_the_other(storage, view, change, changed):
+    df = _frame(storage)
+    part = VIEWS[view](df)
+    before_df, before_part = _frame_dict(df), _frame_dict(part)
+    index_df, index_part = list(df.index), list(part.index)
+    target, other = (part, df) if changed == "view" else (df, part)
+    before_other = before_df if other is df else before_part
+    index_other = index_df if other is df else index_part
+    CHANGES[change](target)
+    assert _frame_dict(other) == before_other
+    assert list(other.index) == index_other
+
+
+@pytest.mark.parametrize("storage", ["rows", "columns"])
+def test_col_write_doesnt_reach_the_frame(storage):
+    df = _frame(storage)
+    head = df.head(3)
+    col = head["a"]
+    col[0] = 100
+    assert list(col.values) == [100, 2, 3]
+    assert list(head._get_column("a")) == [1, 2, 3]
+    assert list(df._get_column("a")) == [1, 2, 3, 4]